@@ -0,0 +1,201 @@
+# Synthetic xsd repositories used by the benchmarks
+import os
+import random
+from collections import namedtuple
+from os.path import join
+
+from xsd2go.constants import XSD_NAMESPACE
+
+GRAPH_SHAPES = ("chain", "star", "mesh")
+LINK_KINDS = ("include", "import")
+FEATURES = ("extension", "group", "attributeGroup")
+
+BUILTIN_TYPES = ("xsd:string", "xsd:int", "xsd:boolean", "xsd:decimal")
+
+# Parameters of a corpus:
+# - files: number of xsd files
+# - types: number of global complex types per file
+# - depth: nesting depth of the anonymous complex types of each type
+# - fanout: number of elements per sequence, and of dependencies per file
+#   in a mesh graph
+# - graph: shape of the dependency graph between files, see GRAPH_SHAPES
+# - link: xsd:include (one namespace) or xsd:import (one namespace per file)
+# - features: constructs used by the types, see FEATURES
+# - seed: seed of the type references
+CorpusSpec = namedtuple(
+    "CorpusSpec",
+    ["files", "types", "depth", "fanout", "graph", "link", "features", "seed"]
+)
+
+
+def default_spec(**kwargs):
+    values = dict(
+        files=10, types=50, depth=2, fanout=4, graph="chain",
+        link="import", features=FEATURES, seed=0,
+    )
+    values.update(kwargs)
+    return CorpusSpec(**values)
+
+
+def file_name(index):
+    return "bench_%03d.xsd" % index
+
+
+def namespace(spec, index):
+    if spec.link == "include":
+        return "http://example.com/bench"
+    return "http://example.com/bench/%03d" % index
+
+
+def dependencies(spec, index):
+    # Indexes of the files included or imported by the file `index`
+    if index == 0:
+        return []
+    if spec.graph == "chain":
+        return [index - 1]
+    if spec.graph == "star":
+        return [0]
+    if spec.graph == "mesh":
+        return list(range(max(0, index - spec.fanout), index))
+    raise RuntimeError("Unknown graph shape %s" % spec.graph)
+
+
+class SchemaWriter(object):
+    # Renders one xsd file of the corpus
+    def __init__(self, spec, index, rand):
+        self.spec = spec
+        self.index = index
+        self.rand = rand
+        self.dependencies = dependencies(spec, index)
+        self.lines = []
+
+    def prefix(self, index):
+        # Prefix of the names declared by the file `index`
+        if self.spec.link == "include" or index == self.index:
+            return "tns:"
+        return "d%03d:" % index
+
+    def type_name(self, file_index, type_index):
+        return "T%03d_%d" % (file_index, type_index)
+
+    def type_ref(self, type_index):
+        # A builtin type, a previous type of this file or a type of a
+        # dependency
+        choices = len(BUILTIN_TYPES) + type_index + len(self.dependencies)
+        choice = self.rand.randrange(choices) if choices else 0
+        if choice < len(BUILTIN_TYPES):
+            return BUILTIN_TYPES[choice]
+        choice -= len(BUILTIN_TYPES)
+        if choice < type_index:
+            return self.prefix(self.index) + self.type_name(self.index, choice)
+        file_index = self.dependencies[choice - type_index]
+        return self.prefix(file_index) + self.type_name(
+            file_index, self.rand.randrange(self.spec.types))
+
+    def add(self, depth, line):
+        self.lines.append("  " * depth + line)
+
+    def add_sequence(self, depth, type_index, nesting):
+        self.add(depth, "<xsd:sequence>")
+        for i in range(self.spec.fanout):
+            if i == 0 and nesting > 0:
+                self.add(depth + 1, '<xsd:element name="Nested%d">' % nesting)
+                self.add(depth + 2, "<xsd:complexType>")
+                self.add_sequence(depth + 3, type_index, nesting - 1)
+                self.add(depth + 2, "</xsd:complexType>")
+                self.add(depth + 1, "</xsd:element>")
+                continue
+            max_occurs = ' maxOccurs="unbounded"' if i % 3 == 2 else ""
+            self.add(depth + 1, '<xsd:element name="E%d" type="%s"%s/>' % (
+                i, self.type_ref(type_index), max_occurs))
+        if "group" in self.spec.features and nesting == self.spec.depth:
+            self.add(depth + 1, '<xsd:group ref="tns:G%03d"/>' % self.index)
+        self.add(depth, "</xsd:sequence>")
+
+    def add_attributes(self, depth):
+        self.add(depth, '<xsd:attribute name="Id" type="xsd:ID"/>')
+        if "attributeGroup" in self.spec.features:
+            self.add(
+                depth, '<xsd:attributeGroup ref="tns:AG%03d"/>' % self.index)
+
+    def add_type(self, type_index):
+        name = self.type_name(self.index, type_index)
+        self.add(1, '<xsd:complexType name="%s">' % name)
+        if (
+            "extension" in self.spec.features
+            and type_index > 0 and type_index % 2 == 1
+        ):
+            base = self.prefix(self.index) + self.type_name(
+                self.index, type_index - 1)
+            self.add(2, "<xsd:complexContent>")
+            self.add(3, '<xsd:extension base="%s">' % base)
+            self.add_sequence(4, type_index, self.spec.depth)
+            self.add(3, "</xsd:extension>")
+            self.add(2, "</xsd:complexContent>")
+        else:
+            self.add_sequence(2, type_index, self.spec.depth)
+            self.add_attributes(2)
+        self.add(1, "</xsd:complexType>")
+
+    def render(self):
+        spec = self.spec
+        xmlns = [
+            'xmlns:xsd="%s"' % XSD_NAMESPACE,
+            'xmlns:tns="%s"' % namespace(spec, self.index),
+        ]
+        if spec.link == "import":
+            for dependency in self.dependencies:
+                xmlns.append('xmlns:d%03d="%s"' % (
+                    dependency, namespace(spec, dependency)))
+
+        self.add(0, '<?xml version="1.0" encoding="UTF-8"?>')
+        self.add(0, '<xsd:schema %s targetNamespace="%s" '
+                    'elementFormDefault="qualified">' % (
+                        " ".join(xmlns), namespace(spec, self.index)))
+        for dependency in self.dependencies:
+            if spec.link == "include":
+                self.add(1, '<xsd:include schemaLocation="%s"/>' % (
+                    file_name(dependency)))
+            else:
+                self.add(1, '<xsd:import namespace="%s" schemaLocation="%s"/>' % (
+                    namespace(spec, dependency), file_name(dependency)))
+
+        if "group" in spec.features:
+            self.add(1, '<xsd:group name="G%03d">' % self.index)
+            self.add(2, "<xsd:sequence>")
+            self.add(3, '<xsd:element name="GroupCode" type="xsd:string" '
+                        'minOccurs="0"/>')
+            self.add(2, "</xsd:sequence>")
+            self.add(1, "</xsd:group>")
+        if "attributeGroup" in spec.features:
+            self.add(1, '<xsd:attributeGroup name="AG%03d">' % self.index)
+            self.add(2, '<xsd:attribute name="Created" type="xsd:dateTime"/>')
+            self.add(1, "</xsd:attributeGroup>")
+
+        for type_index in range(spec.types):
+            self.add_type(type_index)
+        self.add(1, '<xsd:element name="Root%03d" type="tns:%s"/>' % (
+            self.index, self.type_name(self.index, spec.types - 1)))
+        self.add(0, "</xsd:schema>")
+        return "\n".join(self.lines) + "\n"
+
+
+def write_corpus(spec, path):
+    # Writes the xsd files of `spec` in `path`, returns their paths
+    if spec.graph not in GRAPH_SHAPES:
+        raise RuntimeError("Unknown graph shape %s" % spec.graph)
+    if spec.link not in LINK_KINDS:
+        raise RuntimeError("Unknown link kind %s" % spec.link)
+    unknown = set(spec.features) - set(FEATURES)
+    if unknown:
+        raise RuntimeError("Unknown features %s" % ", ".join(sorted(unknown)))
+
+    os.makedirs(path, exist_ok=True)
+    rand = random.Random(spec.seed)
+    file_paths = []
+    for index in range(spec.files):
+        file_path = join(path, file_name(index))
+        with open(file_path, "w") as fout:
+            fout.write(SchemaWriter(spec, index, rand).render())
+        file_paths.append(file_path)
+    return file_paths
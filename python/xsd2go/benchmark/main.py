@@ -0,0 +1,150 @@
+import argparse
+import contextlib
+import json
+import platform
+import sys
+import tempfile
+import time
+from os.path import join
+
+from xsd2go.benchmark.corpus import (
+    FEATURES, GRAPH_SHAPES, LINK_KINDS, default_spec, write_corpus
+)
+from xsd2go.exporter import Exporter
+from xsd2go.output import OutputWriter, TypeFiles
+from xsd2go.xsd.project import Project
+
+
+parser = argparse.ArgumentParser(
+    description="Times the load, reference resolution and export of a "
+                "synthetic xsd repository, results are printed as JSON")
+
+parser.add_argument("--files", type=int, default=10, help="number of xsd files")
+parser.add_argument(
+    "--types", type=int, default=50,
+    help="number of global complex types per file")
+parser.add_argument(
+    "--depth", type=int, default=2,
+    help="nesting depth of the anonymous complex types")
+parser.add_argument(
+    "--fanout", type=int, default=4,
+    help="elements per sequence, and dependencies per file of a mesh")
+parser.add_argument(
+    "--graph", choices=GRAPH_SHAPES, default="chain",
+    help="shape of the include/import graph")
+parser.add_argument(
+    "--link", choices=LINK_KINDS, default="import",
+    help="files are linked with xsd:include or xsd:import")
+parser.add_argument(
+    "--features", type=str, default=",".join(FEATURES),
+    help="comma separated constructs used by the types, among %s" % (
+        ", ".join(FEATURES)))
+parser.add_argument("--seed", type=int, default=0)
+
+parser.add_argument(
+    "--repeat", type=int, default=1,
+    help="number of runs, each one loads the corpus in a new project")
+parser.add_argument(
+    "--jobs", type=int, default=1,
+    help="number of worker processes used to load the xsd files")
+parser.add_argument(
+    "--streaming", default=False, action="store_true",
+    help="load the xsd files with the streaming loader")
+parser.add_argument(
+    "--corpus-dir", type=str, default=None,
+    help="directory of the generated corpus, a temporary one by default")
+parser.add_argument(
+    "--output", type=str, default=None,
+    help="file of the JSON results, printed to stdout by default")
+
+
+def resolve(type_instances):
+    # Resolves the references of the types reachable from `type_instances`
+    # by building their struct models, without rendering them
+    resolved = set()
+    worklist = list(type_instances)
+    while worklist:
+        type_instance = worklist.pop()
+        if id(type_instance) in resolved:
+            continue
+        resolved.add(id(type_instance))
+        worklist.extend(type_instance.go_type_dependencies())
+    return len(resolved)
+
+
+def run(corpus_path, out_path, jobs, streaming):
+    timings = {}
+    counts = {}
+
+    start = time.perf_counter()
+    project = Project(corpus_path, streaming=streaming)
+    # Progress messages of the project don't go to the results
+    with contextlib.redirect_stdout(sys.stderr):
+        project.load_schema(jobs=jobs)
+    timings["load"] = time.perf_counter() - start
+    counts["schemas"] = len(project.schemas)
+    counts["nodes"] = sum(
+        len(schema.nodes) for schema in project.schemas.values())
+
+    start = time.perf_counter()
+    type_instances = project.type_instances()
+    counts["resolved_types"] = resolve(type_instances)
+    timings["resolve"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    writer = OutputWriter()
+    output = TypeFiles(writer)
+    exporter = Exporter(out_path, "example.com/bench", output)
+    exporter.export(type_instances)
+    timings["export"] = time.perf_counter() - start
+    counts["exported_types"] = exporter.emitted
+
+    start = time.perf_counter()
+    output.flush()
+    timings["write"] = time.perf_counter() - start
+    counts["files_written"] = writer.written
+
+    timings["total"] = sum(timings.values())
+    return {"timings": timings, "counts": counts}
+
+
+def summary(runs):
+    # Minimum of each timing over the runs, the least noisy estimate
+    return {
+        phase: min(run["timings"][phase] for run in runs)
+        for phase in runs[0]["timings"]
+    }
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    features = tuple(f for f in args.features.split(",") if f)
+    spec = default_spec(
+        files=args.files, types=args.types, depth=args.depth,
+        fanout=args.fanout, graph=args.graph, link=args.link,
+        features=features, seed=args.seed,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_path:
+        corpus_path = args.corpus_dir or join(tmp_path, "xsd")
+        write_corpus(spec, corpus_path)
+        runs = [
+            run(corpus_path, join(tmp_path, "out%d" % i), args.jobs,
+                args.streaming)
+            for i in range(args.repeat)
+        ]
+
+    results = {
+        "python": platform.python_version(),
+        "corpus": dict(spec._asdict(), features=list(spec.features)),
+        "options": {"jobs": args.jobs, "streaming": args.streaming},
+        "min": summary(runs),
+        "runs": runs,
+    }
+    if args.output:
+        with open(args.output, "w") as fout:
+            json.dump(results, fout, indent=1, sort_keys=True)
+    else:
+        json.dump(results, sys.stdout, indent=1, sort_keys=True)
+        print()
@@ -1 +1,2 @@
-XSD_NS = "xsd"
\ No newline at end of file
+XSD_NS = "xsd"
+XSD_NAMESPACE = "http://www.w3.org/2001/XMLSchema"
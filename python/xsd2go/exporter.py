@@ -0,0 +1,55 @@
+# Export of the go types reachable from a set of root types
+from xsd2go.golang.helpers import helpers_source
+
+
+class Exporter(object):
+    # Walks the types with an explicit worklist, each go type is emitted
+    # once for the whole project, keyed by (go package, go type name).
+    def __init__(self, base_path, base_module, output, options=None):
+        self.base_path = base_path
+        self.base_module = base_module
+        self.output = output
+        # GoOptions of the methods generated with the structs
+        self.options = options
+        self.exported = set()
+        # (go package, directory) => names of the helpers used by its types
+        self.package_helpers = {}
+        # Number of types taken from the worklist and of types emitted
+        self.visited = 0
+        self.emitted = 0
+
+    def export(self, type_instances):
+        # Reversed so the types are emitted in depth first order, like the
+        # recursive export did
+        worklist = list(reversed(type_instances))
+        while worklist:
+            type_instance = worklist.pop()
+            self.visited += 1
+            if not type_instance.exports_go_type:
+                continue
+
+            key = (type_instance.go_package_name(), type_instance.go_type_name())
+            if key[1] is None:
+                raise RuntimeError(
+                    "Cannot export class without name:\n%s",
+                    type_instance.tostring()
+                )
+            if key in self.exported:
+                continue
+            self.exported.add(key)
+
+            source = type_instance.go_source(
+                self.base_path, self.base_module, self.options)
+            self.output.add(source)
+            if source.helpers:
+                self.package_helpers.setdefault(
+                    (source.package, source.dir_name), set()
+                ).update(source.helpers)
+            self.emitted += 1
+            worklist.extend(reversed(type_instance.go_type_dependencies()))
+
+        # The helpers of a package are written in one file, export is called
+        # once with all the exported types
+        for (package, dir_name), helpers in sorted(self.package_helpers.items()):
+            self.output.add(helpers_source(package, dir_name, helpers))
+        self.package_helpers = {}
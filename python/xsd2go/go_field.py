@@ -0,0 +1,78 @@
+# Field of a generated go struct
+class GoField(object):
+    __slots__ = (
+        "field_name",
+        "type_name",
+        "is_array",
+        "is_pointer",
+        # Type instance exported with the struct, None for builtin types
+        "type_instance",
+        "xml_field_name",
+        "xml_field_suffix",
+        # Position of the element in its collection, used to sort fields
+        "index",
+        # Occurrences of the element in the content model of the struct,
+        # max_occurs is None when unbounded
+        "min_occurs",
+        "max_occurs",
+    )
+
+    def __init__(
+        self, field_name, type_name, is_array=False, is_pointer=False,
+        type_instance=None, xml_field_name="", xml_field_suffix="", index=-1,
+        min_occurs=0, max_occurs=1
+    ):
+        # Fields are shared between the structs using them, they are
+        # immutable once built
+        setattr_ = object.__setattr__
+        setattr_(self, "field_name", field_name)
+        setattr_(self, "type_name", type_name)
+        setattr_(self, "is_array", is_array)
+        setattr_(self, "is_pointer", is_pointer)
+        setattr_(self, "type_instance", type_instance)
+        setattr_(self, "xml_field_name", xml_field_name)
+        setattr_(self, "xml_field_suffix", xml_field_suffix)
+        setattr_(self, "index", index)
+        setattr_(self, "min_occurs", min_occurs)
+        setattr_(self, "max_occurs", max_occurs)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GoField is immutable, use replace()")
+
+    def __delattr__(self, name):
+        raise AttributeError("GoField is immutable")
+
+    def __reduce__(self):
+        return GoField, tuple(getattr(self, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return "GoField(%s)" % ", ".join(
+            "%s=%r" % (name, getattr(self, name)) for name in self.__slots__)
+
+    def with_occurs(self, min_occurs, max_occurs=1):
+        # Field with the occurrences of its element or attribute. The zero
+        # values of the required scalars are written, omitempty would leave
+        # out a legitimate 0, false or "". The enums and unions keep it, their
+        # zero value is unset.
+        changes = dict(min_occurs=min_occurs, max_occurs=max_occurs)
+        if min_occurs > 0 and not self.is_array and not self.is_pointer and (
+            not self.zero_is_unset()
+        ):
+            changes["xml_field_suffix"] = ",".join(
+                option for option in self.xml_field_suffix.split(",")
+                if option != "omitempty")
+        return self.replace(**changes)
+
+    def zero_is_unset(self):
+        # The scalar fields are simple types, the exported ones are enums,
+        # lists or unions
+        if self.type_instance is None:
+            return False
+        exported = self.type_instance.go_type_instance()
+        return exported is not None and exported.go_list() is None
+
+    def replace(self, **changes):
+        values = dict(
+            (name, getattr(self, name)) for name in self.__slots__)
+        values.update(changes)
+        return GoField(**values)
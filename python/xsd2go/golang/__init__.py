@@ -0,0 +1,47 @@
+# Go methods generated with the structs
+from collections import namedtuple
+
+
+# Optional code generated for each exported type:
+# - unmarshal: UnmarshalXML methods decoding without reflection
+# - marshal: MarshalXML and AppendXML methods encoding without reflection
+# - pool: Reset methods and sync.Pool backed Acquire/Release functions, the
+#   generated UnmarshalXML methods acquire the pointer children
+# - validate: Validate methods checking the facets and element occurrences
+GoOptions = namedtuple(
+    "GoOptions", ["unmarshal", "marshal", "pool", "validate"],
+    defaults=(False, False, False, False))
+
+
+# Methods of a type:
+# - code: method declarations
+# - imports: quoted import paths used by the methods
+# - helpers: names of the package helpers used by the methods
+GoMethods = namedtuple("GoMethods", ["code", "imports", "helpers"])
+
+
+def go_methods(type_instance, options):
+    from .marshal import marshal_methods
+    from .pool import pool_methods
+    from .unmarshal import unmarshal_methods
+    from .validate import validate_methods
+
+    generators = []
+    if options.unmarshal:
+        generators.append(unmarshal_methods)
+    if options.marshal:
+        generators.append(marshal_methods)
+    if options.pool:
+        generators.append(pool_methods)
+    if options.validate:
+        generators.append(validate_methods)
+
+    codes = []
+    imports = set()
+    helpers = set()
+    for generator in generators:
+        methods = generator(type_instance, options)
+        codes.append(methods.code)
+        imports.update(methods.imports)
+        helpers.update(methods.helpers)
+    return GoMethods("\n\n".join(codes), imports, helpers)
@@ -0,0 +1,86 @@
+# Builder of gofmt indented go code
+import contextlib
+import json
+
+
+class GoBlock(object):
+    def __init__(self):
+        self.lines = []
+        self.depth = 0
+
+    def line(self, text=""):
+        if text:
+            self.lines.append("\t" * self.depth + text)
+        else:
+            self.lines.append("")
+
+    @contextlib.contextmanager
+    def indent(self, opening, closing="}"):
+        # `opening` line, the lines added in the block one level deeper, then
+        # the `closing` line
+        self.line(opening)
+        self.depth += 1
+        try:
+            yield self
+        finally:
+            self.depth -= 1
+            if closing is not None:
+                self.line(closing)
+
+    @contextlib.contextmanager
+    def case(self, label):
+        # Clause of the enclosing switch, gofmt aligns it with the switch
+        self.depth -= 1
+        self.line(label)
+        self.depth += 1
+        yield self
+
+    def code(self):
+        return "\n".join(self.lines)
+
+
+def field_selector(type_name):
+    # Name of the field of an embedded type: `pkg.Type` => `Type`
+    return type_name.split(".")[-1]
+
+
+def qualified_function(type_name, prefix):
+    # Function named after the type in its package: `pkg.Type` => `pkg.NewType`
+    package, _, name = type_name.rpartition(".")
+    if package:
+        return "%s.%s%s" % (package, prefix, name)
+    return prefix + name
+
+
+def go_string(value):
+    # Interpreted go string literal, JSON escapes are valid go escapes
+    return json.dumps(value, ensure_ascii=False)
+
+
+# Escapes of xsdAppendEscaped, see xsd2go.golang.helpers
+XML_ESCAPES = {
+    '"': "&#34;",
+    "'": "&#39;",
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    "\t": "&#x9;",
+    "\n": "&#xA;",
+    "\r": "&#xD;",
+}
+
+
+def is_xml_char(c):
+    code = ord(c)
+    return (
+        code in (0x09, 0x0A, 0x0D)
+        or 0x20 <= code <= 0xD7FF
+        or 0xE000 <= code <= 0xFFFD
+        or 0x10000 <= code <= 0x10FFFF
+    )
+
+
+def escape_text(value):
+    # `value` escaped like encoding/xml escapes the text and attribute values
+    return "".join(
+        XML_ESCAPES.get(c, c if is_xml_char(c) else "\ufffd") for c in value)
@@ -0,0 +1,157 @@
+# Go enums generated for the simple types restricted by xsd:enumeration
+# facets: the values are integer constants, the xsd values are kept in a
+# table indexed by the constant and parsed with a switch on the text. The
+# zero value of an enum is unset, so omitempty leaves it out like an empty
+# string.
+import re
+from collections import namedtuple
+
+from . import GoMethods
+from .code import GoBlock, escape_text, go_string
+
+# Enum of a simple type:
+# - type_name: go type name
+# - values: xsd values in declaration order
+# - names: go constants of the values
+# - underlying_type: unsigned integer type holding the values
+# - base_type: go type of the restricted type, the text of the values which
+#   aren't strings is trimmed before lookup
+EnumModel = namedtuple(
+    "EnumModel",
+    ["type_name", "values", "names", "underlying_type", "base_type"])
+
+
+def constant_name(type_name, value):
+    # `light-blue` => `ColorTypeLightBlue`
+    parts = re.split(r"[^0-9A-Za-z]+", value)
+    return type_name + ("".join(
+        part[:1].upper() + part[1:] for part in parts) or "Empty")
+
+
+def underlying_type(count):
+    # The zero value isn't an enumeration value
+    if count < 1 << 8:
+        return "uint8"
+    if count < 1 << 16:
+        return "uint16"
+    return "uint32"
+
+
+def enum_model(type_name, enumerations, base_type):
+    values = []
+    for value in enumerations:
+        if value not in values:
+            values.append(value)
+
+    names = []
+    for index, value in enumerate(values):
+        name = constant_name(type_name, value)
+        if name in names:
+            # Values differing only by their separators
+            name = "%s%d" % (name, index + 1)
+        names.append(name)
+    return EnumModel(
+        type_name, tuple(values), tuple(names), underlying_type(len(values)),
+        base_type)
+
+
+def values_table(model):
+    return "xsd%sValues" % model.type_name
+
+
+def declarations(block, model):
+    block.line(
+        "// %s is an enumeration, its zero value is unset" % model.type_name)
+    block.line("type %s %s" % (model.type_name, model.underlying_type))
+    block.line()
+    block.line("// Values of %s" % model.type_name)
+    with block.indent("const (", ")"):
+        for index, name in enumerate(model.names):
+            if index == 0:
+                block.line("%s %s = iota + 1" % (name, model.type_name))
+            else:
+                block.line(name)
+    block.line()
+    block.line("var %s = [...]string{%s}" % (
+        values_table(model),
+        ", ".join(go_string(value) for value in ("",) + model.values)))
+
+
+def string_method(block, model):
+    block.line(
+        '// String returns the xsd value of v, "" if v is unset or unknown')
+    with block.indent("func (v %s) String() string {" % model.type_name):
+        with block.indent("if int(v) < len(%s) {" % values_table(model)):
+            block.line("return %s[v]" % values_table(model))
+        block.line('return ""')
+
+
+def marshal_text(block, model):
+    block.line("// MarshalText returns the xsd value of v")
+    with block.indent(
+        "func (v %s) MarshalText() ([]byte, error) {" % model.type_name
+    ):
+        with block.indent("if int(v) >= len(%s) {" % values_table(model)):
+            block.line('return nil, fmt.Errorf("invalid %s %%d", v)' % (
+                model.type_name))
+        block.line("return []byte(%s[v]), nil" % values_table(model))
+
+
+def unmarshal_text(block, model, imports):
+    block.line(
+        "// UnmarshalText sets v to the value of text, an empty text unsets v")
+    with block.indent(
+        "func (v *%s) UnmarshalText(text []byte) error {" % model.type_name
+    ):
+        if model.base_type == "string":
+            switch = "switch string(text) {"
+        else:
+            imports.add('"bytes"')
+            switch = "switch string(bytes.TrimSpace(text)) {"
+        with block.indent(switch):
+            for name, value in zip(model.names, model.values):
+                with block.case("case %s:" % go_string(value)):
+                    block.line("*v = %s" % name)
+            if "" not in model.values:
+                with block.case('case "":'):
+                    block.line("*v = 0")
+            with block.case("default:"):
+                block.line('return fmt.Errorf("invalid %s %%q", text)' % (
+                    model.type_name))
+        block.line("return nil")
+
+
+def append_xml_text(block, model):
+    # The escaped values are computed once, by the generator
+    table = values_table(model)
+    escaped = tuple(escape_text(value) for value in model.values)
+    if escaped != model.values:
+        table = "xsd%sXMLValues" % model.type_name
+        block.line("var %s = [...]string{%s}" % (
+            table, ", ".join(go_string(value) for value in ("",) + escaped)))
+        block.line()
+
+    block.line("// AppendXMLText appends the escaped xsd value of v to b")
+    with block.indent(
+        "func (v %s) AppendXMLText(b []byte) []byte {" % model.type_name
+    ):
+        with block.indent("if int(v) < len(%s) {" % table):
+            block.line("b = append(b, %s[v]...)" % table)
+        block.line("return b")
+
+
+def enum_source(model, options):
+    imports = {'"fmt"'}
+
+    block = GoBlock()
+    declarations(block, model)
+    block.line()
+    string_method(block, model)
+    block.line()
+    marshal_text(block, model)
+    block.line()
+    unmarshal_text(block, model, imports)
+    if options is not None and options.marshal:
+        block.line()
+        append_xml_text(block, model)
+    return GoMethods(block.code(), imports, set())
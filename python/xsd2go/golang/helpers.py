@@ -0,0 +1,203 @@
+# Unexported functions written once in each go package using them
+from xsd2go.output import GoSource
+
+# File name of the helpers in the package directory
+HELPERS_TYPE_NAME = "xsd2go_helpers"
+
+# name => (imports, code)
+HELPERS = {
+    "xsdReadText": (
+        ('"encoding/xml"',),
+        """// xsdReadText returns the text of the current element, nested elements
+// are skipped
+func xsdReadText(d *xml.Decoder) (string, error) {
+	var text []byte
+	for {
+		tok, err := d.Token()
+		if err != nil {
+			return "", err
+		}
+		switch t := tok.(type) {
+		case xml.CharData:
+			text = append(text, t...)
+		case xml.StartElement:
+			if err := d.Skip(); err != nil {
+				return "", err
+			}
+		case xml.EndElement:
+			return string(text), nil
+		}
+	}
+}""",
+    ),
+    "xsdParseBool": (
+        ('"strconv"', '"strings"'),
+        """func xsdParseBool(s string) (bool, error) {
+	switch strings.TrimSpace(s) {
+	case "true", "1":
+		return true, nil
+	case "false", "0":
+		return false, nil
+	}
+	return false, &strconv.NumError{Func: "ParseBool", Num: s, Err: strconv.ErrSyntax}
+}""",
+    ),
+    "xsdParseInt": (
+        ('"strconv"', '"strings"'),
+        """func xsdParseInt(s string, bits int) (int64, error) {
+	return strconv.ParseInt(strings.TrimSpace(s), 10, bits)
+}""",
+    ),
+    "xsdParseUint": (
+        ('"strconv"', '"strings"'),
+        """func xsdParseUint(s string, bits int) (uint64, error) {
+	return strconv.ParseUint(strings.TrimSpace(s), 10, bits)
+}""",
+    ),
+    "xsdParseFloat": (
+        ('"strconv"', '"strings"'),
+        """func xsdParseFloat(s string, bits int) (float64, error) {
+	return strconv.ParseFloat(strings.TrimSpace(s), bits)
+}""",
+    ),
+    "xsdAppendEscaped": (
+        ('"unicode/utf8"',),
+        """// xsdAppendEscaped appends s to b escaped like encoding/xml escapes the
+// text and the attribute values
+func xsdAppendEscaped(b []byte, s string) []byte {
+	last := 0
+	for i := 0; i < len(s); {
+		r, width := utf8.DecodeRuneInString(s[i:])
+		i += width
+		var esc string
+		switch r {
+		case '"':
+			esc = "&#34;"
+		case '\\'':
+			esc = "&#39;"
+		case '&':
+			esc = "&amp;"
+		case '<':
+			esc = "&lt;"
+		case '>':
+			esc = "&gt;"
+		case '\\t':
+			esc = "&#x9;"
+		case '\\n':
+			esc = "&#xA;"
+		case '\\r':
+			esc = "&#xD;"
+		default:
+			if xsdIsXMLChar(r) && !(r == utf8.RuneError && width == 1) {
+				continue
+			}
+			esc = "\\uFFFD"
+		}
+		b = append(b, s[last:i-width]...)
+		b = append(b, esc...)
+		last = i
+	}
+	return append(b, s[last:]...)
+}
+
+func xsdIsXMLChar(r rune) bool {
+	return r == 0x09 || r == 0x0A || r == 0x0D ||
+		r >= 0x20 && r <= 0xD7FF ||
+		r >= 0xE000 && r <= 0xFFFD ||
+		r >= 0x10000 && r <= 0x10FFFF
+}""",
+    ),
+    "xsdEncodeElement": (
+        ('"encoding/xml"',),
+        """// xsdEncodeElement encodes the element `name` holding `text`
+func xsdEncodeElement(e *xml.Encoder, name, text string) error {
+	start := xml.StartElement{Name: xml.Name{Local: name}}
+	if err := e.EncodeToken(start); err != nil {
+		return err
+	}
+	if err := e.EncodeToken(xml.CharData(text)); err != nil {
+		return err
+	}
+	return e.EncodeToken(start.End())
+}""",
+    ),
+    "xsdIsSpace": (
+        (),
+        """// xsdIsSpace reports whether c is a xml whitespace
+func xsdIsSpace(c byte) bool {
+	return c == ' ' || c == '\\t' || c == '\\n' || c == '\\r'
+}""",
+    ),
+    "xsdValidationError": (
+        (),
+        """// xsdValidationError reports a value which doesn't satisfy a constraint
+// of the schema
+type xsdValidationError struct {
+	typ, field, constraint string
+}
+
+func (e *xsdValidationError) Error() string {
+	return e.typ + "." + e.field + ": " + e.constraint + " is not satisfied"
+}""",
+    ),
+    "xsdUintDigits": (
+        (),
+        """// xsdUintDigits returns the number of decimal digits of n
+func xsdUintDigits(n uint64) int {
+	digits := 1
+	for n >= 10 {
+		n /= 10
+		digits++
+	}
+	return digits
+}""",
+    ),
+    "xsdIntDigits": (
+        (),
+        """func xsdIntDigits(n int64) int {
+	if n < 0 {
+		return xsdUintDigits(uint64(-(n + 1)) + 1)
+	}
+	return xsdUintDigits(uint64(n))
+}""",
+    ),
+    "xsdFloatDigits": (
+        ('"strconv"',),
+        """// xsdFloatDigits returns the number of significant decimal digits of the
+// shortest decimal representation of f
+func xsdFloatDigits(f float64, bits int) int {
+	var buf [32]byte
+	s := strconv.AppendFloat(buf[:0], f, 'f', -1, bits)
+	start, end, point := 0, len(s), false
+	for start < end && (s[start] == '-' || s[start] == '0' || s[start] == '.') {
+		start++
+	}
+	for _, c := range s[start:] {
+		point = point || c == '.'
+	}
+	for point && end > start && (s[end-1] == '0' || s[end-1] == '.') {
+		end--
+	}
+	digits := 0
+	for _, c := range s[start:end] {
+		if c != '.' {
+			digits++
+		}
+	}
+	return digits
+}""",
+    ),
+}
+
+
+def helpers_source(package, dir_name, names):
+    names = sorted(names)
+    imports = sorted(set(
+        path for name in names for path in HELPERS[name][0]))
+    return GoSource(
+        package=package,
+        dir_name=dir_name,
+        type_name=HELPERS_TYPE_NAME,
+        imports=imports,
+        code="\n\n".join(HELPERS[name][1] for name in names),
+    )
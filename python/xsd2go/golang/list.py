@@ -0,0 +1,110 @@
+# Go slices generated for the xsd:list simple types: the whitespace separated
+# items are scanned in one pass, without splitting the text into a slice of
+# fields first. Decoding reuses the backing array of the slice, and the text
+# is converted to a string once for all the items.
+from collections import namedtuple
+
+from . import GoMethods
+from .code import GoBlock
+from .scalar import append_text, append_value, is_scalar, parse_text
+
+# List of a simple type:
+# - type_name: go type name
+# - item_type: go type of the items
+ListModel = namedtuple("ListModel", ["type_name", "item_type"])
+
+
+def declaration(block, model):
+    block.line(
+        "// %s is a list of whitespace separated %s values" % (
+            model.type_name, model.item_type))
+    block.line("type %s []%s" % (model.type_name, model.item_type))
+
+
+def unmarshal_text(block, model, helpers):
+    block.line(
+        "// UnmarshalText sets v to the whitespace separated items of text, "
+        "the backing array of v is reused")
+    with block.indent(
+        "func (v *%s) UnmarshalText(text []byte) error {" % model.type_name
+    ):
+        block.line("items := (*v)[:0]")
+        scalar = is_scalar(model.item_type)
+        if scalar:
+            # The items are substrings of a single conversion
+            block.line("s := string(text)")
+        else:
+            block.line("s := text")
+        helpers.add("xsdIsSpace")
+        with block.indent("for i := 0; i < len(s); {"):
+            with block.indent("for i < len(s) && xsdIsSpace(s[i]) {"):
+                block.line("i++")
+            block.line("start := i")
+            with block.indent("for i < len(s) && !xsdIsSpace(s[i]) {"):
+                block.line("i++")
+            with block.indent("if start == i {"):
+                block.line("break")
+            if scalar:
+                helpers.update(parse_text(
+                    block, model.item_type, "s[start:i]",
+                    "items = append(items, %s)", "err"))
+            else:
+                block.line("var x %s" % model.item_type)
+                with block.indent(
+                    "if err := x.UnmarshalText(s[start:i]); err != nil {"
+                ):
+                    block.line("return err")
+                block.line("items = append(items, x)")
+        block.line("*v = items")
+        block.line("return nil")
+
+
+def marshal_text(block, model, imports):
+    block.line("// MarshalText returns the items of v separated by spaces")
+    with block.indent(
+        "func (v %s) MarshalText() ([]byte, error) {" % model.type_name
+    ):
+        block.line("var b []byte")
+        with block.indent("for i, x := range v {"):
+            with block.indent("if i > 0 {"):
+                block.line("b = append(b, ' ')")
+            value = append_value(model.item_type, "b", "x", imports)
+            if value is not None:
+                block.line("b = %s" % value)
+            else:
+                # Text types which aren't builtin implement
+                # encoding.TextMarshaler
+                block.line("t, err := x.MarshalText()")
+                with block.indent("if err != nil {"):
+                    block.line("return nil, err")
+                block.line("b = append(b, t...)")
+        block.line("return b, nil")
+
+
+def append_xml_text(block, model, imports, helpers):
+    block.line("// AppendXMLText appends the escaped items of v to b")
+    with block.indent(
+        "func (v %s) AppendXMLText(b []byte) []byte {" % model.type_name
+    ):
+        with block.indent("for i, x := range v {"):
+            with block.indent("if i > 0 {"):
+                block.line("b = append(b, ' ')")
+            block.line("b = %s" % append_text(
+                model.item_type, "b", "x", imports, helpers))
+        block.line("return b")
+
+
+def list_source(model, options):
+    imports = set()
+    helpers = set()
+
+    block = GoBlock()
+    declaration(block, model)
+    block.line()
+    unmarshal_text(block, model, helpers)
+    block.line()
+    marshal_text(block, model, imports)
+    if options is not None and options.marshal:
+        block.line()
+        append_xml_text(block, model, imports, helpers)
+    return GoMethods(block.code(), imports, helpers)
@@ -0,0 +1,284 @@
+# MarshalXML and AppendXML methods: the fields are written in the order of
+# the struct, with the attr, chardata and omitempty rules of the struct tags,
+# without the reflection of encoding/xml. AppendXML writes the escaped xml
+# directly into a byte slice and doesn't allocate besides growing it.
+from . import GoMethods
+from .code import GoBlock, escape_text, go_string
+from .scalar import append_text, format_text, is_scalar, non_zero, value_type
+from .union import union_set
+from .unmarshal import base_selector, text_field
+
+
+def is_attr(field):
+    return field.xml_field_suffix.startswith("attr")
+
+
+def is_element(field):
+    return not is_attr(field) and field.xml_field_suffix != "chardata"
+
+
+def omitted(field, value):
+    # Condition of the values of the field which are written
+    if field.is_pointer:
+        return "%s != nil" % value
+    union = union_set(field, value)
+    if union is not None:
+        return union
+    if "omitempty" in field.xml_field_suffix.split(","):
+        return non_zero(value_type(field), value)
+    return None
+
+
+def write_fields(block, fields, write):
+    # write(block, field, value) writes one value of the field, the values
+    # of slices are checked one by one like encoding/xml does
+    for field in fields:
+        if field.is_array:
+            with block.indent("for _, x := range v.%s {" % field.field_name):
+                write_value(block, field, "x", write)
+        else:
+            write_value(block, field, "v." + field.field_name, write)
+
+
+def write_value(block, field, value, write):
+    condition = omitted(field, value)
+    if condition is not None:
+        with block.indent("if %s {" % condition):
+            write(block, field, value)
+    elif field.is_pointer or is_scalar(field.type_name):
+        write(block, field, value)
+    else:
+        # Text types declare variables, each value gets its own scope
+        with block.indent("{"):
+            write(block, field, value)
+
+
+def marshal_xml(block, type_name):
+    block.line(
+        "// MarshalXML encodes %s without reflection" % type_name)
+    with block.indent(
+        "func (v *%s) MarshalXML(e *xml.Encoder, start xml.StartElement) "
+        "error {" % type_name
+    ):
+        block.line("attrs, err := v.MarshalXMLAttrs(start.Attr)")
+        with block.indent("if err != nil {"):
+            block.line("return err")
+        block.line("start.Attr = attrs")
+        with block.indent("if err := e.EncodeToken(start); err != nil {"):
+            block.line("return err")
+        with block.indent("if err := v.MarshalXMLContent(e); err != nil {"):
+            block.line("return err")
+        block.line("return e.EncodeToken(start.End())")
+
+
+def marshal_attrs(block, type_instance, type_name, imports):
+    base = base_selector(type_instance)
+    fields = [f for f in type_instance.go_struct_model.fields if is_attr(f)]
+
+    def write(block, field, value):
+        text = format_text(block, field.type_name, value, "nil, err", imports)
+        block.line(
+            'attrs = append(attrs, xml.Attr{Name: xml.Name{Local: "%s"}, '
+            'Value: %s})' % (field.xml_field_name, text))
+
+    block.line(
+        "// MarshalXMLAttrs appends the attributes of %s to attrs" % type_name)
+    with block.indent(
+        "func (v *%s) MarshalXMLAttrs(attrs []xml.Attr) ([]xml.Attr, error) {"
+        % type_name
+    ):
+        if base is not None:
+            block.line("attrs, err := %s.MarshalXMLAttrs(attrs)" % base)
+            with block.indent("if err != nil {"):
+                block.line("return nil, err")
+        write_fields(block, fields, write)
+        block.line("return attrs, nil")
+
+
+def marshal_content(block, type_instance, type_name, imports, helpers):
+    base = base_selector(type_instance)
+    model = type_instance.go_struct_model
+
+    def write(block, field, value):
+        if field.is_pointer:
+            with block.indent(
+                'if err := %s.MarshalXML(e, xml.StartElement{Name: '
+                'xml.Name{Local: "%s"}}); err != nil {' % (
+                    value, field.xml_field_name)
+            ):
+                block.line("return err")
+            return
+        text = format_text(block, field.type_name, value, "err", imports)
+        helpers.add("xsdEncodeElement")
+        with block.indent('if err := xsdEncodeElement(e, "%s", %s); err != nil {' % (
+            field.xml_field_name, text)
+        ):
+            block.line("return err")
+
+    block.line(
+        "// MarshalXMLContent encodes the text and the child elements of %s"
+        % type_name)
+    with block.indent(
+        "func (v *%s) MarshalXMLContent(e *xml.Encoder) error {" % type_name
+    ):
+        if base is not None:
+            with block.indent(
+                "if err := %s.MarshalXMLContent(e); err != nil {" % base
+            ):
+                block.line("return err")
+        text = text_field(type_instance)
+        if text is not None and not any(
+            f.xml_field_suffix == "chardata" for f in model.fields
+        ):
+            # Text of the restricted simple type, embedded before the fields
+            write_text_token(block, text, imports)
+        for field in model.fields:
+            if field.xml_field_suffix == "chardata":
+                write_text_token(block, (field.field_name, field.type_name), imports)
+            elif is_element(field):
+                write_fields(block, [field], write)
+        block.line("return nil")
+
+
+def write_text_token(block, text, imports):
+    field_name, go_type = text
+    value = format_text(block, go_type, "v." + field_name, "err", imports)
+    with block.indent(
+        "if err := e.EncodeToken(xml.CharData(%s)); err != nil {" % value
+    ):
+        block.line("return err")
+
+
+def start_tag(element, type_instance):
+    # (start tag without its closing `>`, end tag) of a global element. The
+    # child elements are written without prefix: they are in the target
+    # namespace if the schema of the type qualifies them, otherwise the
+    # global element is prefixed.
+    name = element.name
+    ns = element.schema.target_ns
+    if not ns:
+        return "<" + name, "</%s>" % name
+    xmlns = escape_text(ns)
+    form = type_instance.schema.root.attrib.get(
+        "elementFormDefault", "unqualified")
+    if form == "qualified":
+        return '<%s xmlns="%s"' % (name, xmlns), "</%s>" % name
+    prefixes = [
+        prefix for prefix, uri in sorted(element.schema.nsmap.items())
+        if uri == ns and prefix != "default"
+    ]
+    prefix = prefixes[0] if prefixes else "ns"
+    return (
+        '<%s:%s xmlns:%s="%s"' % (prefix, name, prefix, xmlns),
+        "</%s:%s>" % (prefix, name))
+
+
+def append_xml(block, type_instance, type_name):
+    # AppendXML is only written for the types of the global elements, the
+    # other types are appended with the name of their element
+    element = type_instance.global_element()
+    if element is not None:
+        start, end = start_tag(element, type_instance)
+        block.line(
+            "// AppendXML appends %s to b as the global element %s" % (
+                type_name, start[1:].split(" ")[0]))
+        with block.indent(
+            "func (v *%s) AppendXML(b []byte) []byte {" % type_name
+        ):
+            block.line("b = append(b, %s...)" % go_string(start))
+            block.line("b = v.AppendXMLAttrs(b)")
+            block.line("b = append(b, '>')")
+            block.line("b = v.AppendXMLContent(b)")
+            block.line("return append(b, %s...)" % go_string(end))
+        block.line()
+    block.line("// AppendXMLElement appends %s to b as the element `name`" % type_name)
+    with block.indent(
+        "func (v *%s) AppendXMLElement(b []byte, name string) []byte {"
+        % type_name
+    ):
+        block.line("b = append(b, '<')")
+        block.line("b = append(b, name...)")
+        block.line("b = v.AppendXMLAttrs(b)")
+        block.line("b = append(b, '>')")
+        block.line("b = v.AppendXMLContent(b)")
+        block.line('b = append(b, "</"...)')
+        block.line("b = append(b, name...)")
+        block.line("return append(b, '>')")
+
+
+def append_attrs(block, type_instance, type_name, imports, helpers):
+    base = base_selector(type_instance)
+    fields = [f for f in type_instance.go_struct_model.fields if is_attr(f)]
+
+    def write(block, field, value):
+        block.line("b = append(b, ` %s=\"`...)" % field.xml_field_name)
+        block.line("b = " + append_text(field.type_name, "b", value, imports, helpers))
+        block.line("b = append(b, '\"')")
+
+    block.line("// AppendXMLAttrs appends the attributes of %s to b" % type_name)
+    with block.indent(
+        "func (v *%s) AppendXMLAttrs(b []byte) []byte {" % type_name
+    ):
+        if base is not None:
+            block.line("b = %s.AppendXMLAttrs(b)" % base)
+        write_fields(block, fields, write)
+        block.line("return b")
+
+
+def append_content(block, type_instance, type_name, imports, helpers):
+    base = base_selector(type_instance)
+    model = type_instance.go_struct_model
+
+    def write(block, field, value):
+        if field.is_pointer:
+            block.line('b = %s.AppendXMLElement(b, "%s")' % (
+                value, field.xml_field_name))
+            return
+        block.line("b = append(b, `<%s>`...)" % field.xml_field_name)
+        block.line("b = " + append_text(field.type_name, "b", value, imports, helpers))
+        block.line("b = append(b, `</%s>`...)" % field.xml_field_name)
+
+    def write_text(text):
+        field_name, go_type = text
+        block.line("b = " + append_text(
+            go_type, "b", "v." + field_name, imports, helpers))
+
+    block.line(
+        "// AppendXMLContent appends the text and the child elements of %s "
+        "to b" % type_name)
+    with block.indent(
+        "func (v *%s) AppendXMLContent(b []byte) []byte {" % type_name
+    ):
+        if base is not None:
+            block.line("b = %s.AppendXMLContent(b)" % base)
+        text = text_field(type_instance)
+        if text is not None and not any(
+            f.xml_field_suffix == "chardata" for f in model.fields
+        ):
+            write_text(text)
+        for field in model.fields:
+            if field.xml_field_suffix == "chardata":
+                write_text((field.field_name, field.type_name))
+            elif is_element(field):
+                write_fields(block, [field], write)
+        block.line("return b")
+
+
+def marshal_methods(type_instance, options):
+    type_name = type_instance.go_type_name()
+    imports = {'"encoding/xml"'}
+    helpers = set()
+
+    block = GoBlock()
+    marshal_xml(block, type_name)
+    block.line()
+    marshal_attrs(block, type_instance, type_name, imports)
+    block.line()
+    marshal_content(block, type_instance, type_name, imports, helpers)
+    block.line()
+    append_xml(block, type_instance, type_name)
+    block.line()
+    append_attrs(block, type_instance, type_name, imports, helpers)
+    block.line()
+    append_content(block, type_instance, type_name, imports, helpers)
+    return GoMethods(block.code(), imports, helpers)
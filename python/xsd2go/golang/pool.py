@@ -0,0 +1,79 @@
+# Reset methods and sync.Pool backed Acquire/Release functions: a released
+# struct keeps the capacity of its slices, so decoding into an acquired
+# struct reuses the buffers of the previous messages. The pointer children
+# are released with their parent.
+from . import GoMethods
+from .code import GoBlock, field_selector, qualified_function
+from .scalar import value_type, zero_value
+
+
+def pool_name(type_name):
+    return "xsd%sPool" % type_name
+
+
+def pool_functions(block, type_name):
+    block.line(
+        "var %s = sync.Pool{New: func() interface{} { return new(%s) }}" % (
+            pool_name(type_name), type_name))
+    block.line()
+    block.line(
+        "// Acquire%s returns a zeroed %s from the pool" % (type_name, type_name))
+    with block.indent("func Acquire%s() *%s {" % (type_name, type_name)):
+        block.line("return %s.Get().(*%s)" % (pool_name(type_name), type_name))
+    block.line()
+    block.line(
+        "// Release%s resets v and puts it back in the pool, neither v nor its "
+        "children may be used afterwards" % type_name)
+    with block.indent("func Release%s(v *%s) {" % (type_name, type_name)):
+        block.line("v.Reset()")
+        block.line("%s.Put(v)" % pool_name(type_name))
+
+
+def reset_field(block, field):
+    target = "v." + field.field_name
+    release = qualified_function(field.type_name, "Release")
+    if field.is_pointer and field.is_array:
+        with block.indent("for i, c := range %s {" % target):
+            with block.indent("if c != nil {"):
+                block.line("%s(c)" % release)
+            block.line("%s[i] = nil" % target)
+        block.line("%s = %s[:0]" % (target, target))
+    elif field.is_array:
+        block.line("%s = %s[:0]" % (target, target))
+    elif field.is_pointer:
+        with block.indent("if %s != nil {" % target):
+            block.line("%s(%s)" % (release, target))
+            block.line("%s = nil" % target)
+    elif value_type(field).startswith("[]"):
+        # List of a simple type
+        block.line("%s = %s[:0]" % (target, target))
+    else:
+        block.line("%s = %s" % (target, zero_value(value_type(field))))
+
+
+def reset(block, type_instance, type_name):
+    model = type_instance.go_struct_model
+
+    block.line(
+        "// Reset zeroes %s and keeps the capacity of its slices, the pointer "
+        "children are released to their pools" % type_name)
+    with block.indent("func (v *%s) Reset() {" % type_name):
+        if model.base_class is not None:
+            selector = "v." + field_selector(model.base_class)
+            if type_instance.go_base_type_instance() is not None:
+                block.line("%s.Reset()" % selector)
+            else:
+                # Embedded value of the restricted simple type
+                block.line("%s = %s" % (selector, zero_value(model.base_class)))
+        for field in model.fields:
+            reset_field(block, field)
+
+
+def pool_methods(type_instance, options):
+    type_name = type_instance.go_type_name()
+
+    block = GoBlock()
+    pool_functions(block, type_name)
+    block.line()
+    reset(block, type_instance, type_name)
+    return GoMethods(block.code(), {'"sync"'}, set())
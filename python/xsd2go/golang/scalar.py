@@ -0,0 +1,154 @@
+# Go builtin types of the scalar fields and text of the structs
+
+# Go type => (parse helper, bit size), strings are used as they are
+SCALARS = {
+    "string": (None, None),
+    "bool": ("xsdParseBool", None),
+    "int": ("xsdParseInt", 0),
+    "int8": ("xsdParseInt", 8),
+    "int16": ("xsdParseInt", 16),
+    "int32": ("xsdParseInt", 32),
+    "int64": ("xsdParseInt", 64),
+    "uint": ("xsdParseUint", 0),
+    "uint8": ("xsdParseUint", 8),
+    "uint16": ("xsdParseUint", 16),
+    "uint32": ("xsdParseUint", 32),
+    "uint64": ("xsdParseUint", 64),
+    "float32": ("xsdParseFloat", 32),
+    "float64": ("xsdParseFloat", 64),
+}
+
+
+def is_scalar(go_type):
+    return go_type in SCALARS
+
+
+def parse_scalar(block, go_type, value, assign, error_result):
+    # Adds to `block` the parsing of the string expression `value` into a
+    # `go_type` and the statement `assign % expression`. Returns the helpers
+    # used.
+    helper, bits = SCALARS[go_type]
+    if helper is None:
+        block.line(assign % value)
+        return ()
+
+    if helper == "xsdParseBool":
+        block.line("b, err := xsdParseBool(%s)" % value)
+        result = "b"
+    else:
+        block.line("n, err := %s(%s, %d)" % (helper, value, bits))
+        result = "%s(n)" % go_type
+    with block.indent("if err != nil {"):
+        block.line("return %s" % error_result)
+    block.line(assign % result)
+    return (helper,)
+
+
+def unmarshal_text(block, go_type, value, assign, error_result):
+    # Text types which aren't builtin implement encoding.TextUnmarshaler
+    block.line("var x %s" % go_type)
+    with block.indent("if err := x.UnmarshalText([]byte(%s)); err != nil {" % value):
+        block.line("return %s" % error_result)
+    block.line(assign % "x")
+    return ()
+
+
+def parse_text(block, go_type, value, assign, error_result):
+    if is_scalar(go_type):
+        return parse_scalar(block, go_type, value, assign, error_result)
+    return unmarshal_text(block, go_type, value, assign, error_result)
+
+
+# Go type => (strconv format function, conversion, extra arguments)
+FORMATS = {
+    "bool": ("Bool", None, ""),
+    "int": ("Int", "int64", ", 10"),
+    "int8": ("Int", "int64", ", 10"),
+    "int16": ("Int", "int64", ", 10"),
+    "int32": ("Int", "int64", ", 10"),
+    "int64": ("Int", "int64", ", 10"),
+    "uint": ("Uint", "uint64", ", 10"),
+    "uint8": ("Uint", "uint64", ", 10"),
+    "uint16": ("Uint", "uint64", ", 10"),
+    "uint32": ("Uint", "uint64", ", 10"),
+    "uint64": ("Uint", "uint64", ", 10"),
+    "float32": ("Float", "float64", ", 'g', -1, 32"),
+    "float64": ("Float", "float64", ", 'g', -1, 64"),
+}
+
+
+def value_type(field):
+    # Builtin go type of the values of the field, the enums are integers
+    if field.type_instance is not None:
+        go_type = field.type_instance.go_underlying_type()
+        if go_type is not None:
+            return go_type
+    return field.type_name
+
+
+def non_zero(go_type, value):
+    # Condition of the values written with omitempty, None if the values of
+    # the type are never omitted
+    if go_type == "string":
+        return '%s != ""' % value
+    if go_type.startswith("[]"):
+        return "len(%s) != 0" % value
+    if go_type == "bool":
+        return value
+    if go_type in FORMATS:
+        return "%s != 0" % value
+    return None
+
+
+def zero_value(go_type):
+    if go_type == "string":
+        return '""'
+    if go_type == "bool":
+        return "false"
+    if go_type in FORMATS:
+        return "0"
+    return "*new(%s)" % go_type
+
+
+def _strconv_call(prefix, go_type, args, value):
+    function, conversion, extra = FORMATS[go_type]
+    if conversion is not None:
+        value = "%s(%s)" % (conversion, value)
+    return "strconv.%s%s(%s%s%s)" % (prefix, function, args, value, extra)
+
+
+def format_text(block, go_type, value, error_result, imports):
+    # String expression of `value`, text types which aren't builtin
+    # implement encoding.TextMarshaler
+    if go_type == "string":
+        return value
+    if go_type in FORMATS:
+        imports.add('"strconv"')
+        return _strconv_call("Format", go_type, "", value)
+    block.line("t, err := %s.MarshalText()" % value)
+    with block.indent("if err != nil {"):
+        block.line("return %s" % error_result)
+    return "string(t)"
+
+
+def append_value(go_type, buf, value, imports):
+    # Expression appending the unescaped text of `value` to `buf`, None if
+    # the type isn't builtin
+    if go_type == "string":
+        return "append(%s, %s...)" % (buf, value)
+    if go_type in FORMATS:
+        imports.add('"strconv"')
+        return _strconv_call("Append", go_type, buf + ", ", value)
+    return None
+
+
+def append_text(go_type, buf, value, imports, helpers):
+    # Expression appending the escaped text of `value` to `buf`, text types
+    # which aren't builtin implement AppendXMLText
+    if go_type == "string":
+        helpers.add("xsdAppendEscaped")
+        return "xsdAppendEscaped(%s, %s)" % (buf, value)
+    if go_type in FORMATS:
+        imports.add('"strconv"')
+        return _strconv_call("Append", go_type, buf + ", ", value)
+    return "%s.AppendXMLText(%s)" % (value, buf)
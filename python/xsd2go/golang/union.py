@@ -0,0 +1,291 @@
+# Tagged structs generated for the xsd:union simple types: the member types
+# are tried in declaration order once, when the text is decoded, and the
+# parsed value is kept with a discriminator telling which member type holds
+# it. The members sharing a go type share one field. The zero value of a union
+# is unset, it is left out of the documents.
+from collections import namedtuple
+
+from xsd2go.go_field import GoField
+
+from . import GoMethods
+from .code import field_selector
+from .enum import constant_name
+from .scalar import SCALARS, append_text, append_value, is_scalar
+from .validate import Validator
+
+# Member type of a union:
+# - name: xsd name of the member type, `Member<position>` if it is anonymous
+# - constant: go constant of the member in the discriminator
+# - go_type: go type of the values
+# - type_instance: simple type of the member, None for builtin types
+# - field_name: field holding the values
+UnionMember = namedtuple(
+    "UnionMember",
+    ["name", "constant", "go_type", "type_instance", "field_name"])
+
+# Union of a simple type:
+# - type_name: go type name
+# - members: UnionMember in declaration order
+# - fields: (field name, go type) of the values
+UnionModel = namedtuple("UnionModel", ["type_name", "members", "fields"])
+
+
+def member_type(type_name):
+    return type_name + "Member"
+
+
+def value_field_name(go_type):
+    # `int` => `IntValue`, `pkg.Type` => `TypeValue`
+    name = field_selector(go_type)
+    return name[:1].upper() + name[1:] + "Value"
+
+
+def union_model(type_name, members):
+    # members: (name, go type, type instance) in declaration order
+    fields = []
+    field_names = {}
+    constants = []
+    union_members = []
+    for index, (name, go_type, type_instance) in enumerate(members):
+        if go_type not in field_names:
+            field_name = value_field_name(go_type)
+            if field_name in [field[0] for field in fields]:
+                # Types of different packages with the same name
+                field_name = "%s%d" % (field_name, len(fields) + 1)
+            field_names[go_type] = field_name
+            fields.append((field_name, go_type))
+
+        constant = constant_name(type_name, name)
+        if constant in constants:
+            constant = "%s%d" % (constant, index + 1)
+        constants.append(constant)
+        union_members.append(UnionMember(
+            name, constant, go_type, type_instance, field_names[go_type]))
+    return UnionModel(type_name, tuple(union_members), tuple(fields))
+
+
+def union_set(field, value):
+    # Condition of the union values which are written, None if the field
+    # isn't a union. Unset unions are left out, like their MarshalXML method
+    # does.
+    if field.type_instance is None or field.is_pointer:
+        return None
+    exported = field.type_instance.go_type_instance()
+    if exported is None or exported.go_union() is None:
+        return None
+    return "%s.Member != 0" % value
+
+
+def declarations(block, model):
+    discriminator = member_type(model.type_name)
+    block.line(
+        "// %s is a union of the %s member types, Member tells which one "
+        "holds the value. Its zero value is unset." % (
+            model.type_name, ", ".join(member.name for member in model.members)))
+    with block.indent("type %s struct {" % model.type_name):
+        block.line("Member %s" % discriminator)
+        for field_name, go_type in model.fields:
+            block.line("%s %s" % (field_name, go_type))
+    block.line()
+    block.line(
+        "// %s is a member type of %s, its zero value is unset" % (
+            discriminator, model.type_name))
+    block.line("type %s uint8" % discriminator)
+    block.line()
+    block.line("// Member types of %s" % model.type_name)
+    with block.indent("const (", ")"):
+        for index, member in enumerate(model.members):
+            if index == 0:
+                block.line("%s %s = iota + 1" % (member.constant, discriminator))
+            else:
+                block.line(member.constant)
+
+
+def member_checks(validator, member, value):
+    # Conditions of the values which don't satisfy the facets of the member
+    if member.type_instance is None:
+        return []
+    if member.type_instance.go_type_instance() is not None:
+        # Exported types check their own values
+        return []
+    field = GoField(
+        member.name, member.go_type, type_instance=member.type_instance,
+        xml_field_name=member.name)
+    return [
+        check[0] for check in validator.facet_checks(
+            field, member.go_type, value)
+    ]
+
+
+def set_member(block, member, value):
+    block.line("v.Member = %s" % member.constant)
+    block.line("v.%s = %s" % (member.field_name, value))
+    block.line("return nil")
+
+
+def try_member(validator, member):
+    # Adds the parsing of the member and returns False if the member accepts
+    # every text, the next members are never tried
+    block = validator.block
+    helpers = validator.helpers
+    go_type = member.go_type
+    if not is_scalar(go_type):
+        with block.indent("{"):
+            block.line("var x %s" % go_type)
+            with block.indent("if err := x.UnmarshalText(text); err == nil {"):
+                set_member(block, member, "x")
+        return True
+
+    value = "s" if go_type == "string" else "x"
+    checks = member_checks(validator, member, value)
+
+    def write_checks():
+        if len(checks) == 1 and checks[0].startswith("!"):
+            accepted = checks[0][1:]
+        else:
+            accepted = "!(%s)" % " || ".join(checks)
+        with block.indent("if %s {" % accepted):
+            set_member(block, member, value)
+
+    helper, bits = SCALARS[go_type]
+    if helper is None:
+        if not checks:
+            set_member(block, member, value)
+            return False
+        if any(check.startswith("n ") for check in checks):
+            validator.imports.add('"unicode/utf8"')
+            with block.indent("{"):
+                block.line("n := utf8.RuneCountInString(s)")
+                write_checks()
+        else:
+            write_checks()
+        return True
+
+    helpers.add(helper)
+    if helper == "xsdParseBool":
+        parse = "b, err := xsdParseBool(s)"
+        result = "b"
+    else:
+        parse = "n, err := %s(s, %d)" % (helper, bits)
+        result = "%s(n)" % go_type
+    with block.indent("if %s; err == nil {" % parse):
+        if checks:
+            block.line("x := %s" % result)
+            write_checks()
+        else:
+            set_member(block, member, result)
+    return True
+
+
+def unmarshal_text(validator, model):
+    block = validator.block
+    block.line(
+        "// UnmarshalText sets v to the value of the first member type of %s "
+        "accepting text" % model.type_name)
+    with block.indent(
+        "func (v *%s) UnmarshalText(text []byte) error {" % model.type_name
+    ):
+        block.line("*v = %s{}" % model.type_name)
+        if any(is_scalar(member.go_type) for member in model.members):
+            block.line("s := string(text)")
+        for member in model.members:
+            if not try_member(validator, member):
+                return
+        validator.imports.add('"fmt"')
+        block.line('return fmt.Errorf("invalid %s %%q", text)' % model.type_name)
+
+
+def member_cases(block, model):
+    # Yields the fields once per go type, with the members holding them as
+    # the case of a switch on Member
+    with block.indent("switch v.Member {"):
+        for field_name, go_type in model.fields:
+            constants = [
+                member.constant for member in model.members
+                if member.field_name == field_name
+            ]
+            with block.case("case %s:" % ", ".join(constants)):
+                yield field_name, go_type
+
+
+def marshal_text(block, model, imports):
+    block.line(
+        '// MarshalText returns the text of the member value, "" if v is unset')
+    with block.indent(
+        "func (v %s) MarshalText() ([]byte, error) {" % model.type_name
+    ):
+        block.line("var b []byte")
+        for field_name, go_type in member_cases(block, model):
+            value = "v." + field_name
+            text = append_value(go_type, "b", value, imports)
+            if text is not None:
+                block.line("b = %s" % text)
+            else:
+                # Text types which aren't builtin implement
+                # encoding.TextMarshaler
+                block.line("return %s.MarshalText()" % value)
+        block.line("return b, nil")
+
+
+def marshal_xml(block, model):
+    block.line(
+        "// MarshalXML encodes the text of v as the element start, an unset v "
+        "isn't written")
+    with block.indent(
+        "func (v %s) MarshalXML(e *xml.Encoder, start xml.StartElement) "
+        "error {" % model.type_name
+    ):
+        with block.indent("if v.Member == 0 {"):
+            block.line("return nil")
+        block.line("t, err := v.MarshalText()")
+        with block.indent("if err != nil {"):
+            block.line("return err")
+        block.line("return e.EncodeElement(string(t), start)")
+    block.line()
+    block.line(
+        "// MarshalXMLAttr encodes the text of v as the attribute name, an "
+        "unset v isn't written")
+    with block.indent(
+        "func (v %s) MarshalXMLAttr(name xml.Name) (xml.Attr, error) {" % (
+            model.type_name)
+    ):
+        with block.indent("if v.Member == 0 {"):
+            block.line("return xml.Attr{}, nil")
+        block.line("t, err := v.MarshalText()")
+        with block.indent("if err != nil {"):
+            block.line("return xml.Attr{}, err")
+        block.line("return xml.Attr{Name: name, Value: string(t)}, nil")
+
+
+def append_xml_text(block, model, imports, helpers):
+    block.line("// AppendXMLText appends the escaped text of the member value to b")
+    with block.indent(
+        "func (v %s) AppendXMLText(b []byte) []byte {" % model.type_name
+    ):
+        for field_name, go_type in member_cases(block, model):
+            block.line("b = %s" % append_text(
+                go_type, "b", "v." + field_name, imports, helpers))
+        block.line("return b")
+
+
+def union_source(model, options):
+    validator = Validator(model.type_name)
+    block = validator.block
+    imports = validator.imports
+    imports.add('"encoding/xml"')
+
+    declarations(block, model)
+    block.line()
+    unmarshal_text(validator, model)
+    block.line()
+    marshal_text(block, model, imports)
+    block.line()
+    marshal_xml(block, model)
+    if options is not None and options.marshal:
+        block.line()
+        append_xml_text(block, model, imports, validator.helpers)
+
+    code = block.code()
+    if validator.declarations.lines:
+        code = validator.declarations.code() + "\n\n" + code
+    return GoMethods(code, imports, validator.helpers)
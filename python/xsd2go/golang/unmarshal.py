@@ -0,0 +1,196 @@
+# UnmarshalXML methods: the elements and attributes are dispatched on their
+# local name and the scalars are parsed directly, without the reflection of
+# encoding/xml. Fields inherited from an extended type are decoded by the
+# methods of the embedded base struct.
+from . import GoMethods
+from .code import GoBlock, field_selector, qualified_function
+from .scalar import parse_text
+
+
+def text_field(type_instance):
+    # (field name, go type) of the text of the struct, None if the struct
+    # itself has no text
+    model = type_instance.go_struct_model
+    for field in model.fields:
+        if field.xml_field_suffix == "chardata":
+            return field.field_name, field.type_name
+    if model.base_class is not None and type_instance.go_base_type_instance() is None:
+        # Restriction of a simple type, the text is the embedded value
+        return field_selector(model.base_class), model.base_class
+    return None
+
+
+def has_text(type_instance):
+    while type_instance is not None:
+        if text_field(type_instance) is not None:
+            return True
+        type_instance = type_instance.go_base_type_instance()
+    return False
+
+
+def base_selector(type_instance):
+    # Embedded struct of the extended type, None without complex base type
+    if type_instance.go_base_type_instance() is None:
+        return None
+    return "v." + field_selector(type_instance.go_struct_model.base_class)
+
+
+def assignment(field):
+    target = "v." + field.field_name
+    if field.is_array:
+        return "%s = append(%s, %%s)" % (target, target)
+    return target + " = %s"
+
+
+def unmarshal_xml(block, type_name, text):
+    block.line(
+        "// UnmarshalXML decodes %s without reflection, unknown elements are "
+        "skipped" % type_name)
+    with block.indent(
+        "func (v *%s) UnmarshalXML(d *xml.Decoder, start xml.StartElement) "
+        "error {" % type_name
+    ):
+        with block.indent("for _, attr := range start.Attr {"):
+            with block.indent(
+                "if _, err := v.DecodeXMLAttr(attr); err != nil {"
+            ):
+                block.line("return err")
+        if text:
+            block.line("var text []byte")
+        with block.indent("for {"):
+            block.line("tok, err := d.Token()")
+            with block.indent("if err != nil {"):
+                block.line("return err")
+            with block.indent("switch t := tok.(type) {"):
+                with block.case("case xml.StartElement:"):
+                    block.line("ok, err := v.DecodeXMLElement(d, t)")
+                    with block.indent("if err != nil {"):
+                        block.line("return err")
+                    with block.indent("if !ok {"):
+                        with block.indent("if err := d.Skip(); err != nil {"):
+                            block.line("return err")
+                if text:
+                    with block.case("case xml.CharData:"):
+                        block.line("text = append(text, t...)")
+                with block.case("case xml.EndElement:"):
+                    if text:
+                        block.line("return v.DecodeXMLText(string(text))")
+                    else:
+                        block.line("return nil")
+
+
+def decode_attr(block, type_instance, type_name, helpers):
+    fields = [
+        field for field in type_instance.go_struct_model.fields
+        if field.xml_field_suffix.startswith("attr")
+    ]
+    base = base_selector(type_instance)
+
+    block.line(
+        "// DecodeXMLAttr decodes the attribute of %s named attr.Name.Local, "
+        "it returns false if %s has no such attribute" % (type_name, type_name))
+    with block.indent(
+        "func (v *%s) DecodeXMLAttr(attr xml.Attr) (bool, error) {" % type_name
+    ):
+        if fields:
+            with block.indent("switch attr.Name.Local {"):
+                for field in fields:
+                    with block.case('case "%s":' % field.xml_field_name):
+                        helpers.update(parse_text(
+                            block, field.type_name, "attr.Value",
+                            assignment(field), "true, err"))
+                        block.line("return true, nil")
+        if base is not None:
+            block.line("return %s.DecodeXMLAttr(attr)" % base)
+        else:
+            block.line("return false, nil")
+
+
+def decode_element(block, type_instance, type_name, helpers, options):
+    fields = [
+        field for field in type_instance.go_struct_model.fields
+        if not field.xml_field_suffix.startswith("attr")
+        and field.xml_field_suffix != "chardata"
+    ]
+    base = base_selector(type_instance)
+
+    block.line(
+        "// DecodeXMLElement decodes the child element of %s named "
+        "start.Name.Local, it returns false if %s has no such element" % (
+            type_name, type_name))
+    with block.indent(
+        "func (v *%s) DecodeXMLElement(d *xml.Decoder, start xml.StartElement)"
+        " (bool, error) {" % type_name
+    ):
+        if fields:
+            with block.indent("switch start.Name.Local {"):
+                for field in fields:
+                    with block.case('case "%s":' % field.xml_field_name):
+                        decode_field(block, field, helpers, options)
+        if base is not None:
+            block.line("return %s.DecodeXMLElement(d, start)" % base)
+        else:
+            block.line("return false, nil")
+
+
+def new_child(field, options):
+    # Pooled structs are acquired, their previous slices are reused
+    if options.pool:
+        return "%s()" % qualified_function(field.type_name, "Acquire")
+    return "new(%s)" % field.type_name
+
+
+def decode_field(block, field, helpers, options):
+    target = "v." + field.field_name
+    if field.is_pointer and field.is_array:
+        block.line("c := %s" % new_child(field, options))
+        with block.indent("if err := c.UnmarshalXML(d, start); err != nil {"):
+            block.line("return true, err")
+        block.line("%s = append(%s, c)" % (target, target))
+    elif field.is_pointer:
+        with block.indent("if %s == nil {" % target):
+            block.line("%s = %s" % (target, new_child(field, options)))
+        block.line("return true, %s.UnmarshalXML(d, start)" % target)
+        return
+    else:
+        block.line("s, err := xsdReadText(d)")
+        helpers.add("xsdReadText")
+        with block.indent("if err != nil {"):
+            block.line("return true, err")
+        helpers.update(parse_text(
+            block, field.type_name, "s", assignment(field), "true, err"))
+    block.line("return true, nil")
+
+
+def decode_text(block, type_instance, type_name, helpers):
+    field = text_field(type_instance)
+
+    block.line("// DecodeXMLText decodes the text content of %s" % type_name)
+    with block.indent(
+        "func (v *%s) DecodeXMLText(text string) error {" % type_name
+    ):
+        if field is None:
+            block.line("return %s.DecodeXMLText(text)" % (
+                base_selector(type_instance)))
+            return
+        field_name, go_type = field
+        helpers.update(parse_text(
+            block, go_type, "text", "v.%s = %%s" % field_name, "err"))
+        block.line("return nil")
+
+
+def unmarshal_methods(type_instance, options):
+    type_name = type_instance.go_type_name()
+    text = has_text(type_instance)
+    helpers = set()
+
+    block = GoBlock()
+    unmarshal_xml(block, type_name, text)
+    block.line()
+    decode_attr(block, type_instance, type_name, helpers)
+    block.line()
+    decode_element(block, type_instance, type_name, helpers, options)
+    if text:
+        block.line()
+        decode_text(block, type_instance, type_name, helpers)
+    return GoMethods(block.code(), {'"encoding/xml"'}, helpers)
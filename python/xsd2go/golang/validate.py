@@ -0,0 +1,298 @@
+# Validate methods: the facets of the simple types restricting builtin types,
+# the occurrences of the child elements and the required attributes are
+# checked by generated code, the patterns are compiled once when the package
+# is initialized. The checks don't allocate, only the returned errors do.
+from decimal import Decimal, InvalidOperation, ROUND_CEILING, ROUND_FLOOR
+
+from . import GoMethods
+from .code import GoBlock, go_string
+from .scalar import non_zero, value_type
+from .unmarshal import base_selector
+
+# Go integer type => (min, max)
+INT_RANGES = {
+    "int": (-1 << 63, (1 << 63) - 1),
+    "int8": (-1 << 7, (1 << 7) - 1),
+    "int16": (-1 << 15, (1 << 15) - 1),
+    "int32": (-1 << 31, (1 << 31) - 1),
+    "int64": (-1 << 63, (1 << 63) - 1),
+    "uint": (0, (1 << 64) - 1),
+    "uint8": (0, (1 << 8) - 1),
+    "uint16": (0, (1 << 16) - 1),
+    "uint32": (0, (1 << 32) - 1),
+    "uint64": (0, (1 << 64) - 1),
+}
+
+# Length facet => operator of the rune counts which don't satisfy it
+LENGTH_OPERATORS = {"length": "!=", "minLength": "<", "maxLength": ">"}
+
+# Go float type => largest finite value
+FLOAT_MAX = {
+    "float32": Decimal("3.4e38"),
+    "float64": Decimal("1.79e308"),
+}
+
+# Constructs of the xsd regular expressions which regexp doesn't have
+UNSUPPORTED_PATTERNS = ("\\i", "\\I", "\\c", "\\C", "-[", "\\p{Is", "\\P{Is")
+
+
+def go_regexp(pattern):
+    # Anchored regexp of a xsd pattern, None if it can't be translated. `^`
+    # and `$` aren't anchors in xsd patterns.
+    if any(construct in pattern for construct in UNSUPPORTED_PATTERNS):
+        return None
+    chars = []
+    escaped = False
+    in_class = False
+    for c in pattern:
+        if escaped:
+            escaped = False
+        elif c == "\\":
+            escaped = True
+        elif c == "[":
+            in_class = True
+        elif c == "]":
+            in_class = False
+        elif c in "^$" and not in_class:
+            c = "\\" + c
+        chars.append(c)
+    return "^(?:%s)$" % "".join(chars)
+
+
+def negate(condition):
+    # Opposite of a condition written by marshal.omitted
+    if " != " in condition:
+        return condition.replace(" != ", " == ", 1)
+    return "!" + condition
+
+
+def regexp_literal(regexp):
+    if "`" in regexp:
+        return go_string(regexp)
+    return "`%s`" % regexp
+
+
+def parse_bound(value, go_type, rounding):
+    # Go literal of a numeric facet value, None if every value of the go
+    # type satisfies it
+    try:
+        bound = Decimal(value.strip())
+    except InvalidOperation:
+        raise RuntimeError("Invalid numeric facet value %r" % value)
+    if go_type in INT_RANGES:
+        bound = int(bound.to_integral_value(rounding=rounding))
+        low, high = INT_RANGES[go_type]
+        if (rounding == ROUND_CEILING and bound <= low) or (
+            rounding == ROUND_FLOOR and bound >= high
+        ):
+            return None
+        return str(max(low, min(high, bound)))
+    if abs(bound) > FLOAT_MAX[go_type]:
+        return None
+    return str(bound)
+
+
+class Validator(object):
+    # Writes the Validate method of a struct
+    def __init__(self, type_name):
+        self.type_name = type_name
+        self.block = GoBlock()
+        # Package level declarations of the compiled patterns
+        self.declarations = GoBlock()
+        self.imports = set()
+        self.helpers = set()
+
+    def fail(self, field_name, constraint):
+        self.helpers.add("xsdValidationError")
+        self.block.line("return &xsdValidationError{%s, %s, %s}" % (
+            go_string(self.type_name), go_string(field_name),
+            go_string(constraint)))
+
+    def check(self, condition, field_name, constraint):
+        with self.block.indent("if %s {" % condition):
+            self.fail(field_name, constraint)
+
+    def check_occurs(self, field):
+        # union imports this module
+        from .marshal import is_attr, omitted
+
+        target = "v." + field.field_name
+        name = field.xml_field_name
+        if field.is_array:
+            if field.min_occurs > 0:
+                self.check("len(%s) < %d" % (target, field.min_occurs),
+                           name, "minOccurs %d" % field.min_occurs)
+            if field.max_occurs is not None:
+                self.check("len(%s) > %d" % (target, field.max_occurs),
+                           name, "maxOccurs %d" % field.max_occurs)
+        elif field.min_occurs > 0:
+            # Pointers, enums and unions are unset when nil or zero, the
+            # other required scalars are always written
+            written = omitted(field, target)
+            if written is None:
+                return
+            if is_attr(field):
+                constraint = "use required"
+            else:
+                constraint = "minOccurs %d" % field.min_occurs
+            self.check(negate(written), name, constraint)
+
+    def check_child(self, field):
+        target = "v." + field.field_name
+        if field.is_array:
+            with self.block.indent("for _, x := range %s {" % target):
+                with self.block.indent("if x != nil {"):
+                    self.check_error("x.Validate()")
+        elif field.min_occurs > 0:
+            # Checked by check_occurs
+            self.check_error("%s.Validate()" % target)
+        else:
+            with self.block.indent("if %s != nil {" % target):
+                self.check_error("%s.Validate()" % target)
+
+    def check_error(self, call):
+        with self.block.indent("if err := %s; err != nil {" % call):
+            self.block.line("return err")
+
+    def facet_checks(self, field, go_type, value):
+        # (condition, field name, constraint) of the facets of the field
+        name = field.xml_field_name or field.field_name
+        checks = []
+        for step, facets in enumerate(field.type_instance.go_facets()):
+            patterns = []
+            for facet, facet_value in facets:
+                if facet == "pattern":
+                    if go_type == "string":
+                        patterns.append(facet_value)
+                    continue
+                condition = self.facet_condition(
+                    facet, facet_value, go_type, value)
+                if condition is not None:
+                    checks.append(
+                        (condition, name, "%s %s" % (facet, facet_value)))
+            if patterns:
+                check = self.pattern(field, step, patterns, value, name)
+                if check is not None:
+                    checks.append(check)
+        return checks
+
+    def facet_condition(self, facet, facet_value, go_type, value):
+        # Condition of the values which don't satisfy the facet, None if
+        # the facet isn't checked for the go type
+        if facet in LENGTH_OPERATORS:
+            if go_type != "string":
+                return None
+            return "n %s %d" % (LENGTH_OPERATORS[facet], int(facet_value))
+        if facet in ("minInclusive", "maxInclusive"):
+            if go_type not in INT_RANGES and go_type not in FLOAT_MAX:
+                return None
+            minimum = facet == "minInclusive"
+            bound = parse_bound(
+                facet_value, go_type, ROUND_CEILING if minimum else ROUND_FLOOR)
+            if bound is None:
+                return None
+            return "%s %s %s" % (value, "<" if minimum else ">", bound)
+        if facet == "totalDigits":
+            return self.digits(go_type, value, facet_value)
+        return None
+
+    def digits(self, go_type, value, facet_value):
+        if go_type in INT_RANGES:
+            if go_type.startswith("u"):
+                self.helpers.add("xsdUintDigits")
+                call = "xsdUintDigits(uint64(%s))" % value
+            else:
+                self.helpers.update(("xsdIntDigits", "xsdUintDigits"))
+                call = "xsdIntDigits(int64(%s))" % value
+        elif go_type in FLOAT_MAX:
+            self.helpers.add("xsdFloatDigits")
+            call = "xsdFloatDigits(float64(%s), %s)" % (value, go_type[5:])
+        else:
+            return None
+        return "%s > %d" % (call, int(facet_value))
+
+    def pattern(self, field, step, patterns, value, name):
+        # The patterns of one restriction are alternatives
+        regexps = [go_regexp(pattern) for pattern in patterns]
+        constraint = "pattern " + " | ".join(patterns)
+        if None in regexps:
+            self.block.line(
+                "// %s of %s isn't supported by regexp" % (constraint, name))
+            return None
+        if len(regexps) > 1:
+            regexp = "|".join("(?:%s)" % regexp for regexp in regexps)
+        else:
+            regexp = regexps[0]
+        var = "xsd%s%sPattern%d" % (self.type_name, field.field_name, step)
+        self.imports.add('"regexp"')
+        self.declarations.line("var %s = regexp.MustCompile(%s)" % (
+            var, regexp_literal(regexp)))
+        return ("!%s.MatchString(%s)" % (var, value), name, constraint)
+
+    def check_facets(self, field):
+        if field.type_instance is None or field.is_pointer:
+            return
+        if field.type_instance.go_type_instance() is not None:
+            # Enums only hold values of the enumeration
+            return
+        go_type = value_type(field)
+        target = "v." + field.field_name
+        value = "x" if field.is_array else target
+        checks = self.facet_checks(field, go_type, value)
+        if not checks:
+            return
+
+        condition = None
+        if "omitempty" in field.xml_field_suffix.split(","):
+            # Zero values are left out of the documents
+            condition = non_zero(go_type, value)
+        counts = any(check[0].startswith("n ") for check in checks)
+
+        def write_checks():
+            if counts:
+                self.imports.add('"unicode/utf8"')
+                self.block.line("n := utf8.RuneCountInString(%s)" % value)
+            for check in checks:
+                self.check(*check)
+
+        def write_value():
+            if condition is not None:
+                with self.block.indent("if %s {" % condition):
+                    write_checks()
+            elif counts:
+                with self.block.indent("{"):
+                    write_checks()
+            else:
+                write_checks()
+
+        if field.is_array:
+            with self.block.indent("for _, x := range %s {" % target):
+                write_value()
+        else:
+            write_value()
+
+
+def validate_methods(type_instance, options):
+    type_name = type_instance.go_type_name()
+    base = base_selector(type_instance)
+    validator = Validator(type_name)
+    block = validator.block
+
+    block.line(
+        "// Validate checks the facets of the values and the occurrences of "
+        "the child elements of %s" % type_name)
+    with block.indent("func (v *%s) Validate() error {" % type_name):
+        if base is not None:
+            validator.check_error("%s.Validate()" % base)
+        for field in type_instance.go_struct_model.fields:
+            validator.check_occurs(field)
+            if field.is_pointer:
+                validator.check_child(field)
+            else:
+                validator.check_facets(field)
+        block.line("return nil")
+
+    code = block.code()
+    if validator.declarations.lines:
+        code = validator.declarations.code() + "\n\n" + code
+    return GoMethods(code, validator.imports, validator.helpers)
@@ -1,7 +1,15 @@
 import argparse
 import os
+import sys
 
+from xsd2go.exporter import Exporter
+from xsd2go.golang import GoOptions
+from xsd2go import memory
+from xsd2go.manifest import Manifest, generator_version
+from xsd2go.output import OutputWriter, PackageBundler, TypeFiles
+from xsd2go.profiling import NullProfile, Profile, format_json, format_table
 from xsd2go.xsd.project import Project
+from xsd2go.xsd_go_type import GoTypeMapping
 
 
 parser = argparse.ArgumentParser()
@@ -22,18 +30,215 @@ parser.add_argument(
     help="Register all classes even it is not directly attached to root node"
 )
 
+parser.add_argument(
+    "--jobs", type=int, default=1,
+    help="number of worker processes used to load the xsd files"
+)
+
+parser.add_argument(
+    "--bundle-size", type=int, default=0,
+    help="bundle the types of a go package in files of at most this size "
+         "in bytes instead of writing one file per type"
+)
+
+parser.add_argument(
+    "--write-jobs", type=int, default=1,
+    help="number of threads writing the go packages"
+)
+
+parser.add_argument(
+    "--unmarshal", default=False, action="store_true",
+    help="generate UnmarshalXML methods decoding the structs without "
+         "reflection"
+)
+
+parser.add_argument(
+    "--marshal", default=False, action="store_true",
+    help="generate MarshalXML and AppendXML methods encoding the structs "
+         "without reflection"
+)
+
+parser.add_argument(
+    "--pool", default=False, action="store_true",
+    help="generate Reset methods and sync.Pool backed Acquire/Release "
+         "functions for the structs"
+)
+
+parser.add_argument(
+    "--validate", default=False, action="store_true",
+    help="generate Validate methods checking the facets of the simple types "
+         "and the occurrences of the elements"
+)
+
+parser.add_argument(
+    "--exact-types", default=False, action="store_true",
+    help="map the xsd numeric types to go types of the same width, like "
+         "short to int16 and double to float64"
+)
+
+parser.add_argument(
+    "--type-map", type=str, default=None,
+    help="JSON file mapping xsd builtin type names to go types, the types of "
+         "other packages are written import/path.Type"
+)
+
+parser.add_argument(
+    "--enums", default=False, action="store_true",
+    help="generate the simple types restricted by enumerations as go enums "
+         "with integer values"
+)
+
+parser.add_argument(
+    "--lists", default=False, action="store_true",
+    help="generate the xsd:list simple types as go slices of their item type"
+)
+
+parser.add_argument(
+    "--unions", default=False, action="store_true",
+    help="generate the xsd:union simple types as go structs holding the "
+         "value of the first member type accepting it"
+)
+
+parser.add_argument(
+    "--root", type=str, action="append", default=[],
+    help="only load the xsd files needed by this root element, given as "
+         "{namespace}Name, and only export the types it uses. "
+         "Can be repeated"
+)
+
+parser.add_argument(
+    "--cache-dir", type=str, default=None,
+    help="directory caching the loaded xsd files between runs"
+)
+
+parser.add_argument(
+    "--streaming", default=False, action="store_true",
+    help="read the xsd files one global declaration at a time and free "
+         "their xml tree once parsed, for very large xsd files"
+)
+
+parser.add_argument(
+    "--profile", nargs="?", const="table", choices=("table", "json"),
+    default=None,
+    help="print the time spent in each phase, the lookup counts and the "
+         "cache hit rates of the run, as a table or as JSON"
+)
+
+parser.add_argument(
+    "--memory-report", nargs="?", const="table", choices=("table", "json"),
+    default=None,
+    help="trace the memory allocations and print the memory used after each "
+         "phase, by each schema and by each kind of node, as a table or as "
+         "JSON"
+)
+
+parser.add_argument(
+    "--force", default=False, action="store_true",
+    help="generate the go scripts even if the xsd files didn't change "
+         "since the last run"
+)
+
 
 if __name__ == "__main__":
     args = parser.parse_args()
 
-    p = Project(args.path)
-    p.load_schema(recursive=args.recursive)
-
-    for name, s in p.schemas.items():
-        if s is None:
-            raise RuntimeError("Cannot find xsd file of %s", name)
-        for name, type_instance in s.name2type_instance.items():
-            type_instance.export_go_struct(args.base_path, args.base_module)
-        for element in s.element_collection:
-            if element.nested_type is not None:
-                element.nested_type.export_go_struct(args.base_path,  args.base_module)
+    profile = NullProfile()
+    if args.profile:
+        profile = Profile().install()
+    memory_report = None
+    if args.memory_report:
+        memory_report = memory.MemoryReport().install()
+
+    if args.type_map is not None:
+        go_types = GoTypeMapping.from_file(
+            args.type_map, args.exact_types, args.enums, args.lists,
+            args.unions)
+    else:
+        go_types = GoTypeMapping(
+            args.exact_types, enums=args.enums, lists=args.lists,
+            unions=args.unions)
+    p = Project(
+        args.path, cache_path=args.cache_dir, streaming=args.streaming,
+        go_types=go_types)
+
+    # Options which change the generated files
+    options = {
+        "generator": generator_version(),
+        "base_module": args.base_module,
+        "recursive": args.recursive,
+        "bundle_size": args.bundle_size,
+        "roots": sorted(args.root),
+    }
+    go_options = GoOptions(
+        unmarshal=args.unmarshal, marshal=args.marshal, pool=args.pool,
+        validate=args.validate)
+    if any(go_options):
+        options["go"] = go_options._asdict()
+    if args.exact_types or args.type_map is not None:
+        options["go_types"] = go_types.types
+    if args.enums:
+        options["enums"] = True
+    if args.lists:
+        options["lists"] = True
+    if args.unions:
+        options["unions"] = True
+    manifest = Manifest.from_files(
+        args.base_path, p.xsd_files(), args.path, options)
+    if not args.force and manifest.is_up_to_date():
+        print('%s is up to date' % args.base_path)
+        sys.exit(0)
+
+    with profile.phase("load"):
+        p.load_schema(
+            recursive=args.recursive, jobs=args.jobs, roots=args.root)
+    if memory_report is not None:
+        memory_report.phase("load")
+
+    writer = OutputWriter(manifest, jobs=args.write_jobs)
+    if args.bundle_size > 0:
+        output = PackageBundler(writer, args.bundle_size)
+    else:
+        output = TypeFiles(writer)
+
+    type_instances = []
+    if args.root:
+        for element in p.root_elements(args.root):
+            go_def = element.export_go_def()
+            # Root elements of builtin types don't have any struct to export
+            if go_def is not None and go_def.type_instance is not None:
+                type_instances.append(go_def.type_instance)
+    else:
+        type_instances = p.type_instances()
+
+    exporter = Exporter(args.base_path, args.base_module, output, go_options)
+    with profile.phase("render"):
+        exporter.export(type_instances)
+    if memory_report is not None:
+        memory_report.phase("render")
+    with profile.phase("write"):
+        output.flush()
+    if memory_report is not None:
+        memory_report.phase("write")
+    print('%d types visited, %d types exported' % (
+        exporter.visited, exporter.emitted))
+
+    for file_path in manifest.remove_orphans():
+        print('removed %s' % file_path)
+    manifest.save()
+    print('%d files written, %d unchanged' % (writer.written, writer.skipped))
+
+    if args.profile:
+        profile.uninstall()
+        report = profile.report(p, exporter, writer)
+        if args.profile == "json":
+            print(format_json(report))
+        else:
+            print(format_table(report))
+
+    if memory_report is not None:
+        report = memory_report.report(p)
+        memory_report.uninstall()
+        if args.memory_report == "json":
+            print(memory.format_json(report))
+        else:
+            print(memory.format_table(report))
@@ -0,0 +1,126 @@
+# Manifest of a generation run, stored in the output directory
+import hashlib
+import json
+import os
+from functools import lru_cache
+from os.path import abspath, dirname, exists, join, relpath
+
+MANIFEST_NAME = ".xsd2go-manifest.json"
+MANIFEST_VERSION = 1
+
+
+def content_hash(content):
+    if isinstance(content, str):
+        content = content.encode("utf8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def file_hash(file_path):
+    with open(file_path, 'rb') as fin:
+        return content_hash(fin.read())
+
+
+@lru_cache(maxsize=None)
+def generator_version():
+    # Hash of the sources of the xsd2go package: the files generated or
+    # cached by another version of the generator are built again
+    digest = hashlib.sha256()
+    package_path = dirname(abspath(__file__))
+    for root, dirs, files in sorted(os.walk(package_path)):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith('.py'):
+                file_path = join(root, name)
+                digest.update(relpath(file_path, package_path).encode("utf8"))
+                digest.update(file_hash(file_path).encode("utf8"))
+    return digest.hexdigest()
+
+
+class Manifest(object):
+    # Hashes of the xsd inputs, of the generation options and of the
+    # generated files. The manifest of the previous run is used to skip
+    # unchanged runs and files, and to remove the files which are not
+    # generated anymore.
+    def __init__(self, base_path, inputs, options):
+        self.base_path = base_path
+        self.inputs = inputs
+        self.options = options
+        self.outputs = {}
+        self.previous = self._load()
+
+    @classmethod
+    def from_files(cls, base_path, file_paths, root_path, options):
+        inputs = {
+            relpath(file_path, root_path): file_hash(file_path)
+            for file_path in file_paths
+        }
+        return cls(base_path, inputs, options)
+
+    @property
+    def path(self):
+        return join(self.base_path, MANIFEST_NAME)
+
+    def _load(self):
+        if not exists(self.path):
+            return None
+        with open(self.path) as fin:
+            try:
+                previous = json.load(fin)
+            except ValueError:
+                return None
+        if previous.get("version") != MANIFEST_VERSION:
+            return None
+        return previous
+
+    def previous_outputs(self):
+        if self.previous is None:
+            return {}
+        return self.previous.get("outputs", {})
+
+    def is_up_to_date(self):
+        # Same inputs and options as the previous run, and its files are
+        # still in place
+        if self.previous is None:
+            return False
+        if (
+            self.previous.get("inputs") != self.inputs
+            or self.previous.get("options") != self.options
+        ):
+            return False
+        for path, digest in self.previous_outputs().items():
+            file_path = join(self.base_path, path)
+            if not exists(file_path) or file_hash(file_path) != digest:
+                return False
+        return True
+
+    def is_unchanged(self, file_path, digest):
+        # The file already holds the content to write
+        return exists(file_path) and file_hash(file_path) == digest
+
+    def add_output(self, file_path, digest):
+        self.outputs[relpath(file_path, self.base_path)] = digest
+
+    def orphans(self):
+        return [
+            join(self.base_path, path)
+            for path in sorted(self.previous_outputs())
+            if path not in self.outputs
+        ]
+
+    def remove_orphans(self):
+        removed = []
+        for file_path in self.orphans():
+            if exists(file_path):
+                os.remove(file_path)
+                removed.append(file_path)
+        return removed
+
+    def save(self):
+        os.makedirs(self.base_path, exist_ok=True)
+        with open(self.path, 'w') as fout:
+            json.dump({
+                "version": MANIFEST_VERSION,
+                "options": self.options,
+                "inputs": self.inputs,
+                "outputs": self.outputs,
+            }, fout, indent=1, sort_keys=True)
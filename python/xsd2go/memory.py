@@ -0,0 +1,181 @@
+# Memory used by a generation run, enabled by --memory-report. tracemalloc
+# is only started when the report is requested, it slows down every
+# allocation.
+import json
+import sys
+import tracemalloc
+from collections import Counter
+from functools import wraps
+from os.path import getsize
+
+from lxml import etree
+
+from xsd2go.xsd.node.base import Node, slot_names
+from xsd2go.xsd.schema import Schema
+
+# Number of allocation sites listed for each phase
+TOP_SOURCES = 10
+
+
+def model_size(roots, seen):
+    # Bytes of the objects reachable from the nodes of `roots` without going
+    # through another node, a schema or a lxml element. Objects in `seen`
+    # are already counted by another schema.
+    root_ids = set(id(root) for root in roots)
+    size = 0
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        if isinstance(obj, Node) and id(obj) not in root_ids:
+            continue
+        if isinstance(obj, (Schema, etree._Element, type)):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        else:
+            for name in slot_names(type(obj)):
+                value = getattr(obj, name, None)
+                if value is not None:
+                    stack.append(value)
+    return size
+
+
+class MemoryReport(object):
+    def __init__(self):
+        # xsd file => bytes still allocated after building its schema
+        self.retained = {}
+        # (phase, traced bytes, growth of the traced bytes during the phase,
+        # peak bytes of the run so far, top allocation sites)
+        self.phases = []
+        self._snapshot = None
+        self._traced = 0
+        self._patches = []
+
+    def install(self):
+        tracemalloc.start()
+        self._snapshot = tracemalloc.take_snapshot()
+
+        report = self
+        schema_load = Schema.load
+
+        @wraps(schema_load)
+        def measured_load(schema):
+            before = tracemalloc.get_traced_memory()[0]
+            result = schema_load(schema)
+            report.retained[schema.file_path] = (
+                tracemalloc.get_traced_memory()[0] - before)
+            return result
+
+        self._patches.append((Schema, "load", schema_load))
+        Schema.load = measured_load
+        return self
+
+    def uninstall(self):
+        while self._patches:
+            owner, name, original = self._patches.pop()
+            setattr(owner, name, original)
+        tracemalloc.stop()
+
+    def phase(self, name):
+        # Snapshot at the end of a phase, compared with the previous one.
+        # tracemalloc.reset_peak needs python 3.9, the peak isn't reset
+        # between the phases: the growth of a phase is the difference of the
+        # traced memory instead.
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        top = [
+            {
+                "source": str(stat.traceback[0]),
+                "size_diff": stat.size_diff,
+                "size": stat.size,
+            }
+            for stat in snapshot.compare_to(self._snapshot, "lineno")[:TOP_SOURCES]
+        ]
+        self.phases.append({
+            "phase": name,
+            "traced": current,
+            "growth": current - self._traced,
+            "peak": peak,
+            "top": top,
+        })
+        self._snapshot = snapshot
+        self._traced = current
+
+    def report(self, project):
+        schemas = {}
+        nodes = Counter()
+        seen = set()
+        for name, schema in sorted(project.schemas.items()):
+            kinds = Counter(type(node).__name__ for node in schema.nodes)
+            nodes.update(kinds)
+
+            # libxml2 allocates the trees outside of the python allocator,
+            # tracemalloc doesn't see them: the elements still held are
+            # counted instead, streamed schemas don't hold any
+            xml_elements = 0
+            if schema.xml_tree is not None:
+                xml_elements = sum(1 for _ in schema.xml_tree.iter())
+            schemas[schema.file_path] = {
+                "retained": self.retained.get(schema.file_path),
+                "model": model_size(schema.nodes, seen),
+                "nodes": len(schema.nodes),
+                "node_kinds": dict(kinds),
+                "xml_elements": xml_elements,
+                "xml_file_size": getsize(schema.file_path),
+            }
+        return {
+            "phases": self.phases,
+            "schemas": schemas,
+            "nodes": dict(nodes),
+        }
+
+
+def format_json(report):
+    return json.dumps(report, indent=1, sort_keys=True)
+
+
+def format_size(size):
+    if size is None:
+        return "-"
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return "%d%s" % (size, unit) if unit == "B" else "%.1f%s" % (size, unit)
+        size /= 1024.0
+    return "%.1fGiB" % size
+
+
+def format_table(report):
+    lines = ["phase (traced, growth, peak so far)"]
+    for phase in report["phases"]:
+        lines.append("  %-8s %10s %10s %10s" % (
+            phase["phase"], format_size(phase["traced"]),
+            format_size(phase["growth"]), format_size(phase["peak"])))
+        for stat in phase["top"]:
+            if stat["size_diff"] > 0:
+                lines.append("    %+10s  %s" % (
+                    format_size(stat["size_diff"]), stat["source"]))
+
+    lines.append("")
+    lines.append("schema (retained, model, nodes, xml elements, xml file)")
+    width = max([len(path) for path in report["schemas"]] + [0])
+    for path, schema in sorted(report["schemas"].items()):
+        lines.append("  %s %10s %10s %8d %8d %10s" % (
+            path.ljust(width), format_size(schema["retained"]),
+            format_size(schema["model"]), schema["nodes"],
+            schema["xml_elements"], format_size(schema["xml_file_size"])))
+
+    lines.append("")
+    lines.append("live nodes")
+    for kind, count in sorted(report["nodes"].items()):
+        lines.append("  %-28s %8d" % (kind, count))
+    return "\n".join(lines)
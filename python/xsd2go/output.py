@@ -0,0 +1,136 @@
+# Go source files written from the exported types
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from os.path import join
+from pathlib import Path
+
+from xsd2go.manifest import content_hash
+
+
+# Rendered go type:
+# - package: go package name
+# - dir_name: directory of the go package
+# - type_name: go type name
+# - imports: quoted import paths used by the type
+# - code: type declaration
+# - helpers: names of the package helpers used by the code
+GoSource = namedtuple(
+    "GoSource", ["package", "dir_name", "type_name", "imports", "code", "helpers"],
+    defaults=((),))
+
+
+def render_go_file(package, imports, codes):
+    lines = ["package %s" % package]
+    if imports:
+        lines.append('import (')
+        lines.extend(imports)
+        lines.append(')')
+    for code in codes:
+        lines.extend(["", code])
+    lines.append("")
+    return '\n'.join(lines)
+
+
+class OutputWriter(object):
+    # Writes the generated files, files which already hold the same content
+    # are left untouched when a manifest is given. The directories are
+    # written concurrently by `jobs` threads.
+    def __init__(self, manifest=None, jobs=1):
+        self.manifest = manifest
+        self.jobs = jobs
+        self.written = 0
+        self.skipped = 0
+
+    def _write_file(self, file_path, content):
+        digest = None
+        if self.manifest is not None:
+            digest = content_hash(content)
+            if self.manifest.is_unchanged(file_path, digest):
+                return digest, False
+        # The whole file is rendered before, it is written in one call
+        with open(file_path, 'w') as fout:
+            fout.write(content)
+        return digest, True
+
+    def _write_dir(self, dir_name, files):
+        Path(dir_name).mkdir(parents=True, exist_ok=True)
+        return [
+            (file_path,) + self._write_file(file_path, content)
+            for file_path, content in files
+        ]
+
+    def write_all(self, dir2files):
+        # dir2files: directory => [(file path, content)]
+        items = sorted(dir2files.items())
+        if self.jobs > 1 and len(items) > 1:
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                results = list(executor.map(
+                    lambda item: self._write_dir(*item), items))
+        else:
+            results = [self._write_dir(*item) for item in items]
+
+        for dir_results in results:
+            for file_path, digest, written in dir_results:
+                if self.manifest is not None:
+                    self.manifest.add_output(file_path, digest)
+                if written:
+                    self.written += 1
+                else:
+                    self.skipped += 1
+
+
+class TypeFiles(object):
+    # Collects the exported types and writes each type in its own file.
+    # All files are rendered before the writes start.
+    def __init__(self, writer):
+        self.writer = writer
+        self.dir2sources = {}
+
+    def add(self, source):
+        self.dir2sources.setdefault(source.dir_name, []).append(source)
+
+    def render(self, sources):
+        for source in sources:
+            yield source.type_name + '.go', render_go_file(
+                source.package, source.imports, [source.code])
+
+    def flush(self):
+        dir2files = {
+            dir_name: [
+                (join(dir_name, file_name), content)
+                for file_name, content in self.render(sources)
+            ]
+            for dir_name, sources in self.dir2sources.items()
+        }
+        self.dir2sources = {}
+        self.writer.write_all(dir2files)
+
+
+class PackageBundler(TypeFiles):
+    # Writes the types of each go package in files of at most `max_size`
+    # bytes, a type bigger than the limit gets its own file.
+    def __init__(self, writer, max_size):
+        super(PackageBundler, self).__init__(writer)
+        self.max_size = max_size
+
+    def shards(self, sources):
+        shard = []
+        shard_size = 0
+        for source in sorted(sources, key=lambda s: s.type_name):
+            size = len(source.code) + sum(len(i) + 1 for i in source.imports)
+            if shard and shard_size + size > self.max_size:
+                yield shard
+                shard = []
+                shard_size = 0
+            shard.append(source)
+            shard_size += size
+        if shard:
+            yield shard
+
+    def render(self, sources):
+        for index, shard in enumerate(self.shards(sources)):
+            package = shard[0].package
+            imports = sorted(set(
+                i for source in shard for i in source.imports))
+            yield "%s_%d.go" % (package, index), render_go_file(
+                package, imports, [source.code for source in shard])
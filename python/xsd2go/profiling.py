@@ -0,0 +1,237 @@
+# Timings and counters of a generation run, enabled by --profile. The
+# instrumented methods are wrapped only while a Profile is installed, runs
+# without it execute the plain methods.
+import contextlib
+import json
+import time
+from collections import Counter
+from functools import wraps
+
+from xsd2go.xsd import util
+from xsd2go.xsd.node.complex_type import ComplexType
+from xsd2go.xsd.schema import Schema
+from xsd2go.xsd.util import cached_slot
+
+PHASES = ("load", "parse", "build", "resolve", "render", "write")
+
+# Lookups delegated to the symbol index
+LOOKUP_METHODS = (
+    "get_element",
+    "get_type_instance",
+    "get_attribute",
+    "get_attribute_group",
+    "get_element_group",
+)
+
+# lru caches of the qualified name parsing
+QNAME_CACHES = ("parse_tag", "parse_attrib_value", "_resolve_qname")
+
+
+def hit_rate(hits, misses):
+    total = hits + misses
+    return hits / total if total else None
+
+
+class NullProfile(object):
+    # Used when --profile isn't given
+    def phase(self, name):
+        return contextlib.nullcontext()
+
+
+class Profile(object):
+    def __init__(self):
+        self.timings = dict((phase, 0.0) for phase in PHASES)
+        # xsd file => {"parse": seconds, "build": seconds, "nodes": count}
+        self.schemas = {}
+        self.lookups = Counter()
+        self.lookup_misses = Counter()
+        self._patches = []
+        self._resolving = 0
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - start
+
+    def _patch(self, owner, name, wrapper):
+        self._patches.append((owner, name, owner.__dict__[name]))
+        setattr(owner, name, wrapper)
+
+    def install(self):
+        profile = self
+        schema_init = Schema.__init__
+        schema_load = Schema.load
+
+        @wraps(schema_init)
+        def timed_init(schema, *args, **kwargs):
+            # Non streamed xsd files are parsed when the schema is created
+            start = time.perf_counter()
+            schema_init(schema, *args, **kwargs)
+            elapsed = time.perf_counter() - start
+            profile.timings["parse"] += elapsed
+            profile.schema_timings(schema)["parse"] = elapsed
+
+        @wraps(schema_load)
+        def timed_load(schema):
+            start = time.perf_counter()
+            result = schema_load(schema)
+            elapsed = time.perf_counter() - start
+            profile.timings["build"] += elapsed
+            timings = profile.schema_timings(schema)
+            timings["build"] = elapsed
+            timings["nodes"] = len(schema.nodes)
+            return result
+
+        self._patch(Schema, "__init__", timed_init)
+        self._patch(Schema, "load", timed_load)
+
+        for name in LOOKUP_METHODS:
+            self._patch(Schema, name, self._counted_lookup(
+                name, Schema.__dict__[name]))
+
+        # Building the struct models resolves the references of the types,
+        # nested builds are counted once
+        build_model = ComplexType.__dict__["go_struct_model"].func
+
+        @wraps(build_model)
+        def timed_model(type_instance):
+            if profile._resolving:
+                return build_model(type_instance)
+            profile._resolving += 1
+            start = time.perf_counter()
+            try:
+                return build_model(type_instance)
+            finally:
+                profile._resolving -= 1
+                profile.timings["resolve"] += time.perf_counter() - start
+
+        self._patch(ComplexType, "go_struct_model", cached_slot(timed_model))
+        return self
+
+    def uninstall(self):
+        while self._patches:
+            owner, name, original = self._patches.pop()
+            setattr(owner, name, original)
+
+    def _counted_lookup(self, name, lookup):
+        profile = self
+
+        @wraps(lookup)
+        def counted(schema, *args, **kwargs):
+            result = lookup(schema, *args, **kwargs)
+            profile.lookups[name] += 1
+            if result is None:
+                profile.lookup_misses[name] += 1
+            return result
+        return counted
+
+    def schema_timings(self, schema):
+        return self.schemas.setdefault(schema.file_path, {})
+
+    def base_chain_depths(self, project):
+        # Number of base types above each resolved complex type
+        depths = Counter()
+        for schema in project.schemas.values():
+            for node in schema.nodes:
+                if not isinstance(node, ComplexType):
+                    continue
+                if not hasattr(node, "_go_struct_model"):
+                    continue
+                depth = 0
+                base = node.go_base_type_instance()
+                while base is not None:
+                    depth += 1
+                    base = base.go_base_type_instance()
+                depths[depth] += 1
+        return depths
+
+    def report(self, project, exporter, writer):
+        timings = dict(self.timings)
+        # go_source builds the struct model, the render time excludes it
+        timings["render"] = max(0.0, timings["render"] - timings["resolve"])
+
+        caches = {}
+        for name in QNAME_CACHES:
+            info = getattr(util, name).cache_info()
+            caches[name] = {
+                "hits": info.hits,
+                "misses": info.misses,
+                "hit_rate": hit_rate(info.hits, info.misses),
+            }
+        if project.cache is not None:
+            caches["schema_cache"] = {
+                "hits": project.cache.hits,
+                "misses": project.cache.misses,
+                "hit_rate": hit_rate(project.cache.hits, project.cache.misses),
+            }
+
+        depths = self.base_chain_depths(project)
+        return {
+            "timings": timings,
+            "schemas": self.schemas,
+            "lookups": dict(
+                (name, {
+                    "calls": self.lookups[name],
+                    "misses": self.lookup_misses[name],
+                })
+                for name in LOOKUP_METHODS
+            ),
+            "base_chain_depths": dict(
+                (str(depth), count) for depth, count in sorted(depths.items())
+            ),
+            "max_base_chain_depth": max(depths) if depths else 0,
+            "caches": caches,
+            "types": {"visited": exporter.visited, "exported": exporter.emitted},
+            "files": {"written": writer.written, "unchanged": writer.skipped},
+        }
+
+
+def format_json(report):
+    return json.dumps(report, indent=1, sort_keys=True)
+
+
+def format_table(report):
+    lines = []
+
+    def section(title, rows):
+        lines.append("")
+        lines.append(title)
+        width = max([len(row[0]) for row in rows] + [0])
+        for row in rows:
+            lines.append("  %s  %s" % (
+                row[0].ljust(width), "  ".join(row[1:])))
+
+    section("phase", [
+        (phase, "%9.3fs" % report["timings"][phase]) for phase in PHASES
+    ])
+    if report["schemas"]:
+        section("schema (parse, build, nodes)", [
+            (path, "%9.3fs" % timings.get("parse", 0.0),
+             "%9.3fs" % timings.get("build", 0.0),
+             "%8d" % timings.get("nodes", 0))
+            for path, timings in sorted(report["schemas"].items())
+        ])
+    section("lookup (calls, misses)", [
+        (name, "%9d" % counts["calls"], "%9d" % counts["misses"])
+        for name, counts in sorted(report["lookups"].items())
+    ])
+    section("base chain depth (types)", [
+        (depth, "%9d" % count)
+        for depth, count in report["base_chain_depths"].items()
+    ])
+    section("cache (hits, misses, hit rate)", [
+        (name, "%9d" % cache["hits"], "%9d" % cache["misses"],
+         "%8s" % ("-" if cache["hit_rate"] is None
+                  else "%.1f%%" % (100 * cache["hit_rate"])))
+        for name, cache in sorted(report["caches"].items())
+    ])
+    section("output", [
+        ("types visited", "%9d" % report["types"]["visited"]),
+        ("types exported", "%9d" % report["types"]["exported"]),
+        ("files written", "%9d" % report["files"]["written"]),
+        ("files unchanged", "%9d" % report["files"]["unchanged"]),
+    ])
+    return "\n".join(lines[1:])
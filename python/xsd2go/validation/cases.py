@@ -0,0 +1,275 @@
+# Schemas and documents checked against lxml.etree.XMLSchema by
+# xsd2go.validation.parity, one case per construct of the content models
+# and simple types the compiled validator handles
+from collections import namedtuple
+
+XS = 'xmlns:xs="http://www.w3.org/2001/XMLSchema"'
+XSI = 'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"'
+
+# Case of the parity check:
+# - name: identifies the case in the reports
+# - schema: text of the only xsd file of the case
+# - documents: (text, valid) of the documents, valid is the expected result
+Case = namedtuple("Case", ["name", "schema", "documents"])
+
+
+def schema(body, attrib=""):
+    return '<xs:schema %s %s>%s</xs:schema>' % (XS, attrib, body)
+
+
+def root(content, attrib=""):
+    # Global Root element whose type has the content model `content`
+    return schema(
+        '<xs:element name="Root"><xs:complexType %s>%s</xs:complexType>'
+        '</xs:element>' % (attrib, content))
+
+
+def elements(*names, **attrib):
+    extra = "".join(' %s="%s"' % item for item in sorted(attrib.items()))
+    return "".join(
+        '<xs:element name="%s"%s/>' % (name, extra) for name in names)
+
+
+def children(tags):
+    # Root document with one empty child per character of tags
+    return "<Root>%s</Root>" % "".join("<%s/>" % tag for tag in tags)
+
+
+def values(type_name, valid, invalid):
+    # Case of the values of a simple type, each one in its own document
+    return Case(
+        type_name,
+        root('<xs:sequence><xs:element name="V" type="%s"/></xs:sequence>'
+             % type_name),
+        [("<Root><V>%s</V></Root>" % value, True) for value in valid]
+        + [("<Root><V>%s</V></Root>" % value, False) for value in invalid],
+    )
+
+
+CASES = [
+    Case(
+        "repeated sequence",
+        root('<xs:sequence maxOccurs="unbounded">%s</xs:sequence>'
+             % elements("P", "Q")),
+        [(children(tags), valid) for tags, valid in (
+            ("PQ", True), ("PQPQ", True), ("PQP", False), ("PPQQ", False),
+            ("QP", False), ("", False),
+        )],
+    ),
+    Case(
+        "repeated choice",
+        root('<xs:choice maxOccurs="2">%s</xs:choice>' % elements("A", "B")),
+        [(children(tags), valid) for tags, valid in (
+            ("A", True), ("AB", True), ("BB", True), ("ABA", False),
+            ("", False),
+        )],
+    ),
+    Case(
+        "occurrences",
+        root('<xs:sequence>%s%s</xs:sequence>' % (
+            elements("C", minOccurs=2, maxOccurs=3),
+            elements("D", minOccurs=0, maxOccurs=20))),
+        [(children(tags), valid) for tags, valid in (
+            ("CC", True), ("CCC", True), ("C", False), ("CCCC", False),
+            ("CC" + "D" * 20, True), ("CC" + "D" * 21, False),
+            ("DCC", False),
+        )],
+    ),
+    Case(
+        "nested groups",
+        schema(
+            '<xs:group name="Tail"><xs:sequence>%s%s</xs:sequence>'
+            '</xs:group>'
+            '<xs:element name="Root"><xs:complexType><xs:sequence>%s'
+            '<xs:choice minOccurs="0" maxOccurs="unbounded">%s'
+            '<xs:sequence>%s%s</xs:sequence></xs:choice>'
+            '<xs:group ref="Tail" maxOccurs="2"/>'
+            '</xs:sequence></xs:complexType></xs:element>' % (
+                elements("I"), elements("J", minOccurs=0),
+                elements("E"), elements("F"), elements("G"),
+                elements("H", minOccurs=0))),
+        [(children(tags), valid) for tags, valid in (
+            ("EI", True), ("EFGHFGI", True), ("EGGHIJ", True),
+            ("EIJI", True), ("EIJIJ", True), ("EIII", False),
+            ("EHI", False), ("EJ", False), ("FEI", False),
+        )],
+    ),
+    Case(
+        "all",
+        root('<xs:all>%s%s</xs:all>' % (
+            elements("J"), elements("K", minOccurs=0))),
+        [(children(tags), valid) for tags, valid in (
+            ("JK", True), ("KJ", True), ("J", True), ("K", False),
+            ("JJ", False),
+        )],
+    ),
+    Case(
+        "extension",
+        schema(
+            '<xs:complexType name="Base"><xs:sequence>%s%s</xs:sequence>'
+            '</xs:complexType>'
+            '<xs:element name="Root"><xs:complexType><xs:complexContent>'
+            '<xs:extension base="Base"><xs:sequence>%s</xs:sequence>'
+            '</xs:extension></xs:complexContent></xs:complexType>'
+            '</xs:element>' % (
+                elements("A"), elements("B", minOccurs=0), elements("C"))),
+        [(children(tags), valid) for tags, valid in (
+            ("ABC", True), ("AC", True), ("CA", False), ("A", False),
+            ("ACB", False),
+        )],
+    ),
+    Case(
+        "nillable",
+        schema(
+            '<xs:element name="Root" nillable="true"><xs:complexType>'
+            '<xs:sequence>'
+            '<xs:element name="M" type="xs:int"/>'
+            '<xs:element name="N" type="xs:int" nillable="true" '
+            'minOccurs="0"/>'
+            '</xs:sequence></xs:complexType></xs:element>'),
+        [(document % XSI, valid) for document, valid in (
+            ('<Root %s><M>1</M><N xsi:nil="true"/></Root>', True),
+            ('<Root %s xsi:nil="true"/>', True),
+            ('<Root %s><M xsi:nil="true"/></Root>', False),
+            ('<Root %s><M xsi:nil="false">1</M></Root>', False),
+            ('<Root %s><M>1</M><N xsi:nil="true">2</N></Root>', False),
+            ('<Root %s><M>1</M><N xsi:nil="yes"/></Root>', False),
+            ('<Root %s xsi:nil="true"><M>1</M></Root>', False),
+        )],
+    ),
+    Case(
+        "element wildcards",
+        schema(
+            '<xs:element name="G1"/>'
+            '<xs:element name="Root"><xs:complexType><xs:sequence>'
+            '<xs:element name="A"/>'
+            '<xs:any namespace="##targetNamespace" minOccurs="0"/>'
+            '<xs:any namespace="##other" processContents="lax" '
+            'minOccurs="0" maxOccurs="unbounded"/>'
+            '</xs:sequence></xs:complexType></xs:element>'
+            '<xs:element name="Z"><xs:complexType><xs:sequence>'
+            '<xs:any namespace="##local urn:y" processContents="skip" '
+            'maxOccurs="2"/>'
+            '</xs:sequence></xs:complexType></xs:element>',
+            'xmlns="urn:t" targetNamespace="urn:t" '
+            'elementFormDefault="qualified"'),
+        [(document, valid) for document, valid in (
+            ('<Root xmlns="urn:t"><A/><G1/></Root>', True),
+            ('<Root xmlns="urn:t"><A/><G1/><x:foo xmlns:x="urn:x"/></Root>',
+             True),
+            ('<Root xmlns="urn:t"><A/><G2/></Root>', False),
+            ('<Root xmlns="urn:t"><A/><G1/><foo xmlns=""/></Root>', False),
+            ('<Root xmlns="urn:t"><A/><G1/><G1/></Root>', False),
+            ('<Root xmlns="urn:t"><A/><x:foo xmlns:x="urn:x"/><G1/></Root>',
+             False),
+            ('<Z xmlns="urn:t"><foo xmlns=""/><y:foo xmlns:y="urn:y"/></Z>',
+             True),
+            ('<Z xmlns="urn:t"><x:foo xmlns:x="urn:x"/></Z>', False),
+            ('<Z xmlns="urn:t"><a xmlns=""/><b xmlns=""/><c xmlns=""/></Z>',
+             False),
+        )],
+    ),
+    Case(
+        "attribute wildcards",
+        schema(
+            '<xs:attribute name="Size" type="xs:int"/>'
+            '<xs:element name="Root"><xs:complexType><xs:sequence>'
+            '<xs:element name="Lax" minOccurs="0"><xs:complexType>'
+            '<xs:anyAttribute namespace="##other" processContents="lax"/>'
+            '</xs:complexType></xs:element>'
+            '<xs:element name="Strict" minOccurs="0"><xs:complexType>'
+            '<xs:anyAttribute namespace="##targetNamespace"/>'
+            '</xs:complexType></xs:element>'
+            '</xs:sequence></xs:complexType></xs:element>',
+            'xmlns:t="urn:t" targetNamespace="urn:t"'),
+        [(document, valid) for document, valid in (
+            ('<t:Root xmlns:t="urn:t"><Lax xmlns:x="urn:x" x:a="1"/>'
+             '</t:Root>', True),
+            ('<t:Root xmlns:t="urn:t"><Lax a="1"/></t:Root>', False),
+            ('<t:Root xmlns:t="urn:t"><Lax t:Size="1"/></t:Root>', False),
+            ('<t:Root xmlns:t="urn:t"><Strict t:Size="1"/></t:Root>', True),
+            ('<t:Root xmlns:t="urn:t"><Strict t:Size="x"/></t:Root>', False),
+            ('<t:Root xmlns:t="urn:t"><Strict t:Other="1"/></t:Root>',
+             False),
+        )],
+    ),
+    values(
+        "xs:date",
+        ["2020-02-29", "2000-02-29Z", "-0004-02-29", "2020-01-01+14:00"],
+        ["2020-13-01", "2020-02-30", "2019-02-29", "1900-02-29",
+         "0000-01-01", "02020-01-01", "2020-01-01+14:01"],
+    ),
+    values(
+        "xs:dateTime",
+        ["2020-01-31T23:59:59.5Z", "2020-01-01T24:00:00"],
+        ["2020-01-01T24:00:01", "2020-01-01T23:60:00",
+         "2020-04-31T00:00:00", "2020-01-01"],
+    ),
+    values("xs:time", ["00:00:00", "23:59:59.999"], ["23:59:60", "1:00:00"]),
+    values(
+        "xs:gMonthDay", ["--02-29", "--12-31"], ["--02-30", "--04-31"]),
+    values("xs:int", ["-2147483648", " 7 "], ["2147483648", "1.0", ""]),
+    values("xs:hexBinary", ["", "0aFF"], ["0aF", "0a FF"]),
+    values("xs:language", ["en", "en-US"], ["toolonglang", "en_US"]),
+    values("xs:boolean", ["true", "0"], ["yes", "True"]),
+    Case(
+        "facets",
+        schema(
+            '<xs:simpleType name="Code"><xs:restriction base="xs:string">'
+            '<xs:pattern value="[A-Z]{2}[0-9]?"/><xs:maxLength value="3"/>'
+            '</xs:restriction></xs:simpleType>'
+            '<xs:simpleType name="Kind"><xs:restriction base="xs:token">'
+            '<xs:enumeration value="A"/><xs:enumeration value="B"/>'
+            '</xs:restriction></xs:simpleType>'
+            '<xs:simpleType name="Amount"><xs:restriction base="xs:decimal">'
+            '<xs:minExclusive value="0"/><xs:maxInclusive value="100"/>'
+            '<xs:fractionDigits value="2"/>'
+            '</xs:restriction></xs:simpleType>'
+            '<xs:simpleType name="Sizes"><xs:list itemType="xs:int"/>'
+            '</xs:simpleType>'
+            '<xs:simpleType name="Limit"><xs:union memberTypes="xs:int">'
+            '<xs:simpleType><xs:restriction base="xs:string">'
+            '<xs:enumeration value="none"/></xs:restriction></xs:simpleType>'
+            '</xs:union></xs:simpleType>'
+            '<xs:element name="Root"><xs:complexType><xs:sequence>'
+            '<xs:element name="Code" type="Code" minOccurs="0"/>'
+            '<xs:element name="Kind" type="Kind" minOccurs="0"/>'
+            '<xs:element name="Amount" type="Amount" minOccurs="0"/>'
+            '<xs:element name="Sizes" type="Sizes" minOccurs="0"/>'
+            '<xs:element name="Limit" type="Limit" minOccurs="0"/>'
+            '</xs:sequence></xs:complexType></xs:element>'),
+        [("<Root>%s</Root>" % content, valid) for content, valid in (
+            ("<Code>AB1</Code><Kind> B </Kind><Amount>99.99</Amount>"
+             "<Sizes>1 2  3</Sizes><Limit>none</Limit>", True),
+            ("<Limit>12</Limit>", True),
+            ("<Code>AB12</Code>", False),
+            ("<Code>ab</Code>", False),
+            ("<Kind>C</Kind>", False),
+            ("<Amount>0</Amount>", False),
+            ("<Amount>100.001</Amount>", False),
+            ("<Amount>1.005</Amount>", False),
+            ("<Sizes>1 x</Sizes>", False),
+            ("<Limit>some</Limit>", False),
+        )],
+    ),
+    Case(
+        "mixed and simple content",
+        schema(
+            '<xs:complexType name="Price"><xs:simpleContent>'
+            '<xs:extension base="xs:decimal">'
+            '<xs:attribute name="Currency" type="xs:string" use="required"/>'
+            '</xs:extension></xs:simpleContent></xs:complexType>'
+            '<xs:element name="Root"><xs:complexType mixed="true">'
+            '<xs:sequence>'
+            '<xs:element name="Price" type="Price" maxOccurs="unbounded"/>'
+            '</xs:sequence></xs:complexType></xs:element>'),
+        [("<Root>%s</Root>" % content, valid) for content, valid in (
+            ('text <Price Currency="EUR">1.5</Price> more', True),
+            ('<Price>1.5</Price>', False),
+            ('<Price Currency="EUR">x</Price>', False),
+            ('<Price Currency="EUR" Rate="1">1</Price>', False),
+            ('<Price Currency="EUR"><Price Currency="EUR">1</Price></Price>',
+             False),
+        )],
+    ),
+]
@@ -0,0 +1,490 @@
+# Compiles the loaded schema model into dispatch tables: each complex type
+# gets one TypeTable mapping the tags of its child elements and the names of
+# its attributes to the tables and simple checks of their types, and the
+# automaton of its content model. The tables are computed once per project,
+# the validator only does dict lookups per element.
+from collections import namedtuple
+
+from xsd2go.constants import XSD_NAMESPACE
+from xsd2go.xsd.node.complex_type import (
+    ComplexContent, ComplexContentRestriction, ComplexType, Extension,
+    SimpleContent
+)
+from xsd2go.xsd.node.element_collection import (
+    All, Choice, ElementCollection, Group
+)
+from xsd2go.xsd.node.simple_type import SimpleType
+from xsd2go.xsd.node.type_decorator import List, SimpleTypeRestriction, Union
+from xsd2go.xsd.util import parse_occurs
+
+from .content import (
+    ALL, CHOICE, ELEMENT, EMPTY_AUTOMATON, SEQUENCE, WILDCARD, Particle,
+    compile_automaton, parse_wildcard, particle_symbols
+)
+from .simple import (
+    ANY_SIMPLE_TYPE, builtin_check, list_of, restrict, union_of
+)
+
+XSI_NAMESPACE = "http://www.w3.org/2001/XMLSchema-instance"
+
+# Types whose content isn't checked
+ANY_TYPES = ("anyType",)
+
+# Child elements of a complex type:
+# - elements: (tag, element, occurs) in content order, occurs are the
+#   (min, max) occurrences of the element in the whole content
+# - particle: Particle of the content
+ContentModel = namedtuple("ContentModel", ["elements", "particle"])
+
+# Compiled declarations of a project:
+# - roots: Clark tag => (TypeTable, nillable) of the elements allowed as
+#   document root
+# - elements: Clark tag => (TypeTable, nillable) of the global elements, for
+#   the wildcards which aren't skipped. Empty if there are none.
+# - attributes: Clark name => parse function of the global attributes, None
+#   if every value is valid. Empty unless elements are needed.
+Declarations = namedtuple("Declarations", ["roots", "elements", "attributes"])
+
+
+class TypeTable(object):
+    # Content model of the elements of a type
+    __slots__ = (
+        "name", "children", "occurs", "counted", "required_children",
+        "transitions", "wildcard_moves", "final", "wildcards", "attributes",
+        "required", "any_attribute", "text", "mixed", "skip",
+    )
+
+    def __init__(self, name):
+        self.name = name
+        # Clark tag => (index, TypeTable, nillable) of the allowed child
+        # elements
+        self.children = {}
+        # (min occurs, max occurs) of the children by index when they are
+        # counted, None if the automaton checks them. max occurs is None
+        # when unbounded.
+        self.occurs = []
+        # True if some children are counted
+        self.counted = False
+        # (index, tag, min occurs) of the counted children which can't be
+        # left out
+        self.required_children = ()
+        # Automaton of the children, see content.Automaton. transitions is
+        # None when the children are only counted, in any order.
+        self.transitions = EMPTY_AUTOMATON.transitions
+        self.wildcard_moves = EMPTY_AUTOMATON.wildcard_moves
+        self.final = EMPTY_AUTOMATON.final
+        # Wildcards of the elements when the children are only counted
+        self.wildcards = ()
+        # Attribute name => parse function of its values, None if every
+        # value is valid
+        self.attributes = {}
+        self.required = ()
+        # Wildcard of the attributes, None if there is no xsd:anyAttribute
+        self.any_attribute = None
+        # SimpleCheck of the text of simple contents, None if the type has
+        # element content
+        self.text = None
+        self.mixed = False
+        # True for anyType, the content isn't checked at all
+        self.skip = False
+
+
+ANY_TYPE_TABLE = TypeTable("anyType")
+ANY_TYPE_TABLE.skip = True
+
+
+def clark_tag(ns, name):
+    if ns:
+        return "{%s}%s" % (ns, name)
+    return name
+
+
+def is_builtin(qname):
+    return qname[0] == XSD_NAMESPACE
+
+
+def form_qualified(node, default_attribute):
+    # True if a local element or attribute is in the target namespace
+    form = node.node.attrib.get("form")
+    if form is None:
+        form = node.schema.root.attrib.get(default_attribute, "unqualified")
+    return form == "qualified"
+
+
+def element_tag(element):
+    if element.ref_element is not None:
+        return element_tag(element.ref_element)
+    if element.parent is not None and not form_qualified(
+        element, "elementFormDefault"
+    ):
+        return element.name
+    return clark_tag(element.schema.target_ns, element.name)
+
+
+def is_nillable(element):
+    # True if the element may be nil with xsi:nil
+    if element.ref_element is not None:
+        return is_nillable(element.ref_element)
+    return element.node.attrib.get("nillable", "false").strip() in (
+        "true", "1")
+
+
+def attribute_name(attribute):
+    if attribute.ref_attribute is not None:
+        return attribute_name(attribute.ref_attribute)
+    if attribute.parent is not None and not form_qualified(
+        attribute, "attributeFormDefault"
+    ):
+        return attribute.name
+    return clark_tag(attribute.schema.target_ns, attribute.name)
+
+
+def merge_occurs(occurs, other):
+    # Occurrences of a tag appearing twice in a content model
+    min_occurs, max_occurs = occurs
+    other_min, other_max = other
+    if max_occurs is None or other_max is None:
+        return min_occurs + other_min, None
+    return min_occurs + other_min, max_occurs + other_max
+
+
+class Compiler(object):
+    # Builds the tables of the types reachable from the root elements. The
+    # tables are registered before they are filled, so recursive types
+    # share one table.
+    def __init__(self, project):
+        self.project = project
+        # id(type instance) => TypeTable
+        self.tables = {}
+        # id(simple type) => SimpleCheck
+        self.simple_checks = {}
+        # True if a wildcard needs the global declarations
+        self.global_wildcards = False
+
+    def root_elements(self, roots=None):
+        if roots:
+            return self.project.root_elements(roots)
+        elements = []
+        for schema in self.project.schemas.values():
+            elements.extend(schema.element_collection)
+        return elements
+
+    def compile(self, roots=None):
+        # Declarations of the root elements, with the global declarations
+        # matched by the wildcards
+        root_tables = self.element_tables(self.root_elements(roots))
+        elements = {}
+        attributes = {}
+        if self.global_wildcards:
+            elements = self.element_tables(self.root_elements())
+            for schema in self.project.schemas.values():
+                for attribute in schema.attribute_collection:
+                    attributes[attribute_name(attribute)] = (
+                        self.attribute_check(attribute).parse)
+        return Declarations(root_tables, elements, attributes)
+
+    def element_tables(self, elements):
+        # Clark tag => (TypeTable, nillable) of the elements
+        return dict(
+            (element_tag(element), (
+                self.element_table(element), is_nillable(element)))
+            for element in elements
+        )
+
+    def element_table(self, element):
+        if element.ref_element is not None:
+            return self.element_table(element.ref_element)
+        if element.nested_type is None:
+            if "type" not in element.node.attrib:
+                return ANY_TYPE_TABLE
+            if is_builtin(element.type_qname):
+                return self.builtin_table(element.type_qname[1])
+        return self.type_table(element.type_instance)
+
+    def builtin_table(self, type_name):
+        if type_name in ANY_TYPES:
+            return ANY_TYPE_TABLE
+        key = (XSD_NAMESPACE, type_name)
+        table = self.tables.get(key)
+        if table is None:
+            table = self.tables[key] = TypeTable(type_name)
+            table.text = builtin_check(type_name)
+        return table
+
+    def type_table(self, type_instance):
+        table = self.tables.get(id(type_instance))
+        if table is not None:
+            return table
+        table = self.tables[id(type_instance)] = TypeTable(
+            type_instance.prefix)
+        if isinstance(type_instance, SimpleType):
+            table.text = self.simple_check(type_instance)
+        else:
+            self.fill(table, type_instance)
+        return table
+
+    def fill(self, table, complex_type):
+        table.mixed = complex_type.node.attrib.get("mixed") == "true"
+        content = complex_type.content
+        if isinstance(content, ComplexContent):
+            table.mixed = table.mixed or (
+                content.node.attrib.get("mixed") == "true")
+        if self.is_any_type(complex_type):
+            table.skip = True
+            return
+
+        table.text = self.text_check(complex_type)
+        if table.text is None:
+            self.add_children(table, self.content_model(complex_type))
+
+        attributes, any_attribute = self.attributes(complex_type)
+        table.attributes = dict(
+            (name, check) for name, (check, _) in attributes.items())
+        table.required = tuple(
+            name for name, (_, required) in attributes.items() if required)
+        table.any_attribute = any_attribute
+
+    def is_any_type(self, complex_type):
+        # Derivations of anyType without their own content
+        content = complex_type.content
+        if not isinstance(content, ComplexContent):
+            return False
+        decorator = content.decorator
+        if decorator is None:
+            return False
+        return (
+            is_builtin(decorator.base_qname)
+            and decorator.base_qname[1] in ANY_TYPES
+            and not decorator.elements and not decorator.attributes
+        )
+
+    def add_children(self, table, content):
+        occurs = []
+        for tag, element, element_occurs in content.elements:
+            if tag in table.children:
+                index = table.children[tag][0]
+                occurs[index] = merge_occurs(occurs[index], element_occurs)
+                continue
+            table.children[tag] = (
+                len(occurs), self.element_table(element),
+                is_nillable(element))
+            occurs.append(element_occurs)
+
+        automaton = compile_automaton(content.particle)
+        if automaton is None:
+            # The children are counted, in any order
+            table.transitions = None
+            table.wildcards = tuple(
+                particle_symbols(content.particle, WILDCARD))
+            counted = table.children
+        else:
+            table.transitions = automaton.transitions
+            table.wildcard_moves = automaton.wildcard_moves
+            table.final = automaton.final
+            counted = automaton.counted
+        table.occurs = [None] * len(occurs)
+        for tag, (index, _, _) in table.children.items():
+            if tag in counted:
+                table.occurs[index] = occurs[index]
+        table.counted = any(
+            element_occurs is not None for element_occurs in table.occurs)
+        table.required_children = tuple(
+            (index, tag, table.occurs[index][0])
+            for tag, (index, _, _) in table.children.items()
+            if table.occurs[index] is not None and table.occurs[index][0] > 0
+        )
+
+    def content_model(self, complex_type):
+        content = complex_type.content
+        if content is None:
+            return self.collection_model(complex_type)
+        decorator = content.decorator
+        if isinstance(decorator, Extension):
+            model = self.collection_model(decorator)
+            base = self.complex_base(decorator)
+            if base is None:
+                return model
+            # The content of the extension comes after the one of the base
+            base_model = self.content_model(base)
+            return ContentModel(
+                base_model.elements + model.elements,
+                Particle(
+                    SEQUENCE, (base_model.particle, model.particle), 1, 1),
+            )
+        if isinstance(decorator, ComplexContentRestriction):
+            return self.collection_model(decorator)
+        return ContentModel([], Particle(SEQUENCE, (), 1, 1))
+
+    def collection_model(self, container):
+        collection = container.element_collection
+        occurs = collection.element_occurs()
+        elements = [
+            (element_tag(element), element, occurs[element])
+            for element in collection.elements
+        ]
+        return ContentModel(elements, self.collection_particle(collection))
+
+    def collection_particle(self, collection, occurs=None):
+        # Particle of a collection, occurs are the ones of the group
+        # reference when it is resolved
+        if occurs is None:
+            occurs = parse_occurs(collection.node.attrib)
+        if isinstance(collection, Group) and collection.ref_qname[1] is not None:
+            ref_ns, ref_name = collection.ref_qname
+            return self.collection_particle(
+                collection.schema.get_element_group(ref_name, ref_ns), occurs)
+        if isinstance(collection, Choice):
+            kind = CHOICE
+        elif isinstance(collection, All):
+            kind = ALL
+        else:
+            kind = SEQUENCE
+        particles = []
+        for particle in collection.particles:
+            if isinstance(particle, ElementCollection):
+                particles.append(self.collection_particle(particle))
+            elif isinstance(particle, dict):
+                # Attributes of xsd:any
+                particles.append(Particle(
+                    WILDCARD, self.wildcard(particle, collection.schema),
+                    *parse_occurs(particle)))
+            else:
+                particles.append(Particle(
+                    ELEMENT, element_tag(particle),
+                    *parse_occurs(particle.node.attrib)))
+        return Particle(kind, tuple(particles), *occurs)
+
+    def wildcard(self, attrib, schema):
+        wildcard = parse_wildcard(attrib, schema.target_ns)
+        if wildcard.process != "skip":
+            self.global_wildcards = True
+        return wildcard
+
+    def complex_base(self, decorator):
+        # Complex type derived by the decorator, None for simple types
+        if is_builtin(decorator.base_qname):
+            return None
+        base = decorator.base_type_instance
+        if isinstance(base, ComplexType):
+            return base
+        return None
+
+    def attributes(self, complex_type):
+        # Attribute name => (parse function, required), Wildcard of
+        # xsd:anyAttribute or None
+        content = complex_type.content
+        if content is None:
+            return self.own_attributes(complex_type, {})
+        decorator = content.decorator
+        if decorator is None:
+            return {}, None
+        inherited = {}
+        any_attribute = None
+        base = self.complex_base(decorator)
+        if base is not None:
+            inherited, any_attribute = self.attributes(base)
+        attributes, own_any_attribute = self.own_attributes(
+            decorator, inherited)
+        if isinstance(decorator, Extension) and any_attribute is not None:
+            if own_any_attribute is None:
+                return attributes, any_attribute
+            return attributes, own_any_attribute.union(any_attribute)
+        # Restrictions only keep their own wildcard
+        return attributes, own_any_attribute
+
+    def own_attributes(self, container, inherited):
+        attributes = dict(inherited)
+        for attribute in container.attributes:
+            name = attribute_name(attribute)
+            use = attribute.node.attrib.get("use", "optional")
+            if use == "prohibited":
+                attributes.pop(name, None)
+                continue
+            attributes[name] = (
+                self.attribute_check(attribute).parse, use == "required")
+        # The wildcards of the attribute groups are intersected with the
+        # one of the container
+        any_attribute = None
+        for schema, attrib in container.attribute_wildcards():
+            wildcard = self.wildcard(attrib, schema)
+            if any_attribute is None:
+                any_attribute = wildcard
+            else:
+                any_attribute = any_attribute.intersection(wildcard)
+        return attributes, any_attribute
+
+    def attribute_check(self, attribute):
+        if attribute.ref_attribute is not None and (
+            attribute.nested_type is None
+        ):
+            return self.attribute_check(attribute.ref_attribute)
+        if attribute.nested_type is None:
+            if "type" not in attribute.node.attrib:
+                return ANY_SIMPLE_TYPE
+            if is_builtin(attribute.type_qname):
+                return builtin_check(attribute.type_qname[1])
+        return self.simple_check(attribute.type_instance)
+
+    def text_check(self, complex_type):
+        # SimpleCheck of a simple content, None for element contents
+        content = complex_type.content
+        if not isinstance(content, SimpleContent) or content.decorator is None:
+            return None
+        decorator = content.decorator
+        if getattr(decorator, "nested_type", None) is not None:
+            return self.simple_check(decorator.nested_type)
+        if is_builtin(decorator.base_qname):
+            return builtin_check(decorator.base_qname[1])
+        base = decorator.base_type_instance
+        if isinstance(base, SimpleType):
+            return self.simple_check(base)
+        return self.text_check(base) or ANY_SIMPLE_TYPE
+
+    def simple_check(self, simple_type):
+        check = self.simple_checks.get(id(simple_type))
+        if check is None:
+            check = self.simple_checks[id(simple_type)] = (
+                self.compile_simple_type(simple_type))
+        return check
+
+    def type_check(self, qname, type_instance_of):
+        # SimpleCheck of a type reference, type_instance_of resolves the
+        # references which aren't builtin types
+        if qname[1] is None:
+            return ANY_SIMPLE_TYPE
+        if is_builtin(qname):
+            return builtin_check(qname[1])
+        type_instance = type_instance_of()
+        if isinstance(type_instance, SimpleType):
+            return self.simple_check(type_instance)
+        return self.text_check(type_instance) or ANY_SIMPLE_TYPE
+
+    def compile_simple_type(self, simple_type):
+        name = simple_type.name or simple_type.prefix
+        content = simple_type.content
+        if isinstance(content, SimpleTypeRestriction):
+            base = self.type_check(
+                content.base_qname, content.base_type_instance)
+            return restrict(name, base, content.facets, content.enumerations)
+        if isinstance(content, List):
+            if content.nested_type is not None:
+                item = self.simple_check(content.nested_type)
+            else:
+                item = self.type_check(
+                    content.item_qname, content.item_type_instance)
+            return list_of(name, item)
+        if isinstance(content, Union):
+            members = []
+            for member_name, type_instance in content.member_type_instances():
+                if type_instance is None:
+                    members.append(builtin_check(member_name))
+                else:
+                    members.append(self.simple_check(type_instance))
+            return union_of(name, members)
+        return ANY_SIMPLE_TYPE
+
+
+def compile_roots(project, roots=None):
+    # Declarations of a loaded project, all the global elements are allowed
+    # as document root unless roots are given
+    return Compiler(project).compile(roots)
@@ -0,0 +1,268 @@
+# Content models compiled into deterministic automata: the particles are
+# unrolled into positions, linked with the Glushkov construction and the sets
+# of positions reachable after each child element become the states. The
+# validator only does one dict lookup per child element, whatever the nesting
+# and the occurrences of the sequences and choices.
+from collections import namedtuple
+
+# Kinds of particles
+ELEMENT = "element"
+WILDCARD = "wildcard"
+SEQUENCE = "sequence"
+CHOICE = "choice"
+ALL = "all"
+
+# Particle of a content model:
+# - kind: one of the kinds above
+# - value: Clark tag of an element, Wildcard, or the particles of a
+#   collection
+# - min_occurs, max_occurs: max_occurs is None when unbounded
+Particle = namedtuple(
+    "Particle", ["kind", "value", "min_occurs", "max_occurs"])
+
+# Occurrences unrolled into positions, the bigger ones are checked by
+# counting the elements instead
+MAX_UNROLLED = 16
+# Sizes above which the content model isn't compiled
+MAX_POSITIONS = 4096
+MAX_STATES = 4096
+
+# Automaton of a content model, state 0 is the initial state:
+# - transitions: Clark tag => next state, by state
+# - wildcard_moves: (Wildcard, next state) by state
+# - final: True by state if the content may end there
+# - counted: Clark tags whose occurrences aren't fully checked by the
+#   automaton
+Automaton = namedtuple(
+    "Automaton", ["transitions", "wildcard_moves", "final", "counted"])
+
+
+class Wildcard(object):
+    # Namespace constraint and processContents of xsd:any or xsd:anyAttribute
+    __slots__ = ("namespaces", "negated", "process")
+
+    def __init__(self, namespaces, negated, process):
+        # Allowed namespaces, or the excluded ones when negated. The empty
+        # namespace stands for the names without namespace.
+        self.namespaces = frozenset(namespaces)
+        self.negated = negated
+        # strict, lax or skip
+        self.process = process
+
+    def allows(self, ns):
+        return (ns in self.namespaces) != self.negated
+
+    def intersection(self, other):
+        if not self.negated and not other.negated:
+            namespaces, negated = self.namespaces & other.namespaces, False
+        elif self.negated and other.negated:
+            namespaces, negated = self.namespaces | other.namespaces, True
+        elif self.negated:
+            namespaces, negated = other.namespaces - self.namespaces, False
+        else:
+            namespaces, negated = self.namespaces - other.namespaces, False
+        return Wildcard(namespaces, negated, self.process)
+
+    def union(self, other):
+        if not self.negated and not other.negated:
+            namespaces, negated = self.namespaces | other.namespaces, False
+        elif self.negated and other.negated:
+            namespaces, negated = self.namespaces & other.namespaces, True
+        elif self.negated:
+            namespaces, negated = self.namespaces - other.namespaces, True
+        else:
+            namespaces, negated = other.namespaces - self.namespaces, True
+        return Wildcard(namespaces, negated, self.process)
+
+
+def parse_wildcard(attrib, target_ns):
+    # Wildcard of the attributes of xsd:any or xsd:anyAttribute
+    target_ns = target_ns or ""
+    process = attrib.get("processContents", "strict")
+    namespace = attrib.get("namespace", "##any").split()
+    if namespace == ["##any"]:
+        return Wildcard((), True, process)
+    if namespace == ["##other"]:
+        # Neither the target namespace nor the names without namespace
+        return Wildcard((target_ns, ""), True, process)
+    tokens = {"##targetNamespace": target_ns, "##local": ""}
+    return Wildcard(
+        [tokens.get(token, token) for token in namespace], False, process)
+
+
+def namespace_of(tag):
+    if tag.startswith("{"):
+        return tag[1:tag.index("}")]
+    return ""
+
+
+# Fragment of the empty content
+EMPTY_FRAGMENT = (True, frozenset(), frozenset())
+
+
+def optional(fragment):
+    _, first, last = fragment
+    return True, first, last
+
+
+class PositionBuilder(object):
+    # Glushkov construction of the positions of a particle: the fragments
+    # are (nullable, first positions, last positions) and follow holds the
+    # positions which may come after each position
+    def __init__(self):
+        # Clark tag or Wildcard by position, position 0 is the start
+        self.symbols = [None]
+        self.follow = [set()]
+        # Tags of the particles whose occurrences were bounded
+        self.counted = set()
+
+    def position(self, symbol):
+        if len(self.symbols) >= MAX_POSITIONS:
+            raise OverflowError("too many positions")
+        self.symbols.append(symbol)
+        self.follow.append(set())
+        return len(self.symbols) - 1
+
+    def concat(self, fragment, other):
+        nullable, first, last = fragment
+        other_nullable, other_first, other_last = other
+        for position in last:
+            self.follow[position].update(other_first)
+        return (
+            nullable and other_nullable,
+            first | other_first if nullable else first,
+            other_last | last if other_nullable else other_last,
+        )
+
+    def loop(self, fragment):
+        _, first, last = fragment
+        for position in last:
+            self.follow[position].update(first)
+        return fragment
+
+    def particle(self, particle):
+        min_occurs, max_occurs = particle.min_occurs, particle.max_occurs
+        if (max_occurs is not None and max_occurs > MAX_UNROLLED) or (
+            min_occurs > MAX_UNROLLED
+        ):
+            # Unbounded in the automaton, the bounds are counted
+            self.counted.update(particle_symbols(particle, ELEMENT))
+            min_occurs = min(min_occurs, MAX_UNROLLED)
+            max_occurs = None
+        fragment = EMPTY_FRAGMENT
+        for copy in range(min_occurs):
+            body = self.body(particle)
+            if max_occurs is None and copy == min_occurs - 1:
+                # The last required copy repeats
+                body = self.loop(body)
+            fragment = self.concat(fragment, body)
+        if max_occurs is None:
+            if min_occurs == 0:
+                body = self.loop(self.body(particle))
+                fragment = self.concat(fragment, optional(body))
+            return fragment
+        for _ in range(max_occurs - min_occurs):
+            fragment = self.concat(fragment, optional(self.body(particle)))
+        return fragment
+
+    def body(self, particle):
+        kind = particle.kind
+        if kind in (ELEMENT, WILDCARD):
+            position = frozenset((self.position(particle.value),))
+            return False, position, position
+        if kind == SEQUENCE:
+            fragment = EMPTY_FRAGMENT
+            for child in particle.value:
+                fragment = self.concat(fragment, self.particle(child))
+            return fragment
+        if kind == CHOICE:
+            nullable = not particle.value
+            first = frozenset()
+            last = frozenset()
+            for child in particle.value:
+                child_nullable, child_first, child_last = self.particle(child)
+                nullable = nullable or child_nullable
+                first = first | child_first
+                last = last | child_last
+            return nullable, first, last
+        raise OverflowError("xsd:all isn't compiled")
+
+
+def particle_symbols(particle, kind):
+    # Clark tags (ELEMENT) or Wildcards (WILDCARD) of a particle
+    if particle.kind == kind:
+        return [particle.value]
+    if particle.kind in (ELEMENT, WILDCARD):
+        return []
+    symbols = []
+    for child in particle.value:
+        symbols.extend(particle_symbols(child, kind))
+    return symbols
+
+
+def compile_automaton(particle):
+    # Automaton of the content model of a particle, None if it uses xsd:all
+    # or is too big, the occurrences of its elements are then counted
+    builder = PositionBuilder()
+    try:
+        nullable, first, last = builder.particle(particle)
+    except OverflowError:
+        return None
+    symbols = builder.symbols
+    follow = builder.follow
+    follow[0].update(first)
+    final_positions = set(last)
+    if nullable:
+        final_positions.add(0)
+
+    start = frozenset((0,))
+    states = {start: 0}
+    order = [start]
+
+    def state(positions):
+        positions = frozenset(positions)
+        index = states.get(positions)
+        if index is None:
+            index = states[positions] = len(order)
+            order.append(positions)
+        return index
+
+    transitions = []
+    wildcard_moves = []
+    final = []
+    for positions in order:
+        if len(order) > MAX_STATES:
+            return None
+        next_tags = {}
+        # id(Wildcard) => (Wildcard, positions), the copies of an unrolled
+        # wildcard share their Wildcard
+        next_wildcards = {}
+        for position in sorted(positions):
+            for next_position in sorted(follow[position]):
+                symbol = symbols[next_position]
+                if isinstance(symbol, Wildcard):
+                    next_wildcards.setdefault(
+                        id(symbol), (symbol, set()))[1].add(next_position)
+                else:
+                    next_tags.setdefault(symbol, set()).add(next_position)
+        for tag, tag_positions in next_tags.items():
+            ns = namespace_of(tag)
+            for wildcard, wildcard_positions in next_wildcards.values():
+                if wildcard.allows(ns):
+                    tag_positions.update(wildcard_positions)
+        transitions.append(dict(
+            (tag, state(tag_positions))
+            for tag, tag_positions in next_tags.items()
+        ))
+        wildcard_moves.append(tuple(
+            (wildcard, state(wildcard_positions))
+            for wildcard, wildcard_positions in next_wildcards.values()
+        ))
+        final.append(not positions.isdisjoint(final_positions))
+    return Automaton(
+        tuple(transitions), tuple(wildcard_moves), tuple(final),
+        frozenset(builder.counted))
+
+
+# Automaton of the contents without child elements
+EMPTY_AUTOMATON = Automaton(({},), ((),), (True,), frozenset())
@@ -0,0 +1,121 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+from lxml import etree
+
+from xsd2go.validation.validator import DocumentValidator
+from xsd2go.xsd.project import Project
+
+
+parser = argparse.ArgumentParser(
+    description="Validates xml documents with tables compiled from the xsd "
+                "files, the invalid contents are printed one per line")
+
+parser.add_argument("path", type=str, help="XSD file repo path")
+parser.add_argument("documents", nargs="+", help="xml documents to validate")
+
+parser.add_argument(
+    "--root", type=str, action="append", default=[],
+    help="root element, as {namespace}name or name, allowed as the document "
+         "element. May be repeated, all the global elements are allowed by "
+         "default"
+)
+parser.add_argument(
+    "--jobs", type=int, default=1,
+    help="number of worker processes used to load the xsd files"
+)
+parser.add_argument(
+    "--streaming", default=False, action="store_true",
+    help="load the xsd files with the streaming loader"
+)
+parser.add_argument(
+    "--cache-dir", type=str, default=None,
+    help="directory caching the parsed xsd files between runs"
+)
+parser.add_argument(
+    "--compare", type=str, default=None, metavar="XSD_FILE",
+    help="also validate the documents with lxml.etree.XMLSchema built from "
+         "this file, and print the timings of both validators as JSON "
+         "instead of the errors"
+)
+parser.add_argument(
+    "--repeat", type=int, default=1,
+    help="number of times the documents are validated by --compare"
+)
+
+
+def timed(validate, documents, repeat):
+    # (seconds of the fastest pass over the documents, invalid documents)
+    best = None
+    for _ in range(repeat):
+        invalid = 0
+        start = time.perf_counter()
+        for document in documents:
+            if not validate(document):
+                invalid += 1
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, invalid
+
+
+def compare(validator, xsd_file, documents, repeat):
+    def rebuilt(document):
+        # The schema is interpreted again for each document
+        schema = etree.XMLSchema(etree.parse(xsd_file))
+        return schema.validate(etree.parse(document))
+
+    schema = etree.XMLSchema(etree.parse(xsd_file))
+
+    def cached(document):
+        return schema.validate(etree.parse(document))
+
+    size = sum(os.path.getsize(document) for document in documents)
+    results = {"documents": len(documents), "bytes": size, "validators": {}}
+    for name, validate in (
+        ("lxml_rebuilt", rebuilt),
+        ("lxml_cached", cached),
+        ("compiled", validator.is_valid),
+    ):
+        elapsed, invalid = timed(validate, documents, repeat)
+        results["validators"][name] = {
+            "seconds": elapsed,
+            "mb_per_second": size / elapsed / 1e6 if elapsed else None,
+            "invalid": invalid,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    project = Project(
+        args.path, cache_path=args.cache_dir, streaming=args.streaming)
+    # Progress messages of the project don't go to the results
+    with contextlib.redirect_stdout(sys.stderr):
+        project.load_schema(jobs=args.jobs, roots=args.root)
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    validator = DocumentValidator.from_project(project, args.root)
+    compile_time = time.perf_counter() - start
+
+    if args.compare is not None:
+        results = compare(validator, args.compare, args.documents, args.repeat)
+        results["load_seconds"] = load_time
+        results["compile_seconds"] = compile_time
+        json.dump(results, sys.stdout, indent=1, sort_keys=True)
+        print()
+        sys.exit(0)
+
+    valid = True
+    for document in args.documents:
+        for error in validator.validate(document):
+            valid = False
+            print("%s:%s: %s: %s" % (
+                document, error.line, error.path, error.message))
+    sys.exit(0 if valid else 1)
@@ -0,0 +1,157 @@
+import argparse
+import contextlib
+import copy
+import io
+import random
+import sys
+import tempfile
+from os.path import join
+
+from lxml import etree
+
+from xsd2go.validation.cases import CASES
+from xsd2go.validation.validator import DocumentValidator
+from xsd2go.xsd.project import Project
+
+
+parser = argparse.ArgumentParser(
+    description="Validates documents with the compiled validator and with "
+                "lxml.etree.XMLSchema and prints the documents on which they "
+                "disagree. The builtin cases are checked unless --path is "
+                "given.")
+
+parser.add_argument(
+    "--fuzz", type=int, default=0,
+    help="number of documents mutated from each valid document")
+parser.add_argument("--seed", type=int, default=0)
+parser.add_argument(
+    "--path", type=str, default=None,
+    help="XSD file repo path of the documents, instead of the builtin cases")
+parser.add_argument(
+    "--xsd", type=str, default=None,
+    help="xsd file of --path loaded by lxml")
+parser.add_argument(
+    "documents", nargs="*", help="valid documents of --path")
+
+# Texts and attribute values set by the mutations
+MUTATION_VALUES = (
+    "", "x", "1", "-1", "0", "100", "100.001", "9.995", "1.5", "true", "a b",
+    "AB7", " 12 ", "NaN", "INF", "1e3", "none", "2020-01-01", "2020-02-30",
+    "2020-1-1", "0aF", "0aFF", "en-US", "toolonglang",
+)
+
+
+def mutate(document, rng):
+    # Copy of the document with one or two random changes: a text or
+    # attribute replaced, an element or attribute removed, an element
+    # duplicated or moved
+    document = copy.deepcopy(document)
+    for _ in range(rng.randint(1, 2)):
+        elements = list(document.getroot().iter(etree.Element))
+        element = rng.choice(elements)
+        parent = element.getparent()
+        operation = rng.randrange(6)
+        if operation == 0 and parent is not None and len(element) == 0:
+            element.text = rng.choice(MUTATION_VALUES)
+        elif operation == 1 and parent is not None:
+            parent.remove(element)
+        elif operation == 2 and parent is not None:
+            element.addnext(copy.deepcopy(element))
+        elif operation == 3 and element.attrib:
+            element.set(
+                rng.choice(list(element.attrib)),
+                rng.choice(MUTATION_VALUES))
+        elif operation == 4 and element.attrib:
+            del element.attrib[rng.choice(list(element.attrib))]
+        elif operation == 5 and parent is not None:
+            parent.remove(element)
+            parent.insert(rng.randrange(len(parent) + 1), element)
+    return document
+
+
+class Parity(object):
+    # Compares the validators on the documents of one schema
+    def __init__(self, name, project_path, xsd_file):
+        project = Project(project_path)
+        # Progress messages of the project don't go to the report
+        with contextlib.redirect_stdout(sys.stderr):
+            project.load_schema()
+        self.name = name
+        self.validator = DocumentValidator.from_project(project)
+        self.schema = etree.XMLSchema(etree.parse(xsd_file))
+        self.documents = 0
+        self.disagreements = 0
+
+    def check(self, text, expected=None):
+        # Reports the document if the validators disagree with each other
+        # or with the expected result
+        self.documents += 1
+        lxml_valid = self.schema.validate(etree.fromstring(text))
+        errors = self.validator.validate(io.BytesIO(text))
+        results = {lxml_valid, not errors}
+        if expected is not None:
+            results.add(expected)
+        if len(results) == 1:
+            return
+        self.disagreements += 1
+        print("%s: lxml %s, compiled %s, expected %s" % (
+            self.name, valid_name(lxml_valid), valid_name(not errors),
+            valid_name(expected)))
+        print("  " + text.decode("utf8"))
+        for error in self.schema.error_log:
+            print("  lxml: %s" % error.message)
+        for error in errors:
+            print("  compiled: %s: %s" % (error.path, error.message))
+
+    def fuzz(self, text, count, rng):
+        document = etree.ElementTree(etree.fromstring(text))
+        for _ in range(count):
+            self.check(etree.tostring(mutate(document, rng)))
+
+
+def valid_name(valid):
+    if valid is None:
+        return "-"
+    return "valid" if valid else "invalid"
+
+
+def check_cases(fuzz, rng):
+    documents = disagreements = 0
+    for case in CASES:
+        with tempfile.TemporaryDirectory() as path:
+            xsd_file = join(path, "schema.xsd")
+            with open(xsd_file, "w") as fout:
+                fout.write(case.schema)
+            parity = Parity(case.name, path, xsd_file)
+            for text, valid in case.documents:
+                text = text.encode("utf8")
+                parity.check(text, valid)
+                if valid:
+                    parity.fuzz(text, fuzz, rng)
+        documents += parity.documents
+        disagreements += parity.disagreements
+    return documents, disagreements
+
+
+def check_documents(path, xsd_file, documents, fuzz, rng):
+    parity = Parity(path, path, xsd_file)
+    for document in documents:
+        with open(document, "rb") as fin:
+            text = fin.read()
+        parity.check(text)
+        parity.fuzz(text, fuzz, rng)
+    return parity.documents, parity.disagreements
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    if args.path is not None:
+        if args.xsd is None:
+            parser.error("--xsd is required with --path")
+        documents, disagreements = check_documents(
+            args.path, args.xsd, args.documents, args.fuzz, rng)
+    else:
+        documents, disagreements = check_cases(args.fuzz, rng)
+    print("%d documents, %d disagreements" % (documents, disagreements))
+    sys.exit(1 if disagreements else 0)
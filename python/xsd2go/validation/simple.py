@@ -0,0 +1,448 @@
+# Checks of the simple values: each simple type is compiled once into a
+# function parsing a text into its value, which raises ValueError when the
+# text isn't in the lexical space of the type or doesn't satisfy its facets.
+import base64
+import binascii
+import operator
+import re
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+
+from xsd2go.golang.validate import go_regexp
+
+# Kinds of values, the facets which apply to a type depend on its kind
+STRING = "string"
+NUMBER = "number"
+BINARY = "binary"
+LIST = "list"
+OTHER = "other"
+
+# Compiled simple type:
+# - parse: text => value, raises ValueError. None if every text is valid,
+#   the value is then the text itself.
+# - kind: kind of the values
+SimpleCheck = namedtuple("SimpleCheck", ["parse", "kind"])
+
+XML_SPACES = " \t\n\r"
+XML_SPACE_RE = re.compile("[ \t\n\r]+")
+
+
+def collapse(text):
+    return XML_SPACE_RE.sub(" ", text).strip(" ")
+
+
+def replace(text):
+    return text.translate({9: 32, 10: 32, 13: 32})
+
+
+def regexp_parser(type_name, regexp):
+    # Parser of the types whose values are their collapsed text
+    match = re.compile(regexp).fullmatch
+
+    def parse(text):
+        value = collapse(text)
+        if match(value) is None:
+            raise ValueError("invalid %s %r" % (type_name, text))
+        return value
+    return parse
+
+
+INTEGER_RE = re.compile("[+-]?[0-9]+")
+DECIMAL_RE = re.compile(r"[+-]?([0-9]+(\.[0-9]*)?|\.[0-9]+)")
+FLOAT_RE = re.compile(
+    r"[+-]?([0-9]+(\.[0-9]*)?|\.[0-9]+)([eE][+-]?[0-9]+)?|[+-]?INF|NaN")
+
+
+def integer_parser(type_name, low, high):
+    match = INTEGER_RE.fullmatch
+
+    def parse(text):
+        value = text.strip(XML_SPACES)
+        if match(value) is None:
+            raise ValueError("invalid %s %r" % (type_name, text))
+        value = int(value)
+        if (low is not None and value < low) or (
+            high is not None and value > high
+        ):
+            raise ValueError("%s %d is out of range" % (type_name, value))
+        return value
+    return parse
+
+
+def parse_decimal(text):
+    value = text.strip(XML_SPACES)
+    if DECIMAL_RE.fullmatch(value) is None:
+        raise ValueError("invalid decimal %r" % text)
+    return Decimal(value)
+
+
+def parse_float(text):
+    value = text.strip(XML_SPACES)
+    if FLOAT_RE.fullmatch(value) is None:
+        raise ValueError("invalid float %r" % text)
+    return float(value)
+
+
+BOOLEANS = {"true": True, "1": True, "false": False, "0": False}
+
+
+def parse_boolean(text):
+    value = BOOLEANS.get(text.strip(XML_SPACES))
+    if value is None:
+        raise ValueError("invalid boolean %r" % text)
+    return value
+
+
+HEX_BINARY_RE = re.compile("([0-9a-fA-F]{2})*")
+
+
+def parse_hex_binary(text):
+    value = text.strip(XML_SPACES)
+    if HEX_BINARY_RE.fullmatch(value) is None:
+        raise ValueError("invalid hexBinary %r" % text)
+    return bytes.fromhex(value)
+
+
+def parse_base64_binary(text):
+    try:
+        return base64.b64decode(XML_SPACE_RE.sub("", text), validate=True)
+    except binascii.Error:
+        raise ValueError("invalid base64Binary %r" % text)
+
+
+# Fields of the date and time types, the ranges of their values are checked
+# by valid_calendar. Years have no leading zeros beyond four digits.
+YEAR = "(?P<year>-?([1-9][0-9]{4,}|[0-9]{4}))"
+MONTH = "(?P<month>[0-9]{2})"
+DAY = "(?P<day>[0-9]{2})"
+TIME = r"(?P<hour>[0-9]{2}):(?P<minute>[0-9]{2}):(?P<second>[0-9]{2}(\.[0-9]+)?)"
+TIMEZONE = r"(Z|[+-](?P<tzhour>[0-9]{2}):(?P<tzminute>[0-9]{2}))?"
+
+# Days of the months of a leap year
+MONTH_DAYS = (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def is_leap(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def valid_calendar(fields):
+    # True if the fields matched by a date or time pattern are in range, the
+    # fields the type doesn't have are None
+    year, month, day = fields.get("year"), fields.get("month"), fields.get(
+        "day")
+    if year is not None and int(year) == 0:
+        return False
+    if month is not None and not 1 <= int(month) <= 12:
+        return False
+    if day is not None:
+        days = 31 if month is None else MONTH_DAYS[int(month) - 1]
+        if days == 29 and year is not None and not is_leap(int(year)):
+            days = 28
+        if not 1 <= int(day) <= days:
+            return False
+    hour = fields.get("hour")
+    if hour is not None:
+        minute = int(fields["minute"])
+        second = Decimal(fields["second"])
+        if int(hour) == 24:
+            # End of the day, the same instant as 00:00:00 of the next one
+            if minute != 0 or second != 0:
+                return False
+        elif int(hour) > 23 or minute > 59 or second >= 60:
+            return False
+    tz_hour = fields.get("tzhour")
+    if tz_hour is not None:
+        tz_minute = int(fields["tzminute"])
+        if tz_minute > 59 or int(tz_hour) * 60 + tz_minute > 14 * 60:
+            return False
+    return True
+
+
+def calendar_parser(type_name, regexp):
+    # Parser of the date and time types, their values are their collapsed
+    # text
+    match = re.compile(regexp).fullmatch
+
+    def parse(text):
+        value = collapse(text)
+        fields = match(value)
+        if fields is None or not valid_calendar(fields.groupdict()):
+            raise ValueError("invalid %s %r" % (type_name, text))
+        return value
+    return parse
+
+
+def list_parser(type_name, item):
+    def parse(text):
+        return tuple(item(value) for value in text.split())
+    return parse
+
+
+# Characters of the xml names, as regular expression classes
+NAME_START = (
+    ":A-Z_a-z\u00c0-\u00d6\u00d8-\u00f6\u00f8-\u02ff\u0370-\u037d"
+    "\u037f-\u1fff\u200c-\u200d\u2070-\u218f\u2c00-\u2fef"
+    "\u3001-\ud7ff\uf900-\ufdcf\ufdf0-\ufffd"
+)
+NAME_CHAR = NAME_START + ".0-9\u00b7\u0300-\u036f\u203f-\u2040-"
+NAME = "[%s][%s]*" % (NAME_START, NAME_CHAR)
+NCNAME = "[%s][%s]*" % (NAME_START[1:], NAME_CHAR[1:])
+
+
+parse_nmtoken = regexp_parser("NMTOKEN", "[%s]+" % NAME_CHAR)
+parse_name = regexp_parser("Name", NAME)
+parse_ncname = regexp_parser("NCName", NCNAME)
+
+# xsd builtin type => SimpleCheck, the unknown builtin types are strings
+BUILTINS = {
+    "string": SimpleCheck(None, STRING),
+    "normalizedString": SimpleCheck(replace, STRING),
+    "token": SimpleCheck(collapse, STRING),
+    "language": SimpleCheck(regexp_parser(
+        "language", "[a-zA-Z]{1,8}(-[a-zA-Z0-9]{1,8})*"), STRING),
+    "NMTOKEN": SimpleCheck(parse_nmtoken, STRING),
+    "NMTOKENS": SimpleCheck(list_parser("NMTOKENS", parse_nmtoken), LIST),
+    "Name": SimpleCheck(parse_name, STRING),
+    "NCName": SimpleCheck(parse_ncname, STRING),
+    "ID": SimpleCheck(parse_ncname, STRING),
+    "IDREF": SimpleCheck(parse_ncname, STRING),
+    "IDREFS": SimpleCheck(list_parser("IDREFS", parse_ncname), LIST),
+    "ENTITY": SimpleCheck(parse_ncname, STRING),
+    "ENTITIES": SimpleCheck(list_parser("ENTITIES", parse_ncname), LIST),
+    "QName": SimpleCheck(regexp_parser(
+        "QName", "(%s:)?%s" % (NCNAME, NCNAME)), STRING),
+    "anyURI": SimpleCheck(collapse, STRING),
+
+    "boolean": SimpleCheck(parse_boolean, OTHER),
+    "decimal": SimpleCheck(parse_decimal, NUMBER),
+    "float": SimpleCheck(parse_float, NUMBER),
+    "double": SimpleCheck(parse_float, NUMBER),
+    "integer": SimpleCheck(integer_parser("integer", None, None), NUMBER),
+    "nonPositiveInteger": SimpleCheck(
+        integer_parser("nonPositiveInteger", None, 0), NUMBER),
+    "negativeInteger": SimpleCheck(
+        integer_parser("negativeInteger", None, -1), NUMBER),
+    "nonNegativeInteger": SimpleCheck(
+        integer_parser("nonNegativeInteger", 0, None), NUMBER),
+    "positiveInteger": SimpleCheck(
+        integer_parser("positiveInteger", 1, None), NUMBER),
+    "long": SimpleCheck(
+        integer_parser("long", -1 << 63, (1 << 63) - 1), NUMBER),
+    "int": SimpleCheck(
+        integer_parser("int", -1 << 31, (1 << 31) - 1), NUMBER),
+    "short": SimpleCheck(
+        integer_parser("short", -1 << 15, (1 << 15) - 1), NUMBER),
+    "byte": SimpleCheck(
+        integer_parser("byte", -1 << 7, (1 << 7) - 1), NUMBER),
+    "unsignedLong": SimpleCheck(
+        integer_parser("unsignedLong", 0, (1 << 64) - 1), NUMBER),
+    "unsignedInt": SimpleCheck(
+        integer_parser("unsignedInt", 0, (1 << 32) - 1), NUMBER),
+    "unsignedShort": SimpleCheck(
+        integer_parser("unsignedShort", 0, (1 << 16) - 1), NUMBER),
+    "unsignedByte": SimpleCheck(
+        integer_parser("unsignedByte", 0, (1 << 8) - 1), NUMBER),
+
+    "hexBinary": SimpleCheck(parse_hex_binary, BINARY),
+    "base64Binary": SimpleCheck(parse_base64_binary, BINARY),
+
+    "dateTime": SimpleCheck(calendar_parser(
+        "dateTime", "%s-%s-%sT%s%s" % (YEAR, MONTH, DAY, TIME, TIMEZONE)),
+        OTHER),
+    "date": SimpleCheck(calendar_parser(
+        "date", "%s-%s-%s%s" % (YEAR, MONTH, DAY, TIMEZONE)), OTHER),
+    "time": SimpleCheck(calendar_parser("time", TIME + TIMEZONE), OTHER),
+    "gYear": SimpleCheck(calendar_parser("gYear", YEAR + TIMEZONE), OTHER),
+    "gYearMonth": SimpleCheck(calendar_parser(
+        "gYearMonth", "%s-%s%s" % (YEAR, MONTH, TIMEZONE)), OTHER),
+    "gMonth": SimpleCheck(calendar_parser(
+        "gMonth", "--%s%s" % (MONTH, TIMEZONE)), OTHER),
+    "gMonthDay": SimpleCheck(calendar_parser(
+        "gMonthDay", "--%s-%s%s" % (MONTH, DAY, TIMEZONE)), OTHER),
+    "gDay": SimpleCheck(calendar_parser(
+        "gDay", "---%s%s" % (DAY, TIMEZONE)), OTHER),
+    "duration": SimpleCheck(regexp_parser(
+        "duration",
+        r"-?P(?=[0-9]|T[0-9])([0-9]+Y)?([0-9]+M)?([0-9]+D)?"
+        r"(T(?=[0-9])([0-9]+H)?([0-9]+M)?([0-9]+(\.[0-9]+)?S)?)?"), OTHER),
+}
+
+ANY_SIMPLE_TYPE = BUILTINS["string"]
+
+
+def builtin_check(type_name):
+    return BUILTINS.get(type_name, ANY_SIMPLE_TYPE)
+
+
+# Constructs of the xsd regular expressions which re doesn't have, on top of
+# the ones regexp doesn't have
+UNSUPPORTED_PATTERNS = ("\\p", "\\P")
+
+
+def python_regexp(pattern):
+    # Compiled regular expression of a xsd pattern, None if it can't be
+    # translated
+    if any(construct in pattern for construct in UNSUPPORTED_PATTERNS):
+        return None
+    regexp = go_regexp(pattern)
+    if regexp is None:
+        return None
+    try:
+        return re.compile(regexp)
+    except re.error:
+        return None
+
+
+def decimal_digits(value):
+    # (total digits, fraction digits) of a decimal value, the trailing zeros
+    # of the fraction aren't significant
+    sign, digits, exponent = Decimal(value).as_tuple()
+    digits = list(digits)
+    while exponent < 0 and len(digits) > 1 and digits[-1] == 0:
+        digits.pop()
+        exponent += 1
+    if exponent >= 0:
+        return len(digits) + exponent, 0
+    return len(digits), -exponent
+
+
+# Bound facet => comparison of the values which don't satisfy it
+BOUND_OPERATORS = {
+    "minInclusive": operator.lt,
+    "maxInclusive": operator.gt,
+    "minExclusive": operator.le,
+    "maxExclusive": operator.ge,
+}
+
+
+def facet_check(facet, facet_value, base):
+    # (condition of the invalid values, message), None if the facet doesn't
+    # apply to the values of the base
+    kind = base.kind
+    if facet in ("length", "minLength", "maxLength"):
+        if kind not in (STRING, BINARY, LIST):
+            return None
+        bound = int(facet_value)
+        if facet == "length":
+            return (lambda value: len(value) != bound), facet
+        if facet == "minLength":
+            return (lambda value: len(value) < bound), facet
+        return (lambda value: len(value) > bound), facet
+    if facet in BOUND_OPERATORS:
+        if kind != NUMBER:
+            return None
+        try:
+            bound = Decimal(facet_value.strip(XML_SPACES))
+        except InvalidOperation:
+            raise RuntimeError("Invalid numeric facet value %r" % facet_value)
+        float_bound = float(bound)
+        compare = BOUND_OPERATORS[facet]
+
+        def condition(value):
+            # Floats are compared as floats, NaN satisfies no bound
+            if isinstance(value, float):
+                return value != value or compare(value, float_bound)
+            return compare(value, bound)
+        return condition, facet
+    if facet in ("totalDigits", "fractionDigits"):
+        if kind != NUMBER:
+            return None
+        bound = int(facet_value)
+        position = 0 if facet == "totalDigits" else 1
+
+        def condition(value):
+            if isinstance(value, float):
+                return False
+            return decimal_digits(value)[position] > bound
+        return condition, facet
+    return None
+
+
+def enumeration_values(parse, enumerations):
+    # Values of the enumeration, the ones which aren't valid values of the
+    # base are left out
+    for text in enumerations:
+        if parse is None:
+            yield text
+            continue
+        try:
+            yield parse(text)
+        except ValueError:
+            pass
+
+
+def restrict(type_name, base, facets, enumerations):
+    # SimpleCheck of a restriction: facets are the (name, value) pairs of
+    # the restriction, the patterns are alternatives
+    parse = base.parse
+    checks = []
+    patterns = []
+    for facet, facet_value in facets:
+        if facet == "pattern":
+            patterns.append(facet_value)
+            continue
+        check = facet_check(facet, facet_value, base)
+        if check is not None:
+            condition, name = check
+            checks.append((condition, "%s %s" % (name, facet_value)))
+
+    matches = []
+    if patterns:
+        regexps = [python_regexp(pattern) for pattern in patterns]
+        if None not in regexps:
+            matches = [regexp.fullmatch for regexp in regexps]
+
+    values = None
+    if enumerations:
+        values = frozenset(
+            enumeration_values(parse, enumerations))
+
+    if not checks and not matches and values is None:
+        return base
+
+    def parse_restricted(text):
+        value = parse(text) if parse is not None else text
+        if matches:
+            lexical = value if base.kind == STRING else collapse(text)
+            if not any(match(lexical) for match in matches):
+                raise ValueError("%s %r doesn't match its patterns" % (
+                    type_name, text))
+        if values is not None and value not in values:
+            raise ValueError("%s %r isn't one of its values" % (
+                type_name, text))
+        for condition, constraint in checks:
+            if condition(value):
+                raise ValueError("%s %r doesn't satisfy %s" % (
+                    type_name, text, constraint))
+        return value
+    return SimpleCheck(parse_restricted, base.kind)
+
+
+def list_of(type_name, item):
+    # SimpleCheck of a list, its values are tuples of the item values
+    parse = item.parse
+    if parse is None:
+        return SimpleCheck(lambda text: tuple(text.split()), LIST)
+    return SimpleCheck(list_parser(type_name, parse), LIST)
+
+
+def union_of(type_name, members):
+    # SimpleCheck of a union, the value is the one of the first member type
+    # accepting the text
+    parsers = []
+    for member in members:
+        if member.parse is None:
+            # Every text is accepted, the next members are never tried
+            parsers.append(lambda text: text)
+            break
+        parsers.append(member.parse)
+
+    def parse(text):
+        for member_parse in parsers:
+            try:
+                return member_parse(text)
+            except ValueError:
+                pass
+        raise ValueError("invalid %s %r" % (type_name, text))
+    return SimpleCheck(parse, OTHER)
@@ -0,0 +1,327 @@
+# Streaming validation of documents against the compiled tables: the
+# document is read by the expat callbacks and each element is checked
+# against the table of its type when it is opened and closed. No tree is
+# built, the memory used doesn't depend on the size of the document, only
+# on its depth.
+from collections import namedtuple
+from xml.parsers import expat
+
+from .compiler import ANY_TYPE_TABLE, XSI_NAMESPACE, TypeTable, compile_roots
+from .content import namespace_of
+from .simple import parse_boolean
+
+# Separator of the namespace and the local name in the expat names
+NAME_SEPARATOR = " "
+XSI_PREFIX = XSI_NAMESPACE + NAME_SEPARATOR
+XSI_NIL = XSI_PREFIX + "nil"
+
+# Content of the nil elements, neither text nor children
+NIL_TABLE = TypeTable("nil")
+
+# Size of the chunks read from the documents
+CHUNK_SIZE = 1 << 16
+
+# Invalid content of a document:
+# - line: source line of the element
+# - path: tags of the element and its ancestors separated by `/`
+# - message: constraint which isn't satisfied
+ValidationError = namedtuple("ValidationError", ["line", "path", "message"])
+
+
+def clark_name(name):
+    # `namespace local` => `{namespace}local`
+    ns, separator, local_name = name.rpartition(NAME_SEPARATOR)
+    if separator:
+        return "{%s}%s" % (ns, local_name)
+    return name
+
+
+def expat_name(tag):
+    # `{namespace}local` => `namespace local`
+    if tag.startswith("{"):
+        ns, local_name = tag[1:].split("}", 1)
+        return ns + NAME_SEPARATOR + local_name
+    return tag
+
+
+def table_names(declarations):
+    # Expat name => Clark tag of the elements and attributes of the tables
+    names = {}
+    tables = []
+    for elements in (declarations.roots, declarations.elements):
+        for tag, (table, _) in elements.items():
+            names[expat_name(tag)] = tag
+            tables.append(table)
+    for name in declarations.attributes:
+        names[expat_name(name)] = name
+    seen = set()
+    while tables:
+        table = tables.pop()
+        if id(table) in seen:
+            continue
+        seen.add(id(table))
+        for name in table.attributes:
+            names[expat_name(name)] = name
+        for tag, (_, child, _) in table.children.items():
+            names[expat_name(tag)] = tag
+            tables.append(child)
+    return names
+
+
+def expected_elements(table, state):
+    # Description of the elements the automaton accepts in a state
+    expected = sorted(table.transitions[state])
+    if table.wildcard_moves[state]:
+        expected.append("wildcard elements")
+    return ", ".join(expected)
+
+
+class ElementState(object):
+    # Element being validated
+    __slots__ = ("tag", "table", "line", "state", "counts", "text")
+
+    def __init__(self, tag, table, line):
+        self.tag = tag
+        self.table = table
+        self.line = line
+        # State of the automaton of the children
+        self.state = 0
+        # Occurrences of the counted children by table index
+        self.counts = [0] * len(table.occurs) if table.counted else None
+        # Text chunks of a simple content
+        self.text = [] if table.text is not None else None
+
+
+class DocumentValidator(object):
+    # Validates documents against the compiled declarations, see
+    # compile_roots. The tables are shared by the documents.
+    def __init__(self, declarations):
+        self.declarations = declarations
+        self.names = table_names(declarations)
+
+    @classmethod
+    def from_project(cls, project, roots=None):
+        return cls(compile_roots(project, roots))
+
+    def validate(self, source):
+        # ValidationError of the document, empty if it is valid. source is a
+        # file name or a binary file object.
+        validation = Validation(self.declarations, self.names)
+        if isinstance(source, str):
+            with open(source, "rb") as fin:
+                return validation.run(fin)
+        return validation.run(source)
+
+    def is_valid(self, source):
+        return not self.validate(source)
+
+
+class Validation(object):
+    # Validation of one document
+    def __init__(self, declarations, names):
+        self.roots = declarations.roots
+        self.elements = declarations.elements
+        self.global_attributes = declarations.attributes
+        self.names = names
+        self.stack = []
+        self.errors = []
+        parser = self.parser = expat.ParserCreate(
+            namespace_separator=NAME_SEPARATOR)
+        # Contiguous text comes in one call
+        parser.buffer_text = True
+        parser.StartElementHandler = self.start
+        parser.EndElementHandler = self.end
+        parser.CharacterDataHandler = self.data
+
+    def error(self, line, message, tag=None):
+        path = "".join("/" + state.tag for state in self.stack)
+        if tag is not None:
+            path += "/" + tag
+        self.errors.append(ValidationError(line, path, message))
+
+    def run(self, fin):
+        parser = self.parser
+        try:
+            while True:
+                chunk = fin.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                parser.Parse(chunk, False)
+            parser.Parse(b"", True)
+        except expat.ExpatError as error:
+            self.error(error.lineno, "not well-formed: %s" % (
+                expat.ErrorString(error.code)))
+        return self.errors
+
+    def start(self, name, attrib):
+        stack = self.stack
+        tag = self.names.get(name) or clark_name(name)
+        line = self.parser.CurrentLineNumber
+        if not stack:
+            table, nillable = self.roots.get(tag, (None, False))
+            if table is None:
+                self.error(line, "unexpected root element", tag)
+                table = ANY_TYPE_TABLE
+            self.open(tag, line, attrib, table, nillable)
+            return
+
+        parent = stack[-1]
+        parent_table = parent.table
+        if parent_table.skip:
+            stack.append(ElementState(tag, ANY_TYPE_TABLE, line))
+            return
+
+        transitions = parent_table.transitions
+        if transitions is not None:
+            state = transitions[parent.state].get(tag)
+            if state is None:
+                self.start_wildcard(
+                    tag, line, attrib, parent_table.wildcard_moves[
+                        parent.state])
+                return
+            parent.state = state
+            index, table, nillable = parent_table.children[tag]
+        else:
+            child = parent_table.children.get(tag)
+            if child is None:
+                self.start_wildcard(tag, line, attrib, (
+                    (wildcard, None) for wildcard in parent_table.wildcards))
+                return
+            index, table, nillable = child
+
+        if parent.counts is not None:
+            occurs = parent_table.occurs[index]
+            if occurs is not None:
+                count = parent.counts[index] + 1
+                parent.counts[index] = count
+                if occurs[1] is not None and count == occurs[1] + 1:
+                    self.error(
+                        line, "more than %d occurrences" % occurs[1], tag)
+        if attrib or table.required:
+            self.open(tag, line, attrib, table, nillable)
+        else:
+            stack.append(ElementState(tag, table, line))
+
+    def start_wildcard(self, tag, line, attrib, wildcard_moves):
+        # Element which isn't one of the children expected by its parent,
+        # wildcard_moves are the (Wildcard, next state) which may accept it
+        parent = self.stack[-1]
+        ns = namespace_of(tag)
+        for wildcard, state in wildcard_moves:
+            if wildcard.allows(ns):
+                break
+        else:
+            table = parent.table
+            message = "unexpected element"
+            if table.transitions is not None:
+                expected = expected_elements(table, parent.state)
+                if expected:
+                    message += ", expected " + expected
+            self.error(line, message, tag)
+            self.stack.append(ElementState(tag, ANY_TYPE_TABLE, line))
+            return
+
+        if state is not None:
+            parent.state = state
+        table, nillable = ANY_TYPE_TABLE, False
+        if wildcard.process != "skip":
+            declaration = self.elements.get(tag)
+            if declaration is not None:
+                table, nillable = declaration
+            elif wildcard.process == "strict":
+                self.error(line, "no declaration of the element", tag)
+        self.open(tag, line, attrib, table, nillable)
+
+    def open(self, tag, line, attrib, table, nillable):
+        # Pushes an element after checking its attributes
+        self.check_attributes(tag, line, attrib, table)
+        if XSI_NIL in attrib:
+            table = self.nil_table(tag, line, attrib, table, nillable)
+        self.stack.append(ElementState(tag, table, line))
+
+    def nil_table(self, tag, line, attrib, table, nillable):
+        # Table of the content of an element with xsi:nil, nil elements
+        # have no content
+        if not nillable:
+            self.error(line, "element isn't nillable", tag)
+            return table
+        try:
+            nil = parse_boolean(attrib[XSI_NIL])
+        except ValueError as error:
+            self.error(line, "attribute xsi:nil: %s" % error, tag)
+            return table
+        return NIL_TABLE if nil else table
+
+    def check_attributes(self, tag, line, attrib, table):
+        if table.skip:
+            return
+        attributes = table.attributes
+        names = self.names
+        for name, value in attrib.items():
+            if name.startswith(XSI_PREFIX):
+                continue
+            attribute = names.get(name) or clark_name(name)
+            if attribute in attributes:
+                parse = attributes[attribute]
+            else:
+                parse = self.wildcard_attribute(
+                    tag, line, attribute, table.any_attribute)
+            if parse is not None:
+                try:
+                    parse(value)
+                except ValueError as error:
+                    self.error(line, "attribute %s: %s" % (
+                        attribute, error), tag)
+        for attribute in table.required:
+            if expat_name(attribute) not in attrib:
+                self.error(line, "missing attribute %s" % attribute, tag)
+
+    def wildcard_attribute(self, tag, line, attribute, wildcard):
+        # Parse function of an attribute which isn't declared by the type
+        if wildcard is None or not wildcard.allows(namespace_of(attribute)):
+            self.error(line, "unexpected attribute %s" % attribute, tag)
+            return None
+        if wildcard.process == "skip":
+            return None
+        if attribute in self.global_attributes:
+            return self.global_attributes[attribute]
+        if wildcard.process == "strict":
+            self.error(
+                line, "no declaration of the attribute %s" % attribute, tag)
+        return None
+
+    def data(self, text):
+        state = self.stack[-1]
+        if state.text is not None:
+            state.text.append(text)
+            return
+        table = state.table
+        # Text of an element content, only whitespace unless it is mixed
+        if not table.mixed and not table.skip and text.strip():
+            self.error(self.parser.CurrentLineNumber, "unexpected text")
+
+    def end(self, name):
+        state = self.stack[-1]
+        table = state.table
+        if not table.skip:
+            if state.text is not None and table.text.parse is not None:
+                try:
+                    table.text.parse("".join(state.text))
+                except ValueError as error:
+                    self.error(state.line, str(error))
+            if table.transitions is not None and not table.final[state.state]:
+                expected = table.transitions[state.state]
+                if len(expected) == 1 and not table.wildcard_moves[
+                    state.state
+                ]:
+                    self.error(state.line, "missing element %s" % (
+                        next(iter(expected))))
+                else:
+                    self.error(state.line, "missing one of the elements %s" % (
+                        expected_elements(table, state.state)))
+            if state.counts is not None:
+                counts = state.counts
+                for index, tag, min_occurs in table.required_children:
+                    if counts[index] < min_occurs:
+                        self.error(state.line, "missing element %s" % tag)
+        self.stack.pop()
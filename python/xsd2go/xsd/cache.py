@@ -0,0 +1,113 @@
+# On disk cache of the loaded schemas, one entry per xsd file
+import hashlib
+import os
+import pickle
+from os.path import abspath, dirname, exists, join
+
+from xsd2go.manifest import file_hash, generator_version
+
+
+class SchemaCache(object):
+    # An entry holds the pickled schema of a xsd file with the hashes of the
+    # file and of the files it includes or imports, directly or not. It is
+    # used only if none of them changed.
+    def __init__(self, path):
+        self.path = path
+        # Entries written by another version of the generator are ignored
+        self.version = generator_version()
+        self._file_hashes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def file_hash(self, file_path):
+        file_path = abspath(file_path)
+        digest = self._file_hashes.get(file_path)
+        if digest is None:
+            digest = self._file_hashes[file_path] = file_hash(file_path)
+        return digest
+
+    def entry_path(self, file_path):
+        name = hashlib.sha1(abspath(file_path).encode("utf8")).hexdigest()
+        return join(self.path, name + ".pickle")
+
+    def _is_valid(self, header, file_path, recursive, streaming):
+        if (
+            header.get("version") != self.version
+            or header.get("recursive") != recursive
+            or header.get("streaming", False) != streaming
+            or header.get("hash") != self.file_hash(file_path)
+        ):
+            return False
+        for path, digest in header.get("dependencies", {}).items():
+            if not exists(path) or self.file_hash(path) != digest:
+                return False
+        return True
+
+    def load(self, file_path, recursive, streaming=False):
+        entry_path = self.entry_path(file_path)
+        if not exists(entry_path):
+            self.misses += 1
+            return None
+        with open(entry_path, 'rb') as fin:
+            try:
+                header = pickle.load(fin)
+                if not self._is_valid(
+                    header, file_path, recursive, streaming
+                ):
+                    self.misses += 1
+                    return None
+                schema = pickle.load(fin)
+            except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                self.misses += 1
+                return None
+        self.hits += 1
+        return schema
+
+    def declarations_path(self, file_path):
+        # Entries of the global declarations are shared by the files with
+        # the same content
+        return join(
+            self.path, "declarations", self.file_hash(file_path) + ".pickle")
+
+    def load_declarations(self, file_path):
+        # (target namespace, names of the global elements) of the file, None
+        # if they aren't cached
+        entry_path = self.declarations_path(file_path)
+        if not exists(entry_path):
+            return None
+        with open(entry_path, 'rb') as fin:
+            try:
+                version, declarations = pickle.load(fin)
+            except (pickle.UnpicklingError, EOFError, ValueError):
+                return None
+        if version != self.version:
+            return None
+        return declarations
+
+    def save_declarations(self, file_path, declarations):
+        entry_path = self.declarations_path(file_path)
+        os.makedirs(dirname(entry_path), exist_ok=True)
+        tmp_path = entry_path + ".tmp"
+        with open(tmp_path, 'wb') as fout:
+            pickle.dump(
+                (self.version, declarations), fout, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, entry_path)
+
+    def save(self, schema, dependencies):
+        # dependencies: paths of the files included or imported by the schema
+        header = {
+            "version": self.version,
+            "recursive": schema.recursive,
+            "streaming": schema.streaming,
+            "hash": self.file_hash(schema.file_path),
+            "dependencies": {
+                abspath(path): self.file_hash(path) for path in dependencies
+            },
+        }
+        os.makedirs(self.path, exist_ok=True)
+        entry_path = self.entry_path(schema.file_path)
+        tmp_path = entry_path + ".tmp"
+        with open(tmp_path, 'wb') as fout:
+            pickle.dump(header, fout, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(schema, fout, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, entry_path)
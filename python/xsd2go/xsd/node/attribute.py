@@ -1,19 +1,19 @@
-from cached_property import cached_property
-
 from xsd2go.constants import XSD_NS
-from xsd2go.xsd.util import parse_ref_value, parse_tag
-from xsd2go.xsd_go_type import xsd2go_type
+from xsd2go.go_field import GoField
+from xsd2go.xsd.util import cached_slot
 
 from .base import Node
 from .simple_type import SimpleType
 
 class Attribute(Node):
+    __slots__ = ("nested_type", "ref_qname", "type_qname", "_ref_attribute", "_type_instance")
+
     def __init__(self, schema, node, parent):
         super(Attribute, self).__init__(schema, node, parent)
         if 'name' in self.node.attrib:
             self.schema.add_attribute(self)
 
-    @cached_property
+    @cached_slot
     def name(self):
         _name = self.node.attrib.get('name')
 
@@ -25,33 +25,32 @@ class Attribute(Node):
                 "Cannot get name from %s" % self.tostring())
         return _name
 
-    @cached_property
+    @cached_slot
     def prefix(self):
         if self.parent is not None:
             return self.parent.prefix + self.name
         else:
             return self.name
 
-    @cached_property
+    @cached_slot
     def ref_attribute(self):
-        ref = self.node.attrib.get('ref')
-        if ref is not None:
-            ref_attribute = self.schema.get_attribute(ref)
+        ref_ns, ref_name = self.ref_qname
+        if ref_name is not None:
+            ref_attribute = self.schema.get_attribute(ref_name, ref_ns)
             if ref_attribute is None:
                 raise RuntimeError(
                     "Cannot find ref attribute for %s" % self.tostring())
             return ref_attribute
         return None
 
-    @cached_property
+    @cached_slot
     def type_instance(self):
         if self.nested_type is not None:
             return self.nested_type
         elif self.ref_attribute is not None:
             return self.ref_attribute.type_instance
         else:
-            type_name, type_ns = self.parse_ref_value(
-                self.node.attrib['type'])
+            type_ns, type_name = self.type_qname
             refered_type_instance = self.schema.get_type_instance(
                 type_name, type_ns)
             if refered_type_instance is None:
@@ -62,25 +61,23 @@ class Attribute(Node):
 
     def _parse(self):
         self.nested_type = None
+        self.ref_qname = self.resolve_qname('ref')
+        self.type_qname = self.resolve_qname('type')
 
-        simple_type_node = self.node.xpath(
-            "xsd:simpleType",
-            namespaces=self.schema.nsmap
-        )
-
-        if simple_type_node:
+        simple_type_node = self.xsd_child("simpleType")
+        if simple_type_node is not None:
             self.nested_type = SimpleType(
-                self.schema, simple_type_node[0], self)
+                self.schema, simple_type_node, self)
 
     def export_go_def(self):
         if self.nested_type is None and self.ref_attribute is None and 'type' not in self.node.attrib:
             return None
 
-        type_name, type_ns = self.parse_ref_value(
-                self.node.attrib.get('type', ''))
+        type_ns, type_name = self.type_qname
+        type_instance = None
 
         if type_ns == self.schema.nsmap[XSD_NS]:
-            go_struct_name = xsd2go_type.get(type_name)
+            go_struct_name = self.builtin_go_type(type_name)
             if go_struct_name is None:
                 raise RuntimeError(
                     "Cannot find predefined go type for %s",
@@ -91,13 +88,13 @@ class Attribute(Node):
             if go_struct_name is None:
                 raise RuntimeError(
                     "Cannot find type name for %s", self.node.attrib['type'])
+            go_struct_name = self.go_type_ref(self.type_instance)
+            type_instance = self.type_instance
         
-        return {
-            "field_name": self.name.capitalize(),
-            "type_name": go_struct_name,
-            "is_array": False,
-            "is_pointer": False,
-            "type_instance": None,
-            "xml_field_name": self.name,
-            "xml_field_suffix": "attr,omitempty",
-        }
+        return GoField(
+            field_name=self.name.capitalize(),
+            type_name=go_struct_name,
+            type_instance=type_instance,
+            xml_field_name=self.name,
+            xml_field_suffix="attr,omitempty",
+        ).with_occurs(1 if self.node.attrib.get("use") == "required" else 0)
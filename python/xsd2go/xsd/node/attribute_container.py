@@ -1,51 +1,59 @@
-from cached_property import cached_property
-
-from xsd2go.xsd.util import parse_ref_value
+from xsd2go.xsd.util import cached_slot
 
 from .base import Node
 
 
 class AttributeContainerMixin(object):
-    @cached_property
+    __slots__ = ()
+
+    @cached_slot
     def attributes(self):
         _attributes = self.nested_attributes
         for _group in self.nested_attribute_groups:
             _attributes = _attributes + _group.attributes
         return _attributes
 
+    def attribute_wildcards(self):
+        # (schema, attributes of xsd:anyAttribute) of the container and of
+        # its attribute groups
+        wildcards = []
+        if self.any_attribute is not None:
+            wildcards.append((self.schema, self.any_attribute))
+        for group in self.nested_attribute_groups:
+            wildcards.extend(group.attribute_wildcards())
+        return wildcards
+
     def _parse_attributes(self):
         from .attribute import Attribute
 
-        attribute_nodes = self.node.xpath(
-            "xsd:attribute",
-            namespaces=self.schema.nsmap
-        )
+        any_attribute = self.xsd_child("anyAttribute")
+        self.any_attribute = (
+            dict(any_attribute.attrib) if any_attribute is not None else None)
         self.nested_attributes = [
             Attribute(self.schema, node, self)
-            for node in attribute_nodes
+            for node in self.xsd_children.get("attribute", ())
         ]
-
-        attribute_group_nodes = self.node.xpath(
-            "xsd:attributeGroup",
-            namespaces=self.schema.nsmap
-        )
         self.nested_attribute_groups = [
             AttributeGroup(self.schema, node, self)
-            for node in attribute_group_nodes
+            for node in self.xsd_children.get("attributeGroup", ())
         ]
 
 
 class AttributeGroup(Node, AttributeContainerMixin):
+    __slots__ = (
+        "ref_qname", "nested_attributes", "nested_attribute_groups",
+        "any_attribute", "_attributes",
+    )
+
     def __init__(self, schema, node, parent):
         super(AttributeGroup, self).__init__(schema, node, parent)
         if 'name' in self.node.attrib:
             self.schema.add_attribute_group(self)
     
-    @cached_property
+    @cached_slot
     def attributes(self):
-        if 'ref' in self.node.attrib:
-            ref_name, ref_ns = self.parse_ref_value(
-                self.node.attrib['ref'])
+        if self.ref_qname[1] is not None:
+            ref_ns, ref_name = self.ref_qname
             refered_attribute_group = self.schema.get_attribute_group(
                 ref_name, ref_ns)
             if refered_attribute_group is None:
@@ -56,6 +64,13 @@ class AttributeGroup(Node, AttributeContainerMixin):
 
         return super(AttributeGroup, self).attributes
 
+    def attribute_wildcards(self):
+        if self.ref_qname[1] is not None:
+            ref_ns, ref_name = self.ref_qname
+            return self.schema.get_attribute_group(
+                ref_name, ref_ns).attribute_wildcards()
+        return super(AttributeGroup, self).attribute_wildcards()
 
     def _parse(self):
+        self.ref_qname = self.resolve_qname('ref')
         self._parse_attributes()
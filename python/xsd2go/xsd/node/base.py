@@ -1,17 +1,58 @@
-from cached_property import cached_property
 from lxml import etree
 
-from xsd2go.xsd.util import parse_attrib_value, parse_tag
+from xsd2go.xsd.snapshot import ElementSnapshot, docs_xpath
+from xsd2go.xsd.util import (
+    cached_slot, intern_nsmap, resolve_qname, xsd_children
+)
+
+
+def slot_names(cls):
+    names = []
+    for klass in reversed(cls.__mro__):
+        names.extend(klass.__dict__.get('__slots__', ()))
+    return names
 
 
 class Node(object):
+    # Nodes are slotted to keep the model small, each subclass declares the
+    # attributes it sets and a `_<name>` slot for each of its cached_slot.
+    __slots__ = (
+        "schema", "node", "parent",
+        "_node_id", "_name", "_xsd_children", "_prefix", "_nsmap_key",
+        "_docs",
+    )
+
+    # Cached values which aren't pickled: xpath results and children keep
+    # a reference to the lxml tree
+    transient_slots = ("_docs", "_xsd_children")
+
     def __init__(self, schema, node, parent):
         self.schema = schema
         self.node = node
         self.parent = parent
+        schema.nodes.append(self)
         self._parse()
+        # Children are only needed while parsing
+        del self.xsd_children
+
+    def __getstate__(self):
+        state = {}
+        for name in slot_names(type(self)):
+            if name not in self.transient_slots and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def detach(self, nsmaps):
+        # Replaces the lxml element by a snapshot once the node is parsed,
+        # see xsd2go.xsd.streaming
+        self.node = nsmaps.snapshot(self.node)
+        del self.docs
 
-    @cached_property
+    @cached_slot
     def node_id(self):
         _id = self.node.tag
         if self.name is not None:
@@ -21,11 +62,19 @@ class Node(object):
         elif self.name is None:
             return self.parent + "/" + _id
 
-    @cached_property
+    @cached_slot
     def name(self):
         return None
+
+    @cached_slot
+    def xsd_children(self):
+        return xsd_children(self.node)
+
+    def xsd_child(self, local_name):
+        children = self.xsd_children.get(local_name)
+        return children[0] if children else None
     
-    @cached_property
+    @cached_slot
     def prefix(self):
         if self.parent is not None:
             return self.parent.prefix
@@ -34,12 +83,32 @@ class Node(object):
     
     def go_package_name(self):
         return self.schema.go_package_name()
+
+    def builtin_go_type(self, type_name):
+        # Go type of the xsd builtin type, None if it isn't mapped
+        return self.schema.project.go_types.get(type_name)
+
+    def go_type_ref(self, type_instance):
+        # Go type name of `type_instance` used in the package of this node
+        exported = type_instance.go_type_instance()
+        if exported is None:
+            return type_instance.go_type_name()
+        go_type_name = exported.go_type_name()
+        if exported.go_package_name() != self.go_package_name():
+            go_type_name = exported.go_package_name() + "." + go_type_name
+        return go_type_name
     
+    @cached_slot
+    def nsmap_key(self):
+        return intern_nsmap(self.node.nsmap)
+
+    def resolve_qname(self, attrib_name):
+        # (namespace, local name) of a qualified name attribute like `type`
+        return resolve_qname(self.node.attrib.get(attrib_name), self.nsmap_key)
+
     def parse_ref_value(self, value):
-        if not value:
-            return None, None
-        name, ns_tag = parse_attrib_value(value)
-        return name, self.node.nsmap.get(ns_tag)
+        ns, name = resolve_qname(value, self.nsmap_key)
+        return name, ns
 
     def is_same_ns(self, ns):
         if self.schema.target_ns is None:
@@ -47,14 +116,15 @@ class Node(object):
         return self.schema.target_ns == ns
 
     def tostring(self):
+        if isinstance(self.node, ElementSnapshot):
+            return self.node.tostring()
         return etree.tostring(self.node).decode("utf8")
     
-    @cached_property
+    @cached_slot
     def docs(self):
-        return self.node.xpath(
-            "xsd:annotation/xsd:documentation/text()",
-            namespaces=self.schema.nsmap
-        )
+        if isinstance(self.node, ElementSnapshot):
+            return self.node.docs
+        return docs_xpath(self.node)
 
     def export(self, default_name, **kwargs):
         raise NotImplementedError(
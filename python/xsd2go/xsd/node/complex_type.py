@@ -1,31 +1,44 @@
+from collections import namedtuple
 from os.path import join
-from pathlib import Path
 
-from cached_property import cached_property
 
 from xsd2go.constants import XSD_NS
-from xsd2go.xsd.util import parse_ref_value
-
-from xsd2go.xsd_go_type import xsd2go_type
+from xsd2go.go_field import GoField
+from xsd2go.golang import go_methods
+from xsd2go.xsd.util import cached_slot
+from xsd2go.output import GoSource, OutputWriter, TypeFiles
 
 from .base import Node
 from .attribute_container import AttributeContainerMixin
 from .element_container import ElementContainerMixin
 
 
+# Go definition of a complex type, computed once per type:
+# - base_class: embedded base struct or None
+# - fields: GoField of the struct in struct order
+# - packages: other go packages used by the struct
+# - children: type instances of the fields, exported with the struct
+GoStructModel = namedtuple(
+    "GoStructModel", ["base_class", "fields", "packages", "children"])
+
+
 class ComplexType(Node, AttributeContainerMixin, ElementContainerMixin):
+    __slots__ = (
+        "content", "nested_attributes", "nested_attribute_groups",
+        "any_attribute", "element_collection", "_attributes", "_elements",
+        "_go_struct_model",
+    )
+
     def __init__(self, schema, node, parent):
         super(ComplexType, self).__init__(schema, node, parent)
         if 'name' in self.node.attrib:
             self.schema.add_type_instance(self)
 
-    @cached_property
+    @cached_slot
     def name(self):
-        name_attr = self.node.xpath("@name")
-        name_attr = (name_attr and name_attr[0]) or None
-        return name_attr
+        return self.node.attrib.get('name')
 
-    @cached_property
+    @cached_slot
     def prefix(self):
         if self.name is not None:
             return self.name
@@ -40,20 +53,12 @@ class ComplexType(Node, AttributeContainerMixin, ElementContainerMixin):
     def _parse(self):
         self.content = None
 
-        simple_content = self.node.xpath(
-            "xsd:simpleContent",
-            namespaces=self.schema.nsmap
-        )
-        if simple_content:
-            simple_content = simple_content[0]
+        simple_content = self.xsd_child("simpleContent")
+        if simple_content is not None:
             self.content = SimpleContent(self.schema, simple_content, self)
 
-        complex_content = self.node.xpath(
-            "xsd:complexContent",
-            namespaces=self.schema.nsmap
-        )
-        if complex_content:
-            complex_content = complex_content[0]
+        complex_content = self.xsd_child("complexContent")
+        if complex_content is not None:
             self.content = ComplexContent(self.schema, complex_content, self)
 
         if self.content is None:
@@ -68,7 +73,39 @@ class ComplexType(Node, AttributeContainerMixin, ElementContainerMixin):
             return self.content.go_base_class()
         return None
 
+    @cached_slot
+    def go_struct_model(self):
+        fields = tuple(self._go_struct_attributes())
+        base_class = self.go_base_class()
+
+        packages = []
+        children = []
+        for attr in fields:
+            type_instance = attr.type_instance
+            if type_instance is None:
+                continue
+            children.append(type_instance)
+            exported = type_instance.go_type_instance()
+            if exported is None:
+                continue
+            if exported is not type_instance:
+                # Restriction of an exported simple type
+                children.append(exported)
+            package = exported.go_package_name()
+            if package != self.go_package_name() and package not in packages:
+                packages.append(package)
+
+        items = (base_class or '').split('.')
+        if len(items) == 2 and items[0] not in packages:
+            packages.append(items[0])
+
+        return GoStructModel(
+            base_class, fields, tuple(packages), tuple(children))
+
     def go_struct_attributes(self):
+        return self.go_struct_model.fields
+
+    def _go_struct_attributes(self):
         attrs = []
         added_attr = set()
         if self.content is not None:
@@ -77,97 +114,132 @@ class ComplexType(Node, AttributeContainerMixin, ElementContainerMixin):
             for attribute in self.attributes:
                 go_attr = attribute.export_go_def()
                 if go_attr is not None:
-                    if go_attr['field_name'] in added_attr:
+                    if go_attr.field_name in added_attr:
                         continue
-                    added_attr.add(go_attr['field_name'])
+                    added_attr.add(go_attr.field_name)
                     attrs.append(go_attr)
-            for elem in self.elements:
-                go_attr = elem.export_go_def()
+            for go_attr in self.element_go_defs():
                 if go_attr is not None:
-                    if go_attr['field_name'] in added_attr:
+                    if go_attr.field_name in added_attr:
                         continue
-                    added_attr.add(go_attr['field_name'])
+                    added_attr.add(go_attr.field_name)
                     attrs.append(go_attr)
 
-        attrs = sorted(attrs, key=lambda x: x.get("index", -1))
+        attrs = sorted(attrs, key=lambda x: x.index)
         return attrs
 
     def go_struct_def(self):
         lines = []
         lines.append("struct {")
 
-        base_class = self.go_base_class()
-        if base_class is not None:
-            lines.append(base_class + ";")
+        model = self.go_struct_model
+        if model.base_class is not None:
+            lines.append(model.base_class + ";")
 
-        for attribute in self.go_struct_attributes():
-            line = attribute['field_name'] + ' '
-            if attribute['is_array']:
+        for attribute in model.fields:
+            line = attribute.field_name + ' '
+            if attribute.is_array:
                 line += '[]'
-            if attribute['is_pointer']:
+            if attribute.is_pointer:
                 line += '*'
-            line += attribute['type_name']
+            line += attribute.type_name
             line += ' '
-            if attribute['xml_field_suffix']:
-                line += '`xml:"{xml_field_name},{xml_field_suffix}"`;'.format(**attribute)
+            if attribute.xml_field_suffix:
+                line += '`xml:"{0.xml_field_name},{0.xml_field_suffix}"`;'.format(attribute)
             else:
-                line += '`xml:"{xml_field_name}"`;'.format(**attribute)
+                line += '`xml:"{0.xml_field_name}"`;'.format(attribute)
             lines.append(line)
         lines.append("}")
         return '\n'.join(lines)
     
-    def export_go_struct(self, base_path, base_module):
-        class_name = self.go_type_name()
-        if class_name is None:
-            raise RuntimeError(
-                "Cannot export class without name:\n%s",
-                self.tostring()
-            )
-        if class_name in self.schema.exported_class:
-            return
-        else:
-            self.schema.exported_class.add(class_name)
-
-        packages = set()
-        for attr in self.go_struct_attributes():
-            if attr['type_instance'] is not None and isinstance(attr['type_instance'], ComplexType):
-                if attr['type_instance'].go_package_name() != self.go_package_name():
-                    packages.add('"' + join(base_module, base_path, attr['type_instance'].go_package_name()) + '"')
-
-        items = (self.go_base_class() or '').split('.')
-        if len(items) == 2:
-            packages.add('"' + join(base_module, base_path, items[0]) + '"')
-
-        dir_name = join(base_path, self.go_package_name())
-        Path(dir_name).mkdir(parents=True, exist_ok=True)
-
-        file_path = join(dir_name, class_name + '.go')
-        lines = [
-            "package %s" % self.schema.go_package_name(),
-        ]
-
-        if packages:
-            lines.append('import (')
-            lines.extend(list(packages))
-            lines.append(')')
-        lines.extend([
-            "",
-            "type %s " % class_name + self.go_struct_def(),
-            ""
-        ])
-        fout = open(file_path, 'w')
-        fout.write('\n'.join(lines))
-        fout.close()
-        for attr in self.go_struct_attributes():
-            if attr['type_instance'] is not None:
-                attr['type_instance'].export_go_struct(base_path, base_module)
+    def go_source(self, base_path, base_module, options=None):
+        # options: GoOptions of the methods generated with the struct
+        model = self.go_struct_model
+        imports = set(
+            '"' + join(base_module, base_path, package) + '"'
+            for package in model.packages
+        )
+        imports.update(self.schema.project.go_types.go_imports(
+            [field.type_name for field in model.fields] + [model.base_class]))
+        code = "type %s " % self.go_type_name() + self.go_struct_def()
+        helpers = ()
+        if options is not None:
+            methods = go_methods(self, options)
+            if methods.code:
+                code += "\n\n" + methods.code
+            imports.update(methods.imports)
+            helpers = tuple(sorted(methods.helpers))
+        return GoSource(
+            package=self.schema.go_package_name(),
+            dir_name=join(base_path, self.go_package_name()),
+            type_name=self.go_type_name(),
+            imports=sorted(imports),
+            code=code,
+            helpers=helpers,
+        )
+
+    exports_go_type = True
+
+    def go_type_instance(self):
+        return self
+
+    def go_underlying_type(self):
+        # Structs have no builtin underlying type
+        return None
+
+    def go_union(self):
+        return None
+
+    def global_element(self):
+        # Global element declared with this type, None if there isn't
+        # exactly one
+        if 'name' not in self.node.attrib:
+            if self.parent is not None and self.parent.parent is None:
+                return self.parent
+            return None
+        elements = self.schema.project.symbol_index.typed_elements(
+            self.node.attrib['name'], self.schema.target_ns)
+        return elements[0] if len(elements) == 1 else None
+
+    def go_base_type_instance(self):
+        # Complex type embedded as base class of the struct
+        if self.content is None or self.content.decorator is None:
+            return None
+        decorator = self.content.decorator
+        if decorator.base_qname[0] == self.schema.nsmap[XSD_NS]:
+            return None
+        base_type_instance = decorator.base_type_instance
+        if isinstance(base_type_instance, ComplexType):
+            return base_type_instance
+        return None
+
+    def go_type_dependencies(self):
+        base_type_instance = self.go_base_type_instance()
+        if base_type_instance is not None:
+            return (base_type_instance,) + self.go_struct_model.children
+        return self.go_struct_model.children
+
+    def export_go_struct(self, base_path, base_module, output=None, options=None):
+        from xsd2go.exporter import Exporter
+
+        flush = output is None
+        if flush:
+            output = TypeFiles(OutputWriter())
+        Exporter(base_path, base_module, output, options).export([self])
+        if flush:
+            output.flush()
 
 
 class Extension(Node, AttributeContainerMixin, ElementContainerMixin):
-    @cached_property
+    __slots__ = (
+        "base_qname", "nested_attributes", "nested_attribute_groups",
+        "any_attribute", "element_collection", "_attributes", "_elements",
+        "_base_type_instance",
+    )
+
+    @cached_slot
     def base_type_instance(self):
-        type_name, type_ns = self.parse_ref_value(
-            self.node.attrib['base'])
+        type_ns, type_name = self.base_qname
         if type_ns == self.schema.nsmap[XSD_NS]:
             raise RuntimeError(
                 'Cannot return base type instance for builtin type %s',
@@ -183,14 +255,14 @@ class Extension(Node, AttributeContainerMixin, ElementContainerMixin):
         return refered_type_instance
     
     def _parse(self):
+        self.base_qname = self.resolve_qname('base')
         self._parse_attributes()
         self._parse_elements()
 
     def go_base_class(self):
         from .simple_type import SimpleType
         
-        _, type_ns = self.parse_ref_value(
-            self.node.attrib['base'])
+        type_ns, _ = self.base_qname
         if type_ns == self.schema.nsmap[XSD_NS]:
             return None
         elif isinstance(self.base_type_instance, SimpleType):
@@ -209,34 +281,26 @@ class Extension(Node, AttributeContainerMixin, ElementContainerMixin):
         from .simple_type import SimpleType
 
         attrs = []
-        type_name, type_ns = self.parse_ref_value(
-            self.node.attrib['base'])
+        type_ns, type_name = self.base_qname
         if type_ns == self.schema.nsmap[XSD_NS]:
-            go_struct_name = xsd2go_type.get(type_name)
+            go_struct_name = self.builtin_go_type(type_name)
             if go_struct_name is None:
                 raise RuntimeError(
                     "Cannot find predefined go type for %s",
                     self.node.attrib['base']
                 )
-            attrs.append({
-                "field_name": 'Text',
-                "type_name": go_struct_name,
-                "is_array": False,
-                "is_pointer": False,
-                "type_instance": None,
-                "xml_field_name": "",
-                "xml_field_suffix": "chardata",
-            })
+            attrs.append(GoField(
+                field_name='Text',
+                type_name=go_struct_name,
+                xml_field_suffix="chardata",
+            ))
         elif isinstance(self.base_type_instance, SimpleType):
-            attrs.append({
-                "field_name": 'Text',
-                "type_name": self.base_type_instance.go_type_name(),
-                "is_array": False,
-                "is_pointer": False,
-                "type_instance": None,
-                "xml_field_name": "",
-                "xml_field_suffix": "chardata",
-            })
+            attrs.append(GoField(
+                field_name='Text',
+                type_name=self.go_type_ref(self.base_type_instance),
+                type_instance=self.base_type_instance,
+                xml_field_suffix="chardata",
+            ))
         elif self.base_type_instance is None:
             raise RuntimeError(
                 "Base class cannot be None\n%s", self.tostring())
@@ -247,42 +311,43 @@ class Extension(Node, AttributeContainerMixin, ElementContainerMixin):
         for attr in self.attributes:
             go_attr = attr.export_go_def()
             if go_attr is not None:
-                if go_attr['field_name'] in added_attr:
+                if go_attr.field_name in added_attr:
                     continue
-                added_attr.add(go_attr['field_name'])
+                added_attr.add(go_attr.field_name)
                 attrs.append(go_attr)
-        for elem in self.elements:
-            go_attr = elem.export_go_def()
+        for go_attr in self.element_go_defs():
             if go_attr is not None:
-                if go_attr['field_name'] in added_attr:
+                if go_attr.field_name in added_attr:
                     continue
-                added_attr.add(go_attr['field_name'])
+                added_attr.add(go_attr.field_name)
                 attrs.append(go_attr)
         return attrs
 
 
 class SimpleContentRestriction(Node, AttributeContainerMixin):
+    __slots__ = (
+        "nested_type", "base_qname", "nested_attributes",
+        "nested_attribute_groups", "any_attribute", "_attributes",
+        "_base_type_instance",
+    )
+
     def _parse(self):
         from .simple_type import SimpleType
 
         self.nested_type = None
-        simple_type_nodes = self.node.xpath(
-            "xsd:simpleType",
-            namespaces=self.schema.nsmap
-        )
-
-        if simple_type_nodes:
+        self.base_qname = self.resolve_qname('base')
+        simple_type_node = self.xsd_child("simpleType")
+        if simple_type_node is not None:
             self.nested_type = SimpleType(
-                self.schema, simple_type_nodes[0], self)
+                self.schema, simple_type_node, self)
         self._parse_attributes()
 
-    @cached_property
+    @cached_slot
     def base_type_instance(self):
         if self.nested_type is not None:
             return self.nested_type
 
-        type_name, type_ns = self.parse_ref_value(
-            self.node.attrib['base'])
+        type_ns, type_name = self.base_qname
         if type_ns == self.schema.nsmap[XSD_NS]:
             raise RuntimeError(
                 'Cannot return base type instance for builtin type %s',
@@ -302,10 +367,9 @@ class SimpleContentRestriction(Node, AttributeContainerMixin):
     def go_base_class(self):
         from .simple_type import SimpleType
 
-        type_name, type_ns = self.parse_ref_value(
-            self.node.attrib['base'])
+        type_ns, type_name = self.base_qname
         if type_ns == self.schema.nsmap[XSD_NS]:
-            go_struct_name = xsd2go_type.get(type_name)
+            go_struct_name = self.builtin_go_type(type_name)
             if go_struct_name is None:
                 raise RuntimeError(
                     "Cannot find predefined go type for %s",
@@ -313,7 +377,7 @@ class SimpleContentRestriction(Node, AttributeContainerMixin):
                 )
             return go_struct_name
         elif isinstance(self.base_type_instance, SimpleType):
-            return self.base_type_instance.go_type_name()
+            return self.go_type_ref(self.base_type_instance)
 
         base_class_name = self.base_type_instance.go_type_name()
         if self.go_package_name() != self.base_type_instance.go_package_name():
@@ -323,28 +387,30 @@ class SimpleContentRestriction(Node, AttributeContainerMixin):
 
 
 class ComplexContentRestriction(Node, AttributeContainerMixin, ElementContainerMixin):
+    __slots__ = (
+        "nested_type", "base_qname", "nested_attributes",
+        "nested_attribute_groups", "any_attribute", "element_collection",
+        "_attributes", "_elements", "_base_type_instance",
+    )
+
     def _parse(self):
         from .simple_type import SimpleType
 
         self.nested_type = None
-        simple_type_nodes = self.node.xpath(
-            "xsd:simpleType",
-            namespaces=self.schema.nsmap
-        )
-
-        if simple_type_nodes:
+        self.base_qname = self.resolve_qname('base')
+        simple_type_node = self.xsd_child("simpleType")
+        if simple_type_node is not None:
             self.nested_type = SimpleType(
-                self.schema, simple_type_nodes[0], self)
+                self.schema, simple_type_node, self)
         self._parse_attributes()
         self._parse_elements()
 
-    @cached_property
+    @cached_slot
     def base_type_instance(self):
         if self.nested_type is not None:
             return self.nested_type
 
-        type_name, type_ns = self.parse_ref_value(
-            self.node.attrib['base'])
+        type_ns, type_name = self.base_qname
         if type_ns == self.schema.nsmap[XSD_NS]:
             raise RuntimeError(
                 'Cannot return base type instance for builtin type %s',
@@ -364,10 +430,9 @@ class ComplexContentRestriction(Node, AttributeContainerMixin, ElementContainerM
     def go_base_class(self):
         from .simple_type import SimpleType
 
-        type_name, type_ns = self.parse_ref_value(
-            self.node.attrib['base'])
+        type_ns, type_name = self.base_qname
         if type_ns == self.schema.nsmap[XSD_NS]:
-            go_struct_name = xsd2go_type.get(type_name)
+            go_struct_name = self.builtin_go_type(type_name)
             if go_struct_name is None:
                 raise RuntimeError(
                     "Cannot find predefined go type for %s",
@@ -375,7 +440,7 @@ class ComplexContentRestriction(Node, AttributeContainerMixin, ElementContainerM
                 )
             return go_struct_name
         elif isinstance(self.base_type_instance, SimpleType):
-            return self.base_type_instance.go_type_name()
+            return self.go_type_ref(self.base_type_instance)
         
         base_class_name = self.base_type_instance.go_type_name()
         if self.go_package_name() != self.base_type_instance.go_package_name():
@@ -385,23 +450,23 @@ class ComplexContentRestriction(Node, AttributeContainerMixin, ElementContainerM
 
 
 class Content(Node):
-    pass
+    __slots__ = ()
 
 
 class SimpleContent(Content):
+    __slots__ = ("decorator",)
+
     def _parse(self):
         self.decorator = None
 
-        extensions = self.node.xpath(
-            "xsd:extension", namespaces=self.schema.nsmap)
-        if extensions:
-            self.decorator = Extension(self.schema, extensions[0], self)
+        extension = self.xsd_child("extension")
+        if extension is not None:
+            self.decorator = Extension(self.schema, extension, self)
 
-        restrictions = self.node.xpath(
-            "xsd:restriction", namespaces=self.schema.nsmap)
-        if restrictions:
+        restriction = self.xsd_child("restriction")
+        if restriction is not None:
             self.decorator = SimpleContentRestriction(
-                self.schema, restrictions[0], self)
+                self.schema, restriction, self)
 
     def go_base_class(self):
         if self.decorator is None:
@@ -415,19 +480,19 @@ class SimpleContent(Content):
 
 
 class ComplexContent(Content):
+    __slots__ = ("decorator",)
+
     def _parse(self):
         self.decorator = None
 
-        extensions = self.node.xpath(
-            "xsd:extension", namespaces=self.schema.nsmap)
-        if extensions:
-            self.decorator = Extension(self.schema, extensions[0], self)
+        extension = self.xsd_child("extension")
+        if extension is not None:
+            self.decorator = Extension(self.schema, extension, self)
 
-        restrictions = self.node.xpath(
-            "xsd:restriction", namespaces=self.schema.nsmap)
-        if restrictions:
+        restriction = self.xsd_child("restriction")
+        if restriction is not None:
             self.decorator = ComplexContentRestriction(
-                self.schema, restrictions[0], self)
+                self.schema, restriction, self)
 
     def go_base_class(self):
         if self.decorator is None:
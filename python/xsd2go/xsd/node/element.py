@@ -1,8 +1,7 @@
-from cached_property import cached_property
 from lxml import etree
 
-from xsd2go.xsd_go_type import xsd2go_type
-from xsd2go.xsd.util import parse_ref_value
+from xsd2go.go_field import GoField
+from xsd2go.xsd.util import cached_slot
 from xsd2go.constants import XSD_NS
 
 from .base import Node
@@ -10,13 +9,15 @@ from .simple_type import SimpleType
 
 
 class Element(Node):
+    __slots__ = ("index", "nested_type", "ref_qname", "type_qname", "_ref_element", "_type_instance")
+
     def __init__(self, schema, node, parent, index=-1):
         super(Element, self).__init__(schema, node, parent)
         if 'name' in self.node.attrib:
             self.schema.add_element(self)
         self.index = index
 
-    @cached_property
+    @cached_slot
     def name(self):
         _name = self.node.attrib.get('name')
 
@@ -28,17 +29,16 @@ class Element(Node):
                 "Cannot get name from %s" % self.tostring())
         return _name
 
-    @cached_property
+    @cached_slot
     def prefix(self):
         if self.parent is not None:
             return self.parent.prefix + self.name
         else:
             return self.name
 
-    @cached_property
+    @cached_slot
     def ref_element(self):
-        ref_name, ref_ns = self.parse_ref_value(
-            self.node.attrib.get('ref', ""))
+        ref_ns, ref_name = self.ref_qname
         if ref_name is not None:
             ref_element = self.schema.get_element(ref_name, ref_ns)
             if ref_element is None:
@@ -47,7 +47,7 @@ class Element(Node):
             return ref_element
         return None
 
-    @cached_property
+    @cached_slot
     def type_instance(self):
         if self.nested_type is not None:
             return self.nested_type
@@ -57,8 +57,7 @@ class Element(Node):
             if 'type' not in self.node.attrib:
                 raise RuntimeError(
                     "Cannot find type for %s" % self.tostring()) 
-            type_name, type_ns = self.parse_ref_value(
-                self.node.attrib['type'])
+            type_ns, type_name = self.type_qname
             if type_ns == self.schema.nsmap[XSD_NS]:
                 raise RuntimeError(
                     'Cannot return type instance for builtin type %s',
@@ -88,23 +87,17 @@ class Element(Node):
         from .simple_type import SimpleType
         from .complex_type import ComplexType
         self.nested_type = None
+        self.ref_qname = self.resolve_qname('ref')
+        self.type_qname = self.resolve_qname('type')
 
-        simple_type_node = self.node.xpath(
-            "xsd:simpleType",
-            namespaces=self.schema.nsmap
-        )
-
-        if simple_type_node:
+        simple_type_node = self.xsd_child("simpleType")
+        if simple_type_node is not None:
             self.nested_type = SimpleType(
-                self.schema, simple_type_node[0], self)
+                self.schema, simple_type_node, self)
 
-        complex_type_node = self.node.xpath(
-            "xsd:complexType",
-            namespaces=self.schema.nsmap
-        )
-
-        if complex_type_node:
-            self.nested_type = ComplexType(self.schema, complex_type_node[0], self)
+        complex_type_node = self.xsd_child("complexType")
+        if complex_type_node is not None:
+            self.nested_type = ComplexType(self.schema, complex_type_node, self)
 
         # if self.nested_type is not None and self.nested_type.name is None:
         #     self.nested_type.name = self.name + "Type"
@@ -121,15 +114,18 @@ class Element(Node):
         if self.ref_element is not None:
             ref_go_def = self.ref_element.export_go_def()
             if ref_go_def is not None:
-                if self.ref_element.go_package_name() != self.go_package_name():
-                    if isinstance(ref_go_def['type_instance'], ComplexType) and len(ref_go_def['type_name'].split('.')) == 1:
-                        ref_go_def['type_name'] = self.ref_element.go_package_name() + "." + ref_go_def['type_name']
+                if (
+                    ref_go_def.type_instance is not None
+                    and ref_go_def.type_instance.go_type_instance() is not None
+                ):
+                    ref_go_def = ref_go_def.replace(
+                        type_name=self.go_type_ref(ref_go_def.type_instance))
                 if 'maxOccurs' in self.node.attrib:
-                    ref_go_def['is_array'] = (self.node.attrib['maxOccurs'] != '1')
+                    ref_go_def = ref_go_def.replace(
+                        is_array=(self.node.attrib['maxOccurs'] != '1'))
             return ref_go_def
 
-        type_name, type_ns = self.parse_ref_value(
-            self.node.attrib.get('type', ''))
+        type_ns, type_name = self.type_qname
 
         is_array = self.node.attrib.get('maxOccurs', '1') != '1'
         is_pointer = True
@@ -138,7 +134,7 @@ class Element(Node):
 
         # If element's type is builtin type, we don't use pointer
         if type_ns == self.schema.nsmap[XSD_NS]:
-            go_struct_name = xsd2go_type.get(type_name)
+            go_struct_name = self.builtin_go_type(type_name)
             if go_struct_name is None:
                 raise RuntimeError(
                     "Cannot find predefined go type for %s",
@@ -156,19 +152,15 @@ class Element(Node):
                 )
             else:
                 is_pointer = isinstance(self.type_instance, ComplexType)
-            if (
-                isinstance(self.type_instance, ComplexType)
-                and self.type_instance.go_package_name() != self.go_package_name()
-            ):
-                go_struct_name = self.type_instance.go_package_name() + '.' + go_struct_name
-
-        return {
-            "field_name": self.name.capitalize(),
-            "type_name": go_struct_name,
-            "is_array": is_array,
-            "is_pointer": is_pointer,
-            "type_instance": type_instance,
-            "xml_field_name": self.name,
-            "xml_field_suffix": "omitempty",
-            "index": self.index,
-        }
+            go_struct_name = self.go_type_ref(self.type_instance)
+
+        return GoField(
+            field_name=self.name.capitalize(),
+            type_name=go_struct_name,
+            is_array=is_array,
+            is_pointer=is_pointer,
+            type_instance=type_instance,
+            xml_field_name=self.name,
+            xml_field_suffix="omitempty",
+            index=self.index,
+        )
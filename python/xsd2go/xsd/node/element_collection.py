@@ -1,58 +1,97 @@
-from cached_property import cached_property
 from lxml import etree
 
-from xsd2go.xsd.util import parse_ref_value, parse_tag
+from xsd2go.xsd.util import (
+    COLLECTION, cached_slot, parse_occurs, parse_tag, particle_tags
+)
 from .base import Node
 
 
 def create_collection(schema, node, parent):
     tag, _ = parse_tag(node.tag)
-    if tag == "group":
-        return Group(schema, node, parent)
-    elif tag == "all":
-        return All(schema, node, parent)
-    elif tag == "choice":
-        return Choice(schema, node, parent)
-    elif tag == "sequence":
-        return Sequence(schema, node, parent)
-    else:
+    collection_class = collection_classes.get(tag)
+    if collection_class is None:
         raise RuntimeError(
             "Cannot parse the collection node:\n%s" % etree.tostring(node).decode("utf8"))
+    return collection_class(schema, node, parent)
 
 
 class ElementCollection(Node):
-    @cached_property
+    __slots__ = (
+        "nested_elements", "collections", "particles", "wildcards",
+        "_elements",
+    )
+
+    @cached_slot
     def elements(self):
         elements = self.nested_elements
         for collection in self.collections:
             elements = elements + collection.elements
         return elements
 
+    def element_occurs(self):
+        # Element => (min occurs, max occurs) of the element in the content
+        # model of this collection, max occurs is None when unbounded
+        min_occurs, max_occurs = parse_occurs(self.node.attrib)
+        content_occurs = self.content_occurs()
+        if isinstance(self, Choice) and len(content_occurs) > 1:
+            # Every element of a choice may be left out
+            min_occurs = 0
+        return dict(
+            (element, (
+                min_occurs * element_min,
+                None if max_occurs is None or element_max is None
+                else max_occurs * element_max,
+            ))
+            for element, (element_min, element_max) in content_occurs.items()
+        )
+
+    def content_occurs(self):
+        occurs = dict(
+            (element, parse_occurs(element.node.attrib))
+            for element in self.nested_elements
+        )
+        for collection in self.collections:
+            for element, element_occurs in collection.element_occurs().items():
+                occurs.setdefault(element, element_occurs)
+        return occurs
+
     def _parse(self):
         from .element import Element
 
+        # Attributes of the xsd:any wildcards
+        self.wildcards = [
+            dict(node.attrib) for node in self.xsd_children.get("any", ())]
         self.nested_elements = [
             Element(self.schema, node, self, index)
-            for index, node in enumerate(self.node.xpath(
-                "xsd:element",
-                namespaces=self.schema.nsmap
-            ))
+            for index, node in enumerate(self.xsd_children.get("element", ()))
         ]
         self.collections = [
             create_collection(self.schema, node, self)
-            for node in self.node.xpath(
-                "*[self::xsd:group or self::xsd:all or self::xsd:choice or self::xsd:sequence]",
-                namespaces=self.schema.nsmap
-            )
+            for node in self.xsd_children.get(COLLECTION, ())
         ]
+        # Nested elements, wildcards and collections in document order
+        particles = {
+            "element": iter(self.nested_elements),
+            "any": iter(self.wildcards),
+        }
+        collections = iter(self.collections)
+        self.particles = tuple(
+            next(particles.get(tag, collections))
+            for tag in particle_tags(self.node)
+        )
 
 
 class Group(ElementCollection):
-    @cached_property
+    __slots__ = ("ref_qname",)
+
+    def _parse(self):
+        self.ref_qname = self.resolve_qname('ref')
+        super(Group, self)._parse()
+
+    @cached_slot
     def elements(self):
-        if 'ref' in self.node.attrib:
-            ref_name, ref_ns = self.parse_ref_value(
-                self.node.attrib['ref'])
+        if self.ref_qname[1] is not None:
+            ref_ns, ref_name = self.ref_qname
             refered_element_group = self.schema.get_element_group(
                 ref_name, ref_ns)
             if refered_element_group is None:
@@ -62,14 +101,29 @@ class Group(ElementCollection):
                 return refered_element_group.elements
         return super(Group, self).elements
 
+    def content_occurs(self):
+        if self.ref_qname[1] is not None:
+            ref_ns, ref_name = self.ref_qname
+            return self.schema.get_element_group(
+                ref_name, ref_ns).element_occurs()
+        return super(Group, self).content_occurs()
+
 
 class All(ElementCollection):
-    pass
+    __slots__ = ()
 
 
 class Choice(ElementCollection):
-    pass
+    __slots__ = ()
 
 
 class Sequence(ElementCollection):
-    pass
+    __slots__ = ()
+
+
+collection_classes = {
+    "group": Group,
+    "all": All,
+    "choice": Choice,
+    "sequence": Sequence,
+}
@@ -1,22 +1,31 @@
-from cached_property import cached_property
+from xsd2go.xsd.util import COLLECTION, cached_slot
 
 
 class ElementContainerMixin(object):
-    @cached_property
+    __slots__ = ()
+
+    @cached_slot
     def elements(self):
         return self.element_collection.elements
 
+    def element_go_defs(self):
+        # GoField of the elements, with their occurrences in the content model
+        occurs = self.element_collection.element_occurs()
+        for elem in self.elements:
+            go_attr = elem.export_go_def()
+            if go_attr is not None:
+                min_occurs, max_occurs = occurs[elem]
+                go_attr = go_attr.with_occurs(min_occurs, max_occurs)
+            yield go_attr
+
     def _parse_elements(self):
         from .element_collection import Sequence, create_collection
 
         self.element_collection = None
 
-        collection_nodes = self.node.xpath(
-            "*[self::xsd:group or self::xsd:all or self::xsd:choice or self::xsd:sequence]",
-            namespaces=self.schema.nsmap
-        )
-        if collection_nodes:
-            self.element_collection = create_collection(self.schema, collection_nodes[0], self)
+        collection_node = self.xsd_child(COLLECTION)
+        if collection_node is not None:
+            self.element_collection = create_collection(self.schema, collection_node, self)
 
         if self.element_collection is None:
             # By default, the indicator is Sequence
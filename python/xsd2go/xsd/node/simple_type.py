@@ -1,61 +1,201 @@
-from cached_property import cached_property
+from os.path import join
 
-from xsd2go.xsd.util import parse_ref_value, parse_tag
 from xsd2go.constants import XSD_NS
+from xsd2go.golang.enum import enum_model, enum_source
+from xsd2go.golang.list import ListModel, list_source
+from xsd2go.golang.union import union_model, union_source
+from xsd2go.output import GoSource, OutputWriter, TypeFiles
+from xsd2go.xsd.util import cached_slot
 
-from xsd2go.xsd_go_type import xsd2go_type
 from .base import Node
 from .type_decorator import SimpleTypeRestriction, List, Union
 
 
 class SimpleType(Node):
+    __slots__ = ("content", "_go_enum_model")
+
+    # Content node classes, when several contents are defined the last one
+    # of this table is used
+    content_classes = (
+        ("restriction", SimpleTypeRestriction),
+        ("list", List),
+        ("union", Union),
+    )
+
+
     def __init__(self, schema, node, parent):
         super(SimpleType, self).__init__(schema, node, parent)
         if 'name' in self.node.attrib:
             self.schema.add_type_instance(self)
     
-    @cached_property
+    @cached_slot
     def name(self):
-        name_attr = self.node.attrib.get('name')
-        name_attr = (name_attr and name_attr[0]) or None
-        return name_attr
+        return self.node.attrib.get('name')
+
+    @cached_slot
+    def prefix(self):
+        if self.name is not None:
+            return self.name
+        if isinstance(self.parent, Union):
+            return self.parent.member_prefix(self)
+        return self.parent.prefix
 
     def go_type_name(self):
+        if self.exports_go_type:
+            return self.name or self.prefix + 'BuiltinType'
         if self.content is None:
             raise RuntimeError(
                 "SimpleType %s's def is empty", self.name)
         return self.content.go_type_name()
 
+    def go_enum(self):
+        # Restriction listing the values of an enumeration, None if the type
+        # isn't generated as a go enum
+        if not self.schema.project.go_types.enums:
+            return None
+        content = self.content
+        if isinstance(content, SimpleTypeRestriction) and content.enumerations:
+            return content
+        return None
+
+    def go_list(self):
+        # List of the type, None if the type isn't generated as a go slice
+        if not self.schema.project.go_types.lists:
+            return None
+        if isinstance(self.content, List):
+            return self.content
+        return None
+
+    def go_union(self):
+        # Union of the type, None if the type isn't generated as a go struct
+        if not self.schema.project.go_types.unions:
+            return None
+        if isinstance(self.content, Union):
+            return self.content
+        return None
+
+    @property
+    def exports_go_type(self):
+        return (
+            self.go_enum() is not None or self.go_list() is not None
+            or self.go_union() is not None
+        )
+
+    def go_type_instance(self):
+        # Type exported for the values of this type, None if they are
+        # builtin go types
+        if self.exports_go_type:
+            return self
+        if isinstance(self.content, SimpleTypeRestriction):
+            base_type_instance = self.content.base_type_instance()
+            if base_type_instance is not None:
+                return base_type_instance.go_type_instance()
+        return None
+
+    def go_facets(self):
+        # Facets of each restriction from this type to its builtin type, the
+        # values must satisfy all of them
+        steps = []
+        content = self.content
+        while isinstance(content, SimpleTypeRestriction):
+            if content.facets:
+                steps.append(content.facets)
+            base_type_instance = content.base_type_instance()
+            if not isinstance(base_type_instance, SimpleType):
+                break
+            content = base_type_instance.content
+        return steps
+
+    def go_underlying_type(self):
+        # Builtin go type of the values, None for the unions
+        type_instance = self.go_type_instance()
+        if type_instance is None:
+            return self.go_type_name()
+        if type_instance.go_union() is not None:
+            return None
+        if type_instance.go_list() is not None:
+            return "[]" + type_instance.go_list().item_go_type()
+        return type_instance.go_enum_model.underlying_type
+
+    @cached_slot
+    def go_enum_model(self):
+        restriction = self.go_enum()
+        return enum_model(
+            self.go_type_name(), restriction.enumerations,
+            restriction.go_type_name())
+
     def go_struct_attributes(self):
         return []
 
     def _parse(self):
         self.content = None
-        restriction_node = self.node.xpath(
-            "xsd:restriction",
-            namespaces=self.schema.nsmap
-        )
-        if restriction_node:
-            restriction_node = restriction_node[0]
-            self.content = SimpleTypeRestriction(
-                self.schema, restriction_node, self)
-
-        list_node = self.node.xpath(
-            "xsd:list",
-            namespaces=self.schema.nsmap
-        )
-        if list_node:
-            self.content = List(self.schema, list_node[0], self)
-
-        union_node = self.node.xpath(
-            "xsd:union",
-            namespaces=self.schema.nsmap
-        )
-        if union_node:
-            self.content = Union(self.schema, union_node[0], self)
+        for tag, content_class in self.content_classes:
+            content_node = self.xsd_child(tag)
+            if content_node is not None:
+                self.content = content_class(self.schema, content_node, self)
 
     def go_struct_def(self):
         return None
 
-    def export_go_struct(self, base_class, base_module):
-        return
\ No newline at end of file
+    def go_source(self, base_path, base_module, options=None):
+        # options: GoOptions of the methods generated with the type
+        items = self.go_list()
+        members = self.go_union()
+        if items is not None:
+            go_types = [items.item_go_type()]
+            source = list_source(
+                ListModel(self.go_type_name(), go_types[0]), options)
+        elif members is not None:
+            go_members = members.go_members()
+            go_types = [go_type for _, go_type, _ in go_members]
+            source = union_source(
+                union_model(self.go_type_name(), go_members), options)
+        else:
+            go_types = []
+            source = enum_source(self.go_enum_model, options)
+        imports = set(source.imports)
+        imports.update(self.schema.project.go_types.go_imports(go_types))
+        for exported in self.go_type_dependencies():
+            package = exported.go_package_name()
+            if package != self.go_package_name():
+                imports.add('"' + join(base_module, base_path, package) + '"')
+        return GoSource(
+            package=self.schema.go_package_name(),
+            dir_name=join(base_path, self.go_package_name()),
+            type_name=self.go_type_name(),
+            imports=sorted(imports),
+            code=source.code,
+            helpers=tuple(sorted(source.helpers)),
+        )
+
+    def go_type_dependencies(self):
+        # Exported types of the items of a list or of the union members
+        if self.go_list() is not None:
+            type_instances = [self.go_list().item_type_instance()]
+        elif self.go_union() is not None:
+            type_instances = [
+                type_instance for _, type_instance
+                in self.go_union().member_type_instances()
+            ]
+        else:
+            return ()
+        dependencies = []
+        for type_instance in type_instances:
+            if type_instance is None:
+                continue
+            exported = type_instance.go_type_instance()
+            if exported is not None and exported not in dependencies:
+                dependencies.append(exported)
+        return tuple(dependencies)
+
+    def export_go_struct(self, base_path, base_module, output=None, options=None):
+        from xsd2go.exporter import Exporter
+
+        if not self.exports_go_type:
+            return
+        flush = output is None
+        if flush:
+            output = TypeFiles(OutputWriter())
+        Exporter(base_path, base_module, output, options).export([self])
+        if flush:
+            output.flush()
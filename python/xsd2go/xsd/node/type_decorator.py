@@ -1,41 +1,106 @@
-from cached_property import cached_property
-
 from xsd2go.constants import XSD_NS
-from xsd2go.xsd.util import parse_ref_value, parse_tag
+
+from xsd2go.xsd.util import cached_slot, resolve_qname
 
 from .base import Node
-from xsd2go.xsd_go_type import xsd2go_type
+
+
+# Facets checked by the generated Validate methods and by xsd2go.validation,
+# the Validate methods skip the exclusive bounds and fractionDigits
+VALIDATED_FACETS = (
+    "length", "minLength", "maxLength", "pattern", "minInclusive",
+    "maxInclusive", "totalDigits", "minExclusive", "maxExclusive",
+    "fractionDigits",
+)
 
 
 class SimpleTypeRestriction(Node):
+    __slots__ = ("base_qname", "enumerations", "facets")
+
     def _parse(self):
-        pass
+        self.base_qname = self.resolve_qname('base')
+        # Values of the enumeration facets in declaration order
+        self.enumerations = tuple(
+            child.attrib.get('value', '')
+            for child in self.xsd_children.get('enumeration', ())
+        )
+        # (facet name, value) of the other facets
+        self.facets = tuple(
+            (name, child.attrib.get('value', ''))
+            for name in VALIDATED_FACETS
+            for child in self.xsd_children.get(name, ())
+        )
 
     "Restriction element nested in simple type"
-    # TODO: ADD restriction parsing for msg validation
+    def base_type_instance(self):
+        # Simple type restricted, None for builtin types
+        base_type_ns, base_type_name = self.base_qname
+        if base_type_ns == self.schema.nsmap[XSD_NS]:
+            return None
+        refered_type_instance = self.schema.get_type_instance(
+            base_type_name, base_type_ns)
+        if refered_type_instance is None:
+            raise RuntimeError(
+                "Cannot find ref type for %s" % self.tostring())
+        return refered_type_instance
+
     def go_type_name(self):
-        base_type_name, base_type_ns = self.parse_ref_value(
-            self.node.attrib['base'])
+        base_type_ns, base_type_name = self.base_qname
         if base_type_ns == self.schema.nsmap[XSD_NS]:
-            return xsd2go_type[base_type_name]
-        else:
-            refered_type_instance = self.schema.get_type_instance(
-                base_type_name, base_type_ns)
-            if refered_type_instance is None:
+            go_type_name = self.builtin_go_type(base_type_name)
+            if go_type_name is None:
                 raise RuntimeError(
-                    "Cannot find ref type for %s" % self.tostring())
-            else:
-                return refered_type_instance.go_type_name()
+                    "Cannot find predefined go type for %s" % self.tostring())
+            return go_type_name
+        return self.go_type_ref(self.base_type_instance())
 
     def go_struct_attributes(self):
         return []
 
 
 class List(Node):
+    __slots__ = ("item_qname", "nested_type")
+
     def _parse(self):
-        pass
+        from .simple_type import SimpleType
+
+        self.item_qname = self.resolve_qname('itemType')
+        self.nested_type = None
+        simple_type_node = self.xsd_child("simpleType")
+        if simple_type_node is not None:
+            self.nested_type = SimpleType(self.schema, simple_type_node, self)
 
-    # TODO: ADD list parsing for msg validation
+    @cached_slot
+    def prefix(self):
+        # Nested item types are named after the list
+        return self.parent.prefix + "Item"
+
+    def item_type_instance(self):
+        # Simple type of the items, None for builtin types
+        if self.nested_type is not None:
+            return self.nested_type
+        item_ns, item_name = self.item_qname
+        if item_ns == self.schema.nsmap[XSD_NS]:
+            return None
+        refered_type_instance = self.schema.get_type_instance(
+            item_name, item_ns)
+        if refered_type_instance is None:
+            raise RuntimeError(
+                "Cannot find item type for %s" % self.tostring())
+        return refered_type_instance
+
+    def item_go_type(self):
+        item_type_instance = self.item_type_instance()
+        if item_type_instance is not None:
+            return self.go_type_ref(item_type_instance)
+        go_type_name = self.builtin_go_type(self.item_qname[1])
+        if go_type_name is None:
+            raise RuntimeError(
+                "Cannot find predefined go type for %s" % self.tostring())
+        return go_type_name
+
+    # Lists are strings unless they are generated as go slices, see
+    # SimpleType.go_list
     def go_type_name(self):
         return "string"
 
@@ -44,10 +109,65 @@ class List(Node):
 
 
 class Union(Node):
+    __slots__ = ("member_qnames", "nested_types")
+
     def _parse(self):
-        pass
+        from .simple_type import SimpleType
+
+        self.member_qnames = tuple(
+            resolve_qname(value, self.nsmap_key)
+            for value in self.node.attrib.get('memberTypes', '').split()
+        )
+        self.nested_types = tuple(
+            SimpleType(self.schema, child, self)
+            for child in self.xsd_children.get("simpleType", ())
+        )
+
+    def member_prefix(self, nested_type):
+        # Anonymous member types are named after their position, the
+        # memberTypes come first
+        position = len(self.member_qnames) + self.nested_types.index(
+            nested_type) + 1
+        return "%sMember%d" % (self.parent.prefix, position)
+
+    def member_type_instances(self):
+        # (name, simple type) of the member types in declaration order, the
+        # simple type is None for builtin types
+        members = []
+        for member_ns, member_name in self.member_qnames:
+            if member_ns == self.schema.nsmap[XSD_NS]:
+                members.append((member_name, None))
+                continue
+            refered_type_instance = self.schema.get_type_instance(
+                member_name, member_ns)
+            if refered_type_instance is None:
+                raise RuntimeError(
+                    "Cannot find member type %s for %s" % (
+                        member_name, self.tostring()))
+            members.append((member_name, refered_type_instance))
+        for position, nested_type in enumerate(
+            self.nested_types, len(self.member_qnames) + 1
+        ):
+            members.append(("Member%d" % position, nested_type))
+        return members
+
+    def go_members(self):
+        # (name, go type, simple type) of the member types
+        members = []
+        for name, type_instance in self.member_type_instances():
+            if type_instance is not None:
+                go_type_name = self.go_type_ref(type_instance)
+            else:
+                go_type_name = self.builtin_go_type(name)
+                if go_type_name is None:
+                    raise RuntimeError(
+                        "Cannot find predefined go type for %s" % (
+                            self.tostring()))
+            members.append((name, go_type_name, type_instance))
+        return members
 
-    # TODO: ADD Union parsing for msg validation
+    # Unions are strings unless they are generated as go structs, see
+    # SimpleType.go_union
     def go_type_name(self):
         return "string"
 
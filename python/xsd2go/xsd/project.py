@@ -1,22 +1,220 @@
 # XSD project contains all schema files
 import glob
-from os.path import join, relpath
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from os.path import exists, join, normpath, relpath
 
+from lxml import etree
+
+from xsd2go.xsd.util import XSD_TAG_PREFIX, parse_tag
+
+from xsd2go.xsd_go_type import GoTypeMapping
+
+from .cache import SchemaCache
 from .schema import Schema
+from .symbol_index import ELEMENT, SymbolIndex
+
+
+def build_schema(file_path, recursive, streaming):
+    # Executed in worker processes, the loaded schema is pickled back to the
+    # parent which attaches it to its project. It is detached from its tree
+    # first, so the parent doesn't parse the file again.
+    return Schema(
+        None, file_path, recursive=recursive, streaming=streaming
+    ).load().detach()
+
+
+class DeclaredElements(object):
+    # Parser target reading the target namespace and the names of the global
+    # elements of a xsd file: no tree is built, the nested nodes are only
+    # counted
+    def __init__(self):
+        self.target_ns = None
+        self.names = set()
+        self.depth = 0
+
+    def start(self, tag, attrib):
+        if self.depth == 0:
+            self.target_ns = attrib.get("targetNamespace")
+        elif self.depth == 1 and tag == XSD_TAG_PREFIX + "element":
+            name = attrib.get("name")
+            if name is not None:
+                self.names.add(name)
+        self.depth += 1
+
+    def end(self, tag):
+        self.depth -= 1
+
+    def close(self):
+        return self.target_ns, self.names
+
+
+def declared_elements(file_path):
+    # Target namespace and names of the global elements of a xsd file
+    return etree.parse(file_path, etree.XMLParser(target=DeclaredElements()))
+
+
+def parse_root(root):
+    # `{namespace}name` or `name` => (namespace, name)
+    name, ns = parse_tag(root)
+    return ns or None, name
 
 
 class Project(object):
-    def __init__(self, path):
+    def __init__(self, path, cache_path=None, streaming=False, go_types=None):
         self.path = path
+        # Load the xsd files with the streaming loader
+        self.streaming = streaming
+        # GoTypeMapping of the xsd builtin types
+        self.go_types = go_types or GoTypeMapping()
         self.schemas = {}
+        self.symbol_index = None
+
+        self.cache = None
+        if cache_path is not None:
+            self.cache = SchemaCache(cache_path)
+        # Schemas built from their xsd file in this run
+        self._built_schemas = []
+
+    def xsd_files(self):
+        return glob.glob(join(self.path, "*.xsd"), recursive=True)
 
-    def load_schema(self, recursive=False):
-        xsd_files = glob.glob(
-            join(self.path, "*.xsd"), recursive=True)
+    def load_schema(self, recursive=False, jobs=1, roots=None):
+        # With `roots`, only the schemas defining the root elements and the
+        # schemas they include or import are loaded
+        if roots:
+            self._load_reachable_schemas(roots, recursive, jobs)
+        else:
+            self._load_files(self.xsd_files(), recursive, jobs)
+
+        self.symbol_index = SymbolIndex(self.schemas)
+
+        if self.cache is not None:
+            for schema in self._built_schemas:
+                dependencies = [
+                    path for path in self.symbol_index.visible_schemas(schema)
+                    if path != schema.file_path
+                ]
+                # Saved without its tree, so loading the entry doesn't
+                # parse the xsd file
+                self.cache.save(schema.detach(), dependencies)
+        self._built_schemas = []
+
+    def _load_files(self, xsd_files, recursive, jobs):
+        xsd_files = [
+            f for f in xsd_files
+            if relpath(f, self.path) not in self.schemas
+        ]
+
+        loaded = {}
+        if self.cache is not None:
+            for f in xsd_files:
+                schema = self.cache.load(f, recursive, self.streaming)
+                if schema is not None:
+                    print('loading %s from cache' % f)
+                    schema.project = self
+                    loaded[f] = schema
+
+        to_build = [f for f in xsd_files if f not in loaded]
+        if jobs > 1 and len(to_build) > 1:
+            built = self._build_schema_parallel(to_build, recursive, jobs)
+        else:
+            built = self._build_schema_serial(to_build, recursive)
+        self._built_schemas.extend(built)
+        loaded.update(zip(to_build, built))
+
+        for f in xsd_files:
+            self.schemas[relpath(f, self.path)] = loaded[f]
+
+    def _build_schema_serial(self, xsd_files, recursive):
+        schemas = []
         for f in xsd_files:
-            if f not in self.schemas:
+            print('loading %s' % f)
+            schemas.append(Schema(
+                self, f, recursive=recursive, streaming=self.streaming
+            ).load())
+        return schemas
+
+    def _build_schema_parallel(self, xsd_files, recursive, jobs):
+        schemas = []
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for f, schema in zip(xsd_files, executor.map(
+                build_schema, xsd_files, repeat(recursive),
+                repeat(self.streaming)
+            )):
                 print('loading %s' % f)
-                rel_path = relpath(f, self.path)
-                self.schemas[rel_path] = Schema(
-                    self, f, recursive=recursive
-                ).load()
+                schema.project = self
+                schemas.append(schema)
+        return schemas
+
+    def root_schema_files(self, roots):
+        roots = set(parse_root(root) for root in roots)
+        xsd_files = []
+        found = set()
+        for f in self.xsd_files():
+            target_ns, names = self.declared_elements(f)
+            declared = set(
+                (target_ns or None, name) for name in names) & roots
+            if declared:
+                xsd_files.append(f)
+                found |= declared
+
+        missing = roots - found
+        if missing:
+            raise RuntimeError(
+                "Cannot find xsd file of root elements %s" % ", ".join(
+                    "{%s}%s" % (ns or "", name) for ns, name in sorted(
+                        missing, key=lambda root: (root[0] or "", root[1]))
+                )
+            )
+        return xsd_files
+
+    def declared_elements(self, file_path):
+        # The declarations of the unchanged files are read from the cache
+        if self.cache is None:
+            return declared_elements(file_path)
+        declarations = self.cache.load_declarations(file_path)
+        if declarations is None:
+            declarations = declared_elements(file_path)
+            self.cache.save_declarations(file_path, declarations)
+        return declarations
+
+    def _load_reachable_schemas(self, roots, recursive, jobs):
+        pending = self.root_schema_files(roots)
+        while pending:
+            self._load_files(pending, recursive, jobs)
+            pending = []
+            for schema in self.schemas.values():
+                for path in schema.included_schema_paths + schema.imported_schema_paths:
+                    file_path = normpath(join(self.path, path))
+                    if (
+                        relpath(file_path, self.path) not in self.schemas
+                        and file_path not in pending
+                        and exists(file_path)
+                    ):
+                        pending.append(file_path)
+
+    def type_instances(self):
+        # Global types and the nested types of the global elements of all
+        # schemas, the types exported without --root
+        type_instances = []
+        for name, s in self.schemas.items():
+            if s is None:
+                raise RuntimeError("Cannot find xsd file of %s", name)
+            type_instances.extend(s.name2type_instance.values())
+            for element in s.element_collection:
+                if element.nested_type is not None:
+                    type_instances.append(element.nested_type)
+        return type_instances
+
+    def root_elements(self, roots):
+        elements = []
+        for root in roots:
+            ns, name = parse_root(root)
+            declarations = self.symbol_index.declarations(ELEMENT, name, ns)
+            if len(declarations) != 1:
+                raise RuntimeError(
+                    "Cannot find a single declaration of root element %s, "
+                    "%d found" % (root, len(declarations)))
+            elements.append(declarations[0])
+        return elements
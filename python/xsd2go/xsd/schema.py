@@ -4,7 +4,8 @@ from os.path import basename
 from cached_property import cached_property
 from lxml import etree
 
-from xsd2go.constants import XSD_NS
+from xsd2go.constants import XSD_NS, XSD_NAMESPACE
+from xsd2go.xsd.util import xsd_children
 
 from .node.element import Element
 from .node.attribute import Attribute
@@ -12,13 +13,39 @@ from .node.simple_type import SimpleType
 from .node.complex_type import ComplexType
 from .node.attribute_container import AttributeGroup
 from .node.element_collection import Group
+from .snapshot import NsmapTable
+from .streaming import StreamingLoader
+from .symbol_index import (
+    ELEMENT, TYPE, ATTRIBUTE, ATTRIBUTE_GROUP, ELEMENT_GROUP
+)
+
+
+include_xpath = etree.XPath(
+    "xsd:include", namespaces={XSD_NS: XSD_NAMESPACE})
+import_xpath = etree.XPath(
+    "xsd:import", namespaces={XSD_NS: XSD_NAMESPACE})
+
+# Classes of the global declarations, in build order
+declaration_classes = {
+    "element": Element,
+    "attribute": Attribute,
+    "simpleType": SimpleType,
+    "complexType": ComplexType,
+    "attributeGroup": AttributeGroup,
+    "group": Group,
+}
 
 
 class Schema(object):
-    def __init__(self, project, file_path, recursive=False):
+    def __init__(self, project, file_path, recursive=False, streaming=False):
         self.project = project
         self.file_path = file_path
-        self.xml_tree = etree.parse(open(file_path))
+        # Streamed schemas don't keep the xml tree, their nodes hold
+        # snapshots of their elements
+        self.streaming = streaming
+        self.xml_tree = None
+        if not streaming:
+            self.xml_tree = etree.parse(file_path)
 
         self.name2element = {}
         self.name2attribute = {}
@@ -27,7 +54,39 @@ class Schema(object):
         self.name2element_group = {}
 
         self.recursive = recursive
-        self.exported_class = set()
+
+        # All nodes built from this file, in creation order
+        self.nodes = []
+
+    def __getstate__(self):
+        # lxml trees cannot be pickled, the schemas are detached first and
+        # their snapshots are pickled as they are
+        if self.xml_tree is not None:
+            raise RuntimeError(
+                "Cannot pickle %s before it is detached" % self.file_path)
+        state = self.__dict__.copy()
+        state.pop('project', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.project = None
+
+    def detach(self):
+        # Replaces the lxml elements of the loaded nodes by snapshots, as the
+        # streaming loader does, so the schema is pickled without its tree:
+        # the workers and the cache never parse the file again
+        if self.xml_tree is None:
+            return self
+        # Read from the tree before it is dropped
+        self.included_schema_paths
+        self.imported_schema_paths
+        nsmaps = NsmapTable()
+        for node in self.nodes:
+            node.detach(nsmaps)
+        self.root = nsmaps.snapshot(self.root)
+        self.xml_tree = None
+        return self
 
     def go_package_name(self):
         return basename(self.file_path).split('.')[0].replace('-', '_')
@@ -37,19 +96,7 @@ class Schema(object):
             self.name2element[element.node.attrib['name']] = element
 
     def get_element(self, name, ns):
-        element = self.name2element.get(name)
-        if element is not None and not element.is_same_ns(ns):
-            element = None
-        
-        if element is None:
-            for schema_path in self.included_schema_paths + self.imported_schema_paths:
-                schema = self.project.schemas[schema_path]
-                element = schema.get_element(name, ns)
-                if element is not None and not element.is_same_ns(ns):
-                    element = None
-                if element is not None:
-                    break
-        return element
+        return self.project.symbol_index.lookup(ELEMENT, name, ns, self)
 
     def add_type_instance(self, type_instance):
         if self.recursive and type_instance.node.attrib['name'] in self.name2type_instance:
@@ -58,18 +105,7 @@ class Schema(object):
         self.name2type_instance[type_instance.node.attrib['name']] = type_instance
 
     def get_type_instance(self, name, ns):
-        type_instance = self.name2type_instance.get(name)
-        if type_instance is not None and not type_instance.is_same_ns(ns):
-            type_instance = None
-        if type_instance is None:
-            for schema_path in self.included_schema_paths + self.imported_schema_paths:
-                schema = self.project.schemas[schema_path]
-                type_instance = schema.get_type_instance(name, ns)
-                if type_instance is not None and not type_instance.is_same_ns(ns):
-                    type_instance = None
-                if type_instance is not None:
-                    break
-        return type_instance
+        return self.project.symbol_index.lookup(TYPE, name, ns, self)
 
     def add_attribute(self, attribute):
         if self.recursive and attribute.node.attrib['name'] in self.name2attribute:
@@ -80,57 +116,23 @@ class Schema(object):
         self.name2attribute[attribute.node.attrib['name']] = attribute
 
     def get_attribute(self, name, ns):
-        attribute = self.name2attribute.get(name)
-        if attribute is not None and not attribute.is_same_ns(ns):
-            attribute = None
-        
-        if attribute is None:
-            for schema_path in self.included_schema_paths + self.imported_schema_paths:
-                schema = self.project.schemas[schema_path]
-                attribute = schema.get_attribute(name, ns)
-                if attribute is not None and not attribute.is_same_ns(ns):
-                    attribute = None
-                if attribute is not None:
-                    break
-        return attribute
+        return self.project.symbol_index.lookup(ATTRIBUTE, name, ns, self)
 
     def add_attribute_group(self, attribute_group):
         if self.recursive:
             self.name2attribute_group[attribute_group.node.attrib['name']] = attribute_group
 
     def get_attribute_group(self, name, ns):
-        attribute_group = self.name2attribute_group.get(name)
-        if attribute_group is not None and not attribute_group.is_same_ns(ns):
-            attribute_group = None
-
-        if attribute_group is None:
-            for schema_path in self.included_schema_paths + self.imported_schema_paths:
-                schema = self.project.schemas[schema_path]
-                attribute_group = schema.get_attribute_group(name, ns)
-                if attribute_group is not None and not attribute_group.is_same_ns(ns):
-                    attribute_group = None
-                if attribute_group is not None:
-                    break
-        return attribute_group
+        return self.project.symbol_index.lookup(
+            ATTRIBUTE_GROUP, name, ns, self)
 
     def add_element_group(self, element_group):
         if self.recursive:
             self.name2element_group[element_group.node.attrib['name']] = element_group
 
     def get_element_group(self, name, ns):
-        element_group = self.name2element_group.get(name)
-        if element_group is not None and not element_group.is_same_ns(ns):
-            element_group = None
-        
-        if element_group is None:
-            for schema_path in self.included_schema_paths + self.imported_schema_paths:
-                schema = self.project.schemas[schema_path]
-                element_group = schema.get_element_group(name, ns)
-                if element_group is not None and not element_group.is_same_ns(ns):
-                    element_group = None
-                if element_group is not None:
-                    break
-        return element_group
+        return self.project.symbol_index.lookup(
+            ELEMENT_GROUP, name, ns, self)
 
     @cached_property
     def root(self):
@@ -138,8 +140,8 @@ class Schema(object):
 
     @cached_property
     def nsmap(self):
-        nsmap = self.root.nsmap
-        nsmap[XSD_NS] = "http://www.w3.org/2001/XMLSchema"
+        nsmap = dict(self.root.nsmap)
+        nsmap[XSD_NS] = XSD_NAMESPACE
         if None in nsmap:
             nsmap["default"] = nsmap[None]
             nsmap.pop(None) 
@@ -152,28 +154,40 @@ class Schema(object):
     @cached_property
     def included_schema_paths(self):
         included_schema_paths = []
-        for include in self.root.xpath("xsd:include", namespaces=self.nsmap):
-            path = include.xpath("@schemaLocation")[0]
+        for include in include_xpath(self.root):
+            path = include.attrib['schemaLocation']
             included_schema_paths.append(path)
         return included_schema_paths
 
     @cached_property
     def imported_schema_paths(self):
         imported_schema_paths = []
-        for _import in self.root.xpath("xsd:import", namespaces=self.nsmap):
-            path = _import.xpath("@schemaLocation")[0]
+        for _import in import_xpath(self.root):
+            path = _import.attrib['schemaLocation']
             imported_schema_paths.append(path)
         return imported_schema_paths
 
+    def build_declaration(self, local_name, node):
+        return declaration_classes[local_name](self, node, None)
+
     def load(self):
-        self.element_collection = [
-            Element(self, node, None)
-            for node in self.root.xpath("xsd:element", namespaces=self.nsmap)
-        ]
-        self.attribute_collection = [
-            Attribute(self, node, None)
-            for node in self.root.xpath("xsd:attribute", namespaces=self.nsmap)
-        ]
+        if self.streaming:
+            declarations = StreamingLoader(self).load(declaration_classes)
+        else:
+            children = xsd_children(self.root)
+            declarations = {
+                local_name: [
+                    self.build_declaration(local_name, node)
+                    for node in children.get(local_name, ())
+                ]
+                for local_name in declaration_classes
+            }
+        return self.add_declarations(declarations)
+
+    def add_declarations(self, declarations):
+        # declarations: local name => global declarations
+        self.element_collection = declarations.get("element", [])
+        self.attribute_collection = declarations.get("attribute", [])
 
         for element in self.element_collection:
             if element.nested_type is not None and isinstance(element.nested_type, ComplexType) and element.nested_type.name is None:
@@ -188,23 +202,19 @@ class Schema(object):
                 if 'name' in attribute.node.attrib:
                     self.name2attribute[attribute.node.attrib['name']] = attribute
 
-        for node in self.root.xpath('xsd:simpleType', namespaces=self.nsmap):
-            t = SimpleType(self, node, None)
+        for t in declarations.get("simpleType", ()):
             if not self.recursive and 'name' in t.node.attrib:
                 self.name2type_instance[t.node.attrib['name']] = t
 
-        for node in self.root.xpath('xsd:complexType', namespaces=self.nsmap):
-            t = ComplexType(self, node, None)
+        for t in declarations.get("complexType", ()):
             if not self.recursive and 'name' in t.node.attrib:
                 self.name2type_instance[t.node.attrib['name']] = t
 
-        for node in self.root.xpath('xsd:attributeGroup', namespaces=self.nsmap):
-            g = AttributeGroup(self, node, None)
+        for g in declarations.get("attributeGroup", ()):
             if not self.recursive and 'name' in g.node.attrib:
                 self.name2attribute_group[g.node.attrib['name']] = g
 
-        for node in self.root.xpath('xsd:group', namespaces=self.nsmap):
-            g = Group(self, node, None)
+        for g in declarations.get("group", ()):
             if not self.recursive and 'name' in g.node.attrib:
                 self.name2element_group[g.node.attrib['name']] = g
 
@@ -0,0 +1,41 @@
+# Detached copy of a xsd element: the values nodes read after parsing are
+# kept so the lxml element can be freed by the streaming loader
+from lxml import etree
+
+from xsd2go.constants import XSD_NS, XSD_NAMESPACE
+
+
+docs_xpath = etree.XPath(
+    "xsd:annotation/xsd:documentation/text()",
+    namespaces={XSD_NS: XSD_NAMESPACE}
+)
+
+
+class ElementSnapshot(object):
+    __slots__ = ("tag", "attrib", "nsmap", "sourceline", "docs")
+
+    def __init__(self, element, nsmap=None):
+        # nsmap: shared copy of `element.nsmap`, most elements of a file
+        # have the same namespaces
+        self.tag = element.tag
+        self.attrib = dict(element.attrib)
+        self.nsmap = element.nsmap if nsmap is None else nsmap
+        self.sourceline = element.sourceline
+        # xpath text results keep a reference to the tree, they are copied
+        self.docs = [str(text) for text in docs_xpath(element)]
+
+    def tostring(self):
+        attrib = "".join(
+            ' %s="%s"' % (key, value) for key, value in self.attrib.items())
+        return "<%s%s/> (line %s)" % (self.tag, attrib, self.sourceline)
+
+
+class NsmapTable(object):
+    # Shares the namespace maps of the snapshots built from a file
+    def __init__(self):
+        self.nsmaps = {}
+
+    def snapshot(self, element):
+        nsmap = element.nsmap
+        key = frozenset(nsmap.items())
+        return ElementSnapshot(element, self.nsmaps.setdefault(key, nsmap))
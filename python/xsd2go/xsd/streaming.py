@@ -0,0 +1,72 @@
+# Streaming loader of a schema: the global declarations are read one by one
+# with iterparse, each one is built into the model, its nodes are detached
+# from lxml and its xml elements are cleared. The memory used by the xml
+# tree is bounded by the biggest declaration instead of the whole file.
+from lxml import etree
+
+from xsd2go.xsd.util import XSD_TAG_PREFIX
+
+from .snapshot import NsmapTable
+
+
+def clear_element(element):
+    # Frees the element and its previous siblings, iterparse keeps them
+    # attached to the root otherwise
+    element.clear()
+    parent = element.getparent()
+    while element.getprevious() is not None:
+        del parent[0]
+
+
+class StreamingLoader(object):
+    def __init__(self, schema):
+        self.schema = schema
+        self.nsmaps = NsmapTable()
+        # local name => built declarations, in document order
+        self.declarations = {}
+        self.included_schema_paths = []
+        self.imported_schema_paths = []
+
+    def load(self, declaration_tags):
+        schema = self.schema
+        prefix_length = len(XSD_TAG_PREFIX)
+        depth = 0
+        for event, element in etree.iterparse(
+            schema.file_path, events=("start", "end")
+        ):
+            if event == "start":
+                if depth == 0:
+                    schema.root = self.nsmaps.snapshot(element)
+                depth += 1
+                continue
+
+            depth -= 1
+            if depth != 1:
+                continue
+
+            tag = element.tag
+            if isinstance(tag, str) and tag.startswith(XSD_TAG_PREFIX):
+                local_name = tag[prefix_length:]
+                if local_name == "include":
+                    self.included_schema_paths.append(
+                        element.attrib['schemaLocation'])
+                elif local_name == "import":
+                    self.imported_schema_paths.append(
+                        element.attrib['schemaLocation'])
+                elif local_name in declaration_tags:
+                    self.declarations.setdefault(local_name, []).append(
+                        self.build(local_name, element))
+            clear_element(element)
+
+        schema.included_schema_paths = self.included_schema_paths
+        schema.imported_schema_paths = self.imported_schema_paths
+        return self.declarations
+
+    def build(self, local_name, element):
+        # Nodes created for the declaration, nested ones included, are
+        # appended to `schema.nodes`
+        first = len(self.schema.nodes)
+        declaration = self.schema.build_declaration(local_name, element)
+        for node in self.schema.nodes[first:]:
+            node.detach(self.nsmaps)
+        return declaration
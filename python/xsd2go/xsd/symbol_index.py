@@ -0,0 +1,94 @@
+# Project wide index of the global declarations of all schemas
+ELEMENT = "element"
+TYPE = "type"
+ATTRIBUTE = "attribute"
+ATTRIBUTE_GROUP = "attributeGroup"
+ELEMENT_GROUP = "group"
+
+
+class SymbolIndex(object):
+    def __init__(self, schemas):
+        self.schemas = schemas
+        # (namespace, local name, kind) => declarations
+        self.symbols = {}
+        self._visible_schemas = {}
+        # (namespace, local name) of a type => global elements of the type,
+        # built on first use
+        self._typed_elements = None
+
+        for schema in schemas.values():
+            tables = (
+                (ELEMENT, schema.name2element),
+                (TYPE, schema.name2type_instance),
+                (ATTRIBUTE, schema.name2attribute),
+                (ATTRIBUTE_GROUP, schema.name2attribute_group),
+                (ELEMENT_GROUP, schema.name2element_group),
+            )
+            for kind, table in tables:
+                for name, declaration in table.items():
+                    key = (declaration.schema.target_ns or None, name, kind)
+                    self.symbols.setdefault(key, []).append(declaration)
+
+    def visible_schemas(self, schema):
+        # Schemas reachable through xsd:include and xsd:import, cycles are
+        # allowed between schema files.
+        visible = self._visible_schemas.get(schema.file_path)
+        if visible is not None:
+            return visible
+
+        visible = set()
+        stack = [schema]
+        while stack:
+            current = stack.pop()
+            if current.file_path in visible:
+                continue
+            visible.add(current.file_path)
+            for path in current.included_schema_paths + current.imported_schema_paths:
+                dependency = self.schemas.get(path)
+                if dependency is not None:
+                    stack.append(dependency)
+
+        self._visible_schemas[schema.file_path] = visible
+        return visible
+
+    def declarations(self, kind, name, ns):
+        return self.symbols.get((ns or None, name, kind), [])
+
+    def typed_elements(self, name, ns):
+        # Global elements declared with the named type `{ns}name`
+        if self._typed_elements is None:
+            self._typed_elements = {}
+            for schema in self.schemas.values():
+                for element in schema.element_collection:
+                    type_ns, type_name = element.type_qname
+                    if type_name is not None:
+                        self._typed_elements.setdefault(
+                            (type_ns or None, type_name), []).append(element)
+        return self._typed_elements.get((ns or None, name), [])
+
+    def lookup(self, kind, name, ns, schema):
+        # Returns None if `{ns}name` isn't declared, raises an error if
+        # several schemas declare it and none of them can be preferred.
+        declarations = self.symbols.get((ns or None, name, kind))
+        if not declarations:
+            return None
+        if len(declarations) == 1:
+            return declarations[0]
+
+        # The declaration of the schema itself wins, then the declarations
+        # of the included and imported schemas.
+        candidates = [d for d in declarations if d.schema is schema]
+        if not candidates:
+            visible = self.visible_schemas(schema)
+            candidates = [
+                d for d in declarations if d.schema.file_path in visible
+            ]
+
+        if len(candidates) != 1:
+            raise RuntimeError(
+                "Ambiguous %s {%s}%s referenced from %s, declared in %s" % (
+                    kind, ns or "", name, schema.file_path,
+                    ", ".join(sorted(d.schema.file_path for d in declarations))
+                )
+            )
+        return candidates[0]
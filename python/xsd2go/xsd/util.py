@@ -1,4 +1,48 @@
 import re
+import sys
+from functools import lru_cache
+
+from xsd2go.constants import XSD_NAMESPACE
+
+
+XSD_TAG_PREFIX = "{%s}" % XSD_NAMESPACE
+
+# Particles which can hold elements, they are also gathered in document order
+# under the COLLECTION key by `xsd_children`
+COLLECTION = "collection"
+COLLECTION_TAGS = frozenset(("group", "all", "choice", "sequence"))
+
+
+def xsd_children(node):
+    # Children in the xsd namespace grouped by local name, the children of
+    # the node are iterated only once.
+    children = {}
+    prefix_length = len(XSD_TAG_PREFIX)
+    for child in node:
+        tag = child.tag
+        # Skip comments, processing instructions and foreign elements
+        if not isinstance(tag, str) or not tag.startswith(XSD_TAG_PREFIX):
+            continue
+        local_name = tag[prefix_length:]
+        children.setdefault(local_name, []).append(child)
+        if local_name in COLLECTION_TAGS:
+            children.setdefault(COLLECTION, []).append(child)
+    return children
+
+
+def particle_tags(node):
+    # Local names of the element, wildcard and collection children of the
+    # node, in document order
+    prefix_length = len(XSD_TAG_PREFIX)
+    tags = []
+    for child in node:
+        tag = child.tag
+        if not isinstance(tag, str) or not tag.startswith(XSD_TAG_PREFIX):
+            continue
+        local_name = tag[prefix_length:]
+        if local_name in ("element", "any") or local_name in COLLECTION_TAGS:
+            tags.append(local_name)
+    return tags
 
 
 def parse_ref_value(value, nsmap):
@@ -10,19 +54,83 @@ def parse_ref_value(value, nsmap):
     return name, None
 
 
+TAG_RE = re.compile(r'(\{(?P<ns>.+)\})?(?P<tag>.+)')
+ATTRIB_VALUE_RE = re.compile(r'((?P<ns_tag>.+)\:)?(?P<tag>.+)')
+
+QNAME_CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=QNAME_CACHE_SIZE)
 def parse_tag(tag_name):
-    extract = [
-        m.groupdict()
-        for m in re.finditer(
-            r'(\{(?P<ns>.+)\})?(?P<tag>.+)', tag_name)
-    ][0]
-    return extract.get("tag"), extract.get("ns")
+    extract = TAG_RE.match(tag_name)
+    return extract.group("tag"), extract.group("ns")
+
 
+def parse_occurs(attrib):
+    # (minOccurs, maxOccurs) of a particle, maxOccurs is None when unbounded
+    max_occurs = attrib.get("maxOccurs", "1")
+    return (
+        int(attrib.get("minOccurs", "1")),
+        None if max_occurs == "unbounded" else int(max_occurs),
+    )
 
+
+@lru_cache(maxsize=QNAME_CACHE_SIZE)
 def parse_attrib_value(value):
-    extract = [
-        m.groupdict()
-        for m in re.finditer(
-            r'((?P<ns_tag>.+)\:)?(?P<tag>.+)', value)
-    ][0]
-    return extract.get("tag"), extract.get("ns_tag")
+    extract = ATTRIB_VALUE_RE.match(value)
+    return extract.group("tag"), extract.group("ns_tag")
+
+
+# Equal namespace maps share one frozen key, so resolved names can be
+# cached by value and namespace map identity
+_nsmap_keys = {}
+
+
+def intern_nsmap(nsmap):
+    key = frozenset(nsmap.items())
+    return _nsmap_keys.setdefault(key, key)
+
+
+@lru_cache(maxsize=QNAME_CACHE_SIZE)
+def _resolve_qname(value, nsmap_key):
+    name, ns_tag = parse_attrib_value(value)
+    ns = dict(nsmap_key).get(ns_tag)
+    if ns is not None:
+        ns = sys.intern(ns)
+    return ns, sys.intern(name)
+
+
+def resolve_qname(value, nsmap_key):
+    # Returns the (namespace, local name) of a `prefix:name` attribute value,
+    # `nsmap_key` is returned by `intern_nsmap`. Unprefixed names are in
+    # the default namespace.
+    if not value:
+        return None, None
+    return _resolve_qname(value, nsmap_key)
+
+
+class cached_slot(object):
+    # cached_property for classes with __slots__: the value is kept in the
+    # `_<name>` slot, which the class must declare
+    def __init__(self, func):
+        self.func = func
+        self.slot_name = "_" + func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        try:
+            return getattr(obj, self.slot_name)
+        except AttributeError:
+            pass
+        value = self.func(obj)
+        setattr(obj, self.slot_name, value)
+        return value
+
+    def __set__(self, obj, value):
+        setattr(obj, self.slot_name, value)
+
+    def __delete__(self, obj):
+        if hasattr(obj, self.slot_name):
+            delattr(obj, self.slot_name)
@@ -1,3 +1,6 @@
+import json
+
+
 xsd2go_type = {
     "ENTITIES": "string",
     "ENTITY": "string",
@@ -46,4 +49,81 @@ xsd2go_type = {
     "float": "float32",
 
     "language": "string",
-}
\ No newline at end of file
+}
+
+# Go types with the width of the value spaces of the xsd types, the
+# unbounded integers use 64 bits
+exact_xsd2go_type = dict(
+    xsd2go_type,
+    byte="int8",
+    short="int16",
+    int="int32",
+    long="int64",
+    integer="int64",
+    negativeInteger="int64",
+    nonPositiveInteger="int64",
+    nonNegativeInteger="uint64",
+    positiveInteger="uint64",
+    unsignedLong="uint64",
+    unsignedInt="uint32",
+    unsignedShort="uint16",
+    unsignedByte="uint8",
+    decimal="float64",
+    double="float64",
+    float="float32",
+)
+
+
+def split_go_type(go_type):
+    # `import/path.Type` => (`"import/path"`, `path.Type`), go types without
+    # package have no import
+    path, _, name = go_type.rpartition(".")
+    if not path:
+        return None, go_type
+    return '"%s"' % path, "%s.%s" % (path.split("/")[-1], name)
+
+
+class GoTypeMapping(object):
+    # Go types of the xsd builtin types, and the imports of the go types
+    # defined in other packages. With `enums`, the simple types restricted
+    # by enumerations are generated as go enums, with `lists` the xsd:list
+    # simple types are generated as go slices and with `unions` the
+    # xsd:union simple types are generated as tagged go structs.
+    def __init__(
+        self, exact=False, overrides=None, enums=False, lists=False,
+        unions=False
+    ):
+        self.types = dict(exact_xsd2go_type if exact else xsd2go_type)
+        self.enums = enums
+        self.lists = lists
+        self.unions = unions
+        self.imports = {}
+        for xsd_type, go_type in sorted((overrides or {}).items()):
+            if xsd_type not in self.types:
+                raise RuntimeError("Unknown xsd builtin type %s" % xsd_type)
+            path, go_type = split_go_type(go_type)
+            self.types[xsd_type] = go_type
+            if path is not None:
+                self.imports[go_type] = path
+
+    @classmethod
+    def from_file(
+        cls, file_path, exact=False, enums=False, lists=False, unions=False
+    ):
+        # JSON object: xsd type name => go type, the go types of other
+        # packages are written `import/path.Type`
+        with open(file_path) as fin:
+            overrides = json.load(fin)
+        if not isinstance(overrides, dict):
+            raise RuntimeError(
+                "Type mapping %s isn't a JSON object" % file_path)
+        return cls(exact, overrides, enums, lists, unions)
+
+    def get(self, xsd_type):
+        return self.types.get(xsd_type)
+
+    def go_imports(self, go_types):
+        return set(
+            self.imports[go_type] for go_type in go_types
+            if go_type in self.imports
+        )